@@ -0,0 +1,80 @@
+"""
+Activity log API routes
+"""
+
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from pydantic import BaseModel, IPvAnyAddress
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_read_db
+from ..responses import ResponseAdapter
+from ..models.activity_log import ActivityLog
+from ..models.user import User, UserRole
+from ..auth.auth import get_current_active_user
+from .expand import response_columns
+from .pagination import Paginator
+
+router = APIRouter()
+
+
+class ActivityResponse(BaseModel):
+    id: UUID
+    user_id: UUID | None = None
+    action: str
+    resource_type: str
+    resource_id: UUID | None = None
+    details: dict | None = None
+    ip_address: IPvAnyAddress | None = None
+    user_agent: str | None = None
+    created_at: datetime
+
+
+activity_list = ResponseAdapter(List[ActivityResponse])
+
+
+@router.get("/", response_model=List[ActivityResponse])
+async def read_activity(
+    request: Request,
+    response: Response,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    resource_type: str | None = None,
+    resource_id: UUID | None = None,
+    user_id: UUID | None = None,
+    action: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Activity entries, newest first (pass `cursor` for the next page).
+
+    ``since`` (inclusive) and ``until`` (exclusive) bound the time range and
+    limit the scan to the partitions of those months. Non-admins only see
+    their own entries.
+    """
+    query = select(*response_columns(ActivityLog, ActivityResponse))
+    if current_user.role != UserRole.ADMIN:
+        query = query.where(ActivityLog.user_id == current_user.id)
+    elif user_id is not None:
+        query = query.where(ActivityLog.user_id == user_id)
+    if since is not None:
+        query = query.where(ActivityLog.created_at >= since)
+    if until is not None:
+        query = query.where(ActivityLog.created_at < until)
+    if resource_type is not None:
+        query = query.where(ActivityLog.resource_type == resource_type)
+    if resource_id is not None:
+        query = query.where(ActivityLog.resource_id == resource_id)
+    if action is not None:
+        query = query.where(ActivityLog.action == action)
+
+    page = Paginator(ActivityLog, cursor, 0, limit, descending=True)
+    result = await db.execute(page.apply(query))
+    rows = [row._asdict() for row in page.finish(result.all(), request, response)]
+    return activity_list.render(rows, response)
@@ -0,0 +1,81 @@
+"""
+Admin diagnostics API routes
+"""
+
+import os
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from ..database import pool_status
+from ..models.user import User, UserRole
+from ..auth.auth import get_current_active_user
+from ..auth.api_keys import api_key_index
+from ..auth.cache import principal_cache
+from ..auth.hashing import password_hasher
+from ..services.activity_log import activity_log_writer
+from ..services.partitions import partition_maintenance
+from ..services.print_jobs import print_job_ingest
+from ..services.spoolman_db import spoolman_db_sync
+
+router = APIRouter()
+
+
+def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
+    """Dependency that only lets admins through"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return current_user
+
+
+@router.get("/auth-cache")
+async def read_auth_cache_stats(current_user: User = Depends(require_admin)):
+    """Principal cache hit/miss counters for this worker"""
+    return {
+        "pid": os.getpid(),
+        **principal_cache.stats(),
+        "api_keys": api_key_index.stats()
+    }
+
+
+@router.get("/password-hasher")
+async def read_password_hasher_stats(current_user: User = Depends(require_admin)):
+    """Password hashing pool occupancy for this worker"""
+    return {"pid": os.getpid(), **password_hasher.stats()}
+
+
+@router.get("/print-job-ingest")
+async def read_print_job_ingest_stats(current_user: User = Depends(require_admin)):
+    """Print job event queue depth and counters for this worker"""
+    return {"pid": os.getpid(), **print_job_ingest.stats()}
+
+
+@router.get("/activity-log")
+async def read_activity_log_stats(current_user: User = Depends(require_admin)):
+    """Activity log queue depth and counters for this worker"""
+    return {"pid": os.getpid(), **activity_log_writer.stats()}
+
+
+@router.get("/partitions")
+async def read_partition_maintenance(current_user: User = Depends(require_admin)):
+    """Result of this worker's last partition maintenance round"""
+    return {"pid": os.getpid(), "last_run": partition_maintenance.last_report}
+
+
+@router.get("/pool")
+async def read_pool_stats(current_user: User = Depends(require_admin)):
+    """Database connection pool occupancy and wait times for this worker"""
+    return {"pid": os.getpid(), **pool_status()}
+
+
+@router.get("/spoolman-db")
+async def read_spoolman_db_sync(current_user: User = Depends(require_admin)):
+    """Result of this worker's last SpoolmanDB sync round"""
+    return {"pid": os.getpid(), "source": spoolman_db_sync.base_url, "last_sync": spoolman_db_sync.last_report}
+
+
+@router.post("/spoolman-db/sync")
+async def sync_spoolman_db(force: bool = False, current_user: User = Depends(require_admin)):
+    """Sync the SpoolmanDB catalog now; ``force`` refetches even if unchanged"""
+    return await spoolman_db_sync.sync(force=force)
@@ -0,0 +1,135 @@
+"""
+API keys routes
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from pydantic import BaseModel, field_validator
+from uuid import UUID
+
+from ..database import get_db
+from ..models.api_key import ApiKey
+from ..models.user import User
+from ..auth.auth import get_current_active_user
+from ..auth.api_keys import (
+    SCOPE_PATTERN,
+    api_key_index,
+    entry_from_model,
+    generate_api_key,
+    hash_api_key,
+)
+
+router = APIRouter()
+
+
+class ApiKeyCreate(BaseModel):
+    name: str
+    scopes: List[str]
+    expires_in_days: int | None = None
+
+    @field_validator("scopes")
+    @classmethod
+    def validate_scopes(cls, scopes: List[str]) -> List[str]:
+        if not scopes:
+            raise ValueError("At least one scope is required")
+        for scope in scopes:
+            if not SCOPE_PATTERN.match(scope):
+                raise ValueError(f"Invalid scope '{scope}', expected '<resource>:read|write|*' or '*'")
+        return scopes
+
+
+class ApiKeyResponse(BaseModel):
+    id: UUID
+    name: str
+    prefix: str
+    scopes: List[str]
+    expires_at: datetime | None = None
+    created_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class ApiKeyCreated(ApiKeyResponse):
+    key: str
+
+
+def _reject_api_key_auth(request: Request):
+    # Keys must not be able to mint or revoke other keys
+    if getattr(request.state, "api_key_id", None) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="API keys cannot manage API keys"
+        )
+
+
+@router.get("/", response_model=List[ApiKeyResponse])
+async def read_api_keys(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """List the current user's API keys"""
+    _reject_api_key_auth(request)
+    result = await db.execute(select(ApiKey).where(ApiKey.user_id == current_user.id))
+    return result.scalars().all()
+
+
+@router.post("/", response_model=ApiKeyCreated)
+async def create_api_key(
+    request: Request,
+    api_key: ApiKeyCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Create an API key; the plaintext key is only returned here"""
+    _reject_api_key_auth(request)
+    prefix, key = generate_api_key()
+    expires_at = None
+    if api_key.expires_in_days:
+        expires_at = datetime.now(timezone.utc) + timedelta(days=api_key.expires_in_days)
+
+    db_api_key = ApiKey(
+        user_id=current_user.id,
+        name=api_key.name,
+        prefix=prefix,
+        key_hash=hash_api_key(key),
+        scopes=api_key.scopes,
+        expires_at=expires_at
+    )
+    db.add(db_api_key)
+    await db.commit()
+    await db.refresh(db_api_key)
+    api_key_index.put(prefix, entry_from_model(db_api_key))
+
+    return ApiKeyCreated(**ApiKeyResponse.model_validate(db_api_key).model_dump(), key=key)
+
+
+@router.delete("/{api_key_id}")
+async def delete_api_key(
+    request: Request,
+    api_key_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Revoke an API key"""
+    _reject_api_key_auth(request)
+    result = await db.execute(
+        select(ApiKey).where(ApiKey.id == api_key_id, ApiKey.user_id == current_user.id)
+    )
+    api_key = result.scalar_one_or_none()
+
+    if api_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="API key not found"
+        )
+
+    await db.delete(api_key)
+    await db.commit()
+    api_key_index.put(api_key.prefix, None)
+
+    return {"message": "API key deleted successfully"}
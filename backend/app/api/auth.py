@@ -10,6 +10,12 @@ from pydantic import BaseModel
 
 from ..database import get_db
 from ..auth.auth import authenticate_user, create_access_token
+from ..auth.tokens import (
+    create_refresh_token,
+    decode_refresh_token,
+    revoke_family,
+    rotate_refresh_token,
+)
 from ..config import settings
 
 router = APIRouter()
@@ -18,18 +24,30 @@ router = APIRouter()
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str | None = None
 
 
 class TokenData(BaseModel):
     username: str | None = None
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+def _issue_access_token(username: str) -> str:
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return create_access_token(
+        data={"sub": username}, expires_delta=access_token_expires
+    )
+
+
 @router.post("/login", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
-    """Login endpoint to get access token"""
+    """Login endpoint to get access and refresh tokens"""
     user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
@@ -38,18 +56,48 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
+    refresh_token = await create_refresh_token(db, user)
+    await db.commit()
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {
+        "access_token": _issue_access_token(user.username),
+        "token_type": "bearer",
+        "refresh_token": refresh_token
+    }
 
 
-@router.post("/refresh")
-async def refresh_token():
-    """Refresh token endpoint (placeholder for future implementation)"""
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Token refresh not implemented yet"
-    )
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    request: RefreshRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Exchange a refresh token for a new access token and a rotated refresh token"""
+    rotated = await rotate_refresh_token(db, request.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or revoked refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user, refresh_token = rotated
+    await db.commit()
+    
+    return {
+        "access_token": _issue_access_token(user.username),
+        "token_type": "bearer",
+        "refresh_token": refresh_token
+    }
+
+
+@router.post("/logout")
+async def logout(
+    request: RefreshRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Revoke the login session a refresh token belongs to"""
+    claims = decode_refresh_token(request.refresh_token)
+    if claims is not None:
+        await revoke_family(db, claims["family_id"], claims["exp"])
+        await db.commit()
+    
+    return {"message": "Logged out successfully"}
@@ -0,0 +1,57 @@
+"""
+SpoolmanDB catalog API routes
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+from ..models.user import User
+from ..auth.auth import get_current_active_user
+from ..services.catalog import catalog_snapshot
+
+router = APIRouter()
+
+
+def _snapshot():
+    if not catalog_snapshot.available:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The SpoolmanDB catalog has not been synced yet"
+        )
+    return catalog_snapshot
+
+
+@router.get("/")
+async def read_catalog(current_user: User = Depends(get_current_active_user)):
+    """Snapshot version and size"""
+    return catalog_snapshot.stats()
+
+
+@router.get("/filaments")
+async def search_catalog(
+    manufacturer: Optional[str] = None,
+    material: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Catalog filaments of a manufacturer and/or material"""
+    if manufacturer is None and material is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pass manufacturer and/or material"
+        )
+    # Records are stored as JSON, so they are sent without decoding
+    records = _snapshot().search(manufacturer=manufacturer, material=material)
+    return Response(b"[" + b",".join(records) + b"]", media_type="application/json")
+
+
+@router.get("/filaments/{spoolman_db_id:path}")
+async def read_catalog_filament(spoolman_db_id: str, current_user: User = Depends(get_current_active_user)):
+    """Catalog filament by its SpoolmanDB id (``manufacturer/name``)"""
+    record = _snapshot().get(spoolman_db_id)
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Catalog filament not found"
+        )
+    return Response(record, media_type="application/json")
@@ -0,0 +1,78 @@
+"""
+Opt-in relationship expansion (``?expand=``) and column projections shared
+by the API routes
+"""
+
+from typing import Any
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, model_validator
+from sqlalchemy import inspect
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.orm import joinedload
+
+
+def expand_options(expand: str | None, paths: dict[str, tuple]) -> list:
+    """Turn ``expand=filament,filament.material`` into loader options.
+
+    ``paths`` maps each accepted name to the chain of relationship attributes
+    to follow. Only many-to-one relations are expandable, so everything is
+    fetched with a single joined query; nothing is loaded unless asked for.
+    """
+    if not expand:
+        return []
+
+    names = {name.strip() for name in expand.split(",") if name.strip()}
+    unknown = names - paths.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot expand {', '.join(sorted(unknown))}; "
+                   f"expected any of {', '.join(sorted(paths))}"
+        )
+
+    options = []
+    for name in sorted(names):
+        attributes = paths[name]
+        option = joinedload(attributes[0])
+        for attribute in attributes[1:]:
+            option = option.joinedload(attribute)
+        options.append(option)
+    return options
+
+
+def response_columns(model, schema: type[BaseModel]) -> list[ColumnElement]:
+    """Table columns of ``model`` that ``schema`` serializes.
+
+    Selecting these instead of the entity returns plain Core rows: no ORM
+    instances, identity map or change tracking, which is where most of the
+    time goes for long lists. Hand the rows to the response model as dicts
+    (``row._asdict()``); validating ``Row`` objects attribute by attribute
+    is slower than validating the ORM instances.
+    """
+    columns = model.__table__.c
+    return [columns[name] for name in schema.model_fields if name in columns]
+
+
+class ExpandableResponse(BaseModel):
+    """Response model whose relationship fields are filled only when loaded.
+
+    Reading an unloaded relationship from an async session would trigger a
+    lazy load (and fail outside a greenlet), so ORM objects are copied field
+    by field and unloaded attributes are left unset. Routes returning these
+    models use ``response_model_exclude_unset`` so unexpanded relations are
+    simply absent from the JSON.
+    """
+
+    @model_validator(mode="before")
+    @classmethod
+    def _loaded_attributes(cls, data: Any) -> Any:
+        state = inspect(data, raiseerr=False)
+        if state is None or not hasattr(state, "unloaded"):
+            return data
+        unloaded = state.unloaded
+        return {
+            name: getattr(data, name)
+            for name in cls.model_fields
+            if name not in unloaded and hasattr(data, name)
+        }
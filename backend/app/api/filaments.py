@@ -3,21 +3,34 @@ Filaments API routes
 """
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 from pydantic import BaseModel
 from uuid import UUID
+from datetime import datetime
 from decimal import Decimal
 
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..responses import ResponseAdapter
 from ..models.filament import Filament
 from ..models.user import User
 from ..auth.auth import get_current_active_user
+from ..services.typeahead import typeahead_index
+from .expand import ExpandableResponse, expand_options, response_columns
+from .export import ExportFormat, export_response
+from .manufacturers import ManufacturerResponse
+from .materials import MaterialResponse
+from .pagination import Paginator
 
 router = APIRouter()
 
+# Relations that can be requested with ?expand=
+EXPANDABLE = {
+    "manufacturer": (Filament.manufacturer,),
+    "material": (Filament.material,),
+}
+
 
 class FilamentBase(BaseModel):
     manufacturer_id: UUID
@@ -55,42 +68,72 @@ class FilamentUpdate(BaseModel):
     spoolman_db_id: str | None = None
 
 
-class FilamentResponse(FilamentBase):
+class FilamentResponse(FilamentBase, ExpandableResponse):
     id: UUID
-    created_at: str
-    updated_at: str
+    created_at: datetime
+    updated_at: datetime
+    manufacturer: ManufacturerResponse | None = None
+    material: MaterialResponse | None = None
 
     class Config:
         from_attributes = True
 
 
-@router.get("/", response_model=List[FilamentResponse])
+filament_list = ResponseAdapter(List[FilamentResponse], exclude_unset=True)
+
+
+@router.get("/", response_model=List[FilamentResponse], response_model_exclude_unset=True)
 async def read_filaments(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
     manufacturer_id: UUID | None = None,
     material_id: UUID | None = None,
-    db: AsyncSession = Depends(get_db),
+    expand: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all filaments with optional filtering"""
-    query = select(Filament).options(
-        selectinload(Filament.manufacturer),
-        selectinload(Filament.material)
-    )
+    """Get all filaments with optional filtering (pass `cursor` for keyset paging)"""
+    if expand:
+        query = select(Filament).options(*expand_options(expand, EXPANDABLE))
+    else:
+        # Nothing nested requested: project the response columns only
+        query = select(*response_columns(Filament, FilamentResponse))
     
     if manufacturer_id:
         query = query.where(Filament.manufacturer_id == manufacturer_id)
     if material_id:
         query = query.where(Filament.material_id == material_id)
     
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    filaments = result.scalars().all()
-    return filaments
+    page = Paginator(Filament, cursor, skip, limit)
+    result = await db.execute(page.apply(query))
+    if expand:
+        rows = page.finish(result.unique().scalars().all(), request, response)
+    else:
+        rows = [row._asdict() for row in page.finish(result.all(), request, response)]
+    return filament_list.render(rows, response)
+
+
+@router.get("/export")
+async def export_filaments(
+    request: Request,
+    format: ExportFormat = ExportFormat.NDJSON,
+    manufacturer_id: UUID | None = None,
+    material_id: UUID | None = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stream all filaments as NDJSON or CSV"""
+    query = select(*response_columns(Filament, FilamentResponse))
+    if manufacturer_id:
+        query = query.where(Filament.manufacturer_id == manufacturer_id)
+    if material_id:
+        query = query.where(Filament.material_id == material_id)
+    return export_response(request, query.order_by(Filament.created_at, Filament.id), format, "filaments")
 
 
-@router.post("/", response_model=FilamentResponse)
+@router.post("/", response_model=FilamentResponse, response_model_exclude_unset=True)
 async def create_filament(
     filament: FilamentCreate,
     db: AsyncSession = Depends(get_db),
@@ -114,23 +157,22 @@ async def create_filament(
     db.add(db_filament)
     await db.commit()
     await db.refresh(db_filament)
+    typeahead_index.put(db_filament)
     
     return db_filament
 
 
-@router.get("/{filament_id}", response_model=FilamentResponse)
+@router.get("/{filament_id}", response_model=FilamentResponse, response_model_exclude_unset=True)
 async def read_filament(
     filament_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    expand: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific filament"""
     result = await db.execute(
         select(Filament)
-        .options(
-            selectinload(Filament.manufacturer),
-            selectinload(Filament.material)
-        )
+        .options(*expand_options(expand, EXPANDABLE))
         .where(Filament.id == filament_id)
     )
     filament = result.scalar_one_or_none()
@@ -144,7 +186,7 @@ async def read_filament(
     return filament
 
 
-@router.put("/{filament_id}", response_model=FilamentResponse)
+@router.put("/{filament_id}", response_model=FilamentResponse, response_model_exclude_unset=True)
 async def update_filament(
     filament_id: UUID,
     filament_update: FilamentUpdate,
@@ -168,6 +210,7 @@ async def update_filament(
     
     await db.commit()
     await db.refresh(filament)
+    typeahead_index.put(filament)
     
     return filament
 
@@ -190,5 +233,6 @@ async def delete_filament(
     
     await db.delete(filament)
     await db.commit()
+    typeahead_index.remove(filament)
     
     return {"message": "Filament deleted successfully"}
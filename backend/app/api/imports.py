@@ -0,0 +1,64 @@
+"""
+Import API routes
+"""
+
+import os
+
+import orjson
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status
+from fastapi.responses import StreamingResponse
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models.user import User
+from ..auth.auth import get_current_active_user
+from ..services.importer import ImportFormat, run_import
+
+router = APIRouter()
+
+
+def _import_format(upload: UploadFile, format: ImportFormat | None) -> ImportFormat:
+    if format is not None:
+        return format
+    extension = os.path.splitext(upload.filename or "")[1].lstrip(".").lower()
+    try:
+        return ImportFormat(extension)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot tell the file format; pass format=csv|json|ndjson"
+        )
+
+
+@router.post("/")
+async def import_file(
+    request: Request,
+    file: UploadFile = File(...),
+    format: ImportFormat | None = None,
+    dry_run: bool = False,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Import filaments and spools from a Spoolman export or a spreadsheet.
+
+    Progress is streamed as NDJSON events; the last one (``stage: done``)
+    carries the report. With ``dry_run`` nothing is committed.
+    """
+    format = _import_format(file, format)
+    if file.size is not None and file.size > settings.IMPORT_MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Import files are limited to {settings.IMPORT_MAX_FILE_SIZE} bytes"
+        )
+
+    async def events():
+        # Runs after the handler returns, so it owns its session
+        async with AsyncSessionLocal(info={"request": request}) as db:
+            try:
+                async for event in run_import(db, current_user.id, file.file, format, dry_run):
+                    yield orjson.dumps(event) + b"\n"
+            except Exception:
+                await db.rollback()
+                yield orjson.dumps({"stage": "failed", "detail": "Import failed, nothing was imported"}) + b"\n"
+                raise
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
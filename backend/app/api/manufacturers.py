@@ -3,16 +3,20 @@ Manufacturers API routes
 """
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import BaseModel
 from uuid import UUID
+from datetime import datetime
 
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..responses import ResponseAdapter
 from ..models.manufacturer import Manufacturer
 from ..models.user import User
 from ..auth.auth import get_current_active_user
+from ..services.typeahead import typeahead_index
+from .pagination import Paginator
 
 router = APIRouter()
 
@@ -35,24 +39,31 @@ class ManufacturerUpdate(BaseModel):
 
 class ManufacturerResponse(ManufacturerBase):
     id: UUID
-    created_at: str
-    updated_at: str
+    created_at: datetime
+    updated_at: datetime
 
     class Config:
         from_attributes = True
 
 
+manufacturer_list = ResponseAdapter(List[ManufacturerResponse])
+
+
 @router.get("/", response_model=List[ManufacturerResponse])
 async def read_manufacturers(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all manufacturers"""
-    result = await db.execute(select(Manufacturer).offset(skip).limit(limit))
-    manufacturers = result.scalars().all()
-    return manufacturers
+    page = Paginator(Manufacturer, cursor, skip, limit)
+    result = await db.execute(page.apply(select(Manufacturer)))
+    manufacturers = page.finish(result.scalars().all(), request, response)
+    return manufacturer_list.render(manufacturers, response)
 
 
 @router.post("/", response_model=ManufacturerResponse)
@@ -74,6 +85,7 @@ async def create_manufacturer(
     db.add(db_manufacturer)
     await db.commit()
     await db.refresh(db_manufacturer)
+    typeahead_index.put(db_manufacturer)
     
     return db_manufacturer
 
@@ -81,7 +93,7 @@ async def create_manufacturer(
 @router.get("/{manufacturer_id}", response_model=ManufacturerResponse)
 async def read_manufacturer(
     manufacturer_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific manufacturer"""
@@ -121,6 +133,7 @@ async def update_manufacturer(
     
     await db.commit()
     await db.refresh(manufacturer)
+    typeahead_index.put(manufacturer)
     
     return manufacturer
 
@@ -143,5 +156,6 @@ async def delete_manufacturer(
     
     await db.delete(manufacturer)
     await db.commit()
+    typeahead_index.remove(manufacturer)
     
     return {"message": "Manufacturer deleted successfully"}
@@ -3,17 +3,21 @@ Materials API routes
 """
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import BaseModel
 from uuid import UUID
+from datetime import datetime
 from decimal import Decimal
 
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..responses import ResponseAdapter
 from ..models.material import Material
 from ..models.user import User
 from ..auth.auth import get_current_active_user
+from ..services.typeahead import typeahead_index
+from .pagination import Paginator
 
 router = APIRouter()
 
@@ -44,24 +48,31 @@ class MaterialUpdate(BaseModel):
 
 class MaterialResponse(MaterialBase):
     id: UUID
-    created_at: str
-    updated_at: str
+    created_at: datetime
+    updated_at: datetime
 
     class Config:
         from_attributes = True
 
 
+material_list = ResponseAdapter(List[MaterialResponse])
+
+
 @router.get("/", response_model=List[MaterialResponse])
 async def read_materials(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all materials"""
-    result = await db.execute(select(Material).offset(skip).limit(limit))
-    materials = result.scalars().all()
-    return materials
+    page = Paginator(Material, cursor, skip, limit)
+    result = await db.execute(page.apply(select(Material)))
+    materials = page.finish(result.scalars().all(), request, response)
+    return material_list.render(materials, response)
 
 
 @router.post("/", response_model=MaterialResponse)
@@ -83,6 +94,7 @@ async def create_material(
     db.add(db_material)
     await db.commit()
     await db.refresh(db_material)
+    typeahead_index.put(db_material)
     
     return db_material
 
@@ -90,7 +102,7 @@ async def create_material(
 @router.get("/{material_id}", response_model=MaterialResponse)
 async def read_material(
     material_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific material"""
@@ -130,6 +142,7 @@ async def update_material(
     
     await db.commit()
     await db.refresh(material)
+    typeahead_index.put(material)
     
     return material
 
@@ -152,5 +165,6 @@ async def delete_material(
     
     await db.delete(material)
     await db.commit()
+    typeahead_index.remove(material)
     
     return {"message": "Material deleted successfully"}
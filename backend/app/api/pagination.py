@@ -0,0 +1,94 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints
+"""
+
+import base64
+from datetime import datetime
+from typing import Any, Sequence
+from uuid import UUID
+
+import orjson
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import Select, tuple_
+
+
+def encode_cursor(created_at: datetime, id: UUID, direction: str) -> str:
+    """Opaque cursor pointing just past (``next``) or before (``prev``) a row"""
+    raw = orjson.dumps([created_at.isoformat(), str(id), direction])
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id, direction = orjson.loads(raw)
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return datetime.fromisoformat(created_at), UUID(id), direction
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+class Paginator:
+    """Orders a list query by (created_at, id) and pages through it.
+
+    With a cursor the page is selected with a row comparison on the sort key,
+    so every page is an index range scan no matter how deep it is. ``skip``
+    is still honoured when no cursor is given, for older clients. Links to
+    the neighbouring pages are returned in the ``Link`` header and as
+    ``X-Next-Cursor`` / ``X-Prev-Cursor``.
+    """
+
+    def __init__(self, model, cursor: str | None, skip: int, limit: int, descending: bool = False):
+        self.model = model
+        self.cursor = decode_cursor(cursor) if cursor else None
+        self.skip = skip
+        self.limit = max(limit, 0)
+        self.descending = descending
+
+    @property
+    def backwards(self) -> bool:
+        return self.cursor is not None and self.cursor[2] == "prev"
+
+    def apply(self, query: Select) -> Select:
+        created_at, id = self.model.created_at, self.model.id
+        sort_key = tuple_(created_at, id)
+        # Walking backwards means scanning the index in the opposite order
+        reverse = self.descending != self.backwards
+        if self.cursor is not None:
+            position = tuple_(self.cursor[0], self.cursor[1])
+            query = query.where(sort_key < position if reverse else sort_key > position)
+        elif self.skip:
+            query = query.offset(self.skip)
+        if reverse:
+            query = query.order_by(created_at.desc(), id.desc())
+        else:
+            query = query.order_by(created_at, id)
+        return query.limit(self.limit + 1)
+
+    def finish(self, rows: Sequence[Any], request: Request, response: Response) -> list:
+        """Trim the look-ahead row, restore order and set the page links"""
+        rows = list(rows)
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if self.backwards:
+            rows.reverse()
+
+        has_next = has_more if not self.backwards else True
+        has_prev = (has_more if self.backwards else self.cursor is not None) or (self.cursor is None and self.skip > 0)
+
+        links = []
+        if rows and has_next:
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id, "next")
+            response.headers["X-Next-Cursor"] = next_cursor
+            links.append(f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"')
+        if rows and has_prev:
+            prev_cursor = encode_cursor(rows[0].created_at, rows[0].id, "prev")
+            response.headers["X-Prev-Cursor"] = prev_cursor
+            links.append(f'<{request.url.include_query_params(cursor=prev_cursor)}>; rel="prev"')
+        if links:
+            response.headers["Link"] = ", ".join(links)
+        return rows
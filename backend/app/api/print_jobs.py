@@ -0,0 +1,228 @@
+"""
+Print jobs API routes
+"""
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Date, DateTime, cast, func, select
+from pydantic import AwareDatetime, BaseModel, Field
+from uuid import UUID
+
+from ..database import get_read_db
+from ..responses import ResponseAdapter
+from ..models.print_job import PrintJob, PrintJobStatus
+from ..models.print_job_usage import PrintJobDailyUsage
+from ..models.user import User, UserRole
+from ..auth.auth import get_current_active_user
+from ..services.print_jobs import IngestQueueFull, print_job_ingest
+from .export import ExportFormat, export_response
+
+router = APIRouter()
+
+# Largest number of events accepted per request
+EVENTS_MAX_ITEMS = 1000
+
+
+class PrintJobEventType(str, Enum):
+    START = "start"
+    PROGRESS = "progress"
+    FINISH = "finish"
+    FAIL = "fail"
+    CANCEL = "cancel"
+
+
+class PrintJobEvent(BaseModel):
+    job_id: UUID  # chosen by the reporter; all events of a job share it
+    printer_id: UUID
+    type: PrintJobEventType
+    # Must carry a UTC offset; defaults to the time it was received
+    timestamp: AwareDatetime | None = None
+    spool_id: UUID | None = None
+    job_name: str | None = Field(None, max_length=255)
+    progress: float | None = Field(None, ge=0, le=100)
+    filament_used: Decimal | None = Field(None, ge=0, lt=1000000)  # grams so far
+
+
+class PrintJobEvents(BaseModel):
+    events: List[PrintJobEvent] = Field(max_length=EVENTS_MAX_ITEMS)
+
+
+class PrintJobResponse(BaseModel):
+    id: UUID
+    printer_id: UUID
+    spool_id: UUID | None = None
+    user_id: UUID
+    job_name: str | None = None
+    start_time: datetime | None = None
+    end_time: datetime | None = None
+    filament_used: Decimal | None = None
+    status: PrintJobStatus
+    notes: str | None = None
+    metadata: dict = Field(default={}, validation_alias="job_metadata")
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class UsageInterval(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class UsageGroup(str, Enum):
+    PRINTER = "printer"
+    SPOOL = "spool"
+    MATERIAL = "material"
+
+
+class PrintJobUsage(BaseModel):
+    period: date  # first day of the day / week / month
+    printer_id: UUID | None = None
+    spool_id: UUID | None = None
+    material_id: UUID | None = None
+    filament_used: Decimal  # grams
+    jobs: int
+
+
+usage_list = ResponseAdapter(List[PrintJobUsage], exclude_unset=True)
+
+
+@router.post("/events", status_code=status.HTTP_202_ACCEPTED)
+async def ingest_print_job_events(
+    batch: PrintJobEvents,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Report print job start / progress / finish events.
+
+    Events are queued and written in batches shortly after, so the
+    response only confirms they were accepted. Finishing, failing or
+    cancelling a job subtracts its ``filament_used`` from its spool.
+    Events about printers or spools of other users are dropped. Answers 503
+    when the queue is full; retry after a short delay.
+    """
+    received = datetime.now(timezone.utc)
+    events = [
+        {**event.model_dump(), "timestamp": event.timestamp.astimezone(timezone.utc) if event.timestamp else received}
+        for event in batch.events
+    ]
+    try:
+        print_job_ingest.submit(current_user.id, current_user.role == UserRole.ADMIN, events)
+    except IngestQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Print job event queue is full, retry later",
+            headers={"Retry-After": "1"}
+        )
+    return {"accepted": len(events)}
+
+
+@router.get("/export")
+async def export_print_jobs(
+    request: Request,
+    format: ExportFormat = ExportFormat.NDJSON,
+    printer_id: UUID | None = None,
+    spool_id: UUID | None = None,
+    status: PrintJobStatus | None = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stream all visible print jobs as NDJSON or CSV"""
+    query = select(*PrintJob.__table__.c)
+
+    # Non-admin users can only see their own print jobs
+    if current_user.role != UserRole.ADMIN:
+        query = query.where(PrintJob.user_id == current_user.id)
+
+    if printer_id:
+        query = query.where(PrintJob.printer_id == printer_id)
+    if spool_id:
+        query = query.where(PrintJob.spool_id == spool_id)
+    if status:
+        query = query.where(PrintJob.status == status)
+
+    return export_response(request, query.order_by(PrintJob.created_at, PrintJob.id), format, "print_jobs")
+
+
+@router.get("/usage", response_model=List[PrintJobUsage], response_model_exclude_unset=True)
+async def read_print_job_usage(
+    since: date | None = None,
+    until: date | None = None,
+    interval: UsageInterval = UsageInterval.DAY,
+    group_by: Optional[List[UsageGroup]] = Query(None),
+    printer_id: UUID | None = None,
+    spool_id: UUID | None = None,
+    material_id: UUID | None = None,
+    user_id: UUID | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Filament used by finished jobs per day, week or month of their end.
+
+    ``since`` and ``until`` are inclusive days (UTC). Totals can be split by
+    printer, spool and/or material (``group_by``, repeatable). Read from the
+    daily rollup, never from the jobs themselves. Non-admins only see their
+    own usage; admins see everyone's unless ``user_id`` is given.
+    """
+    usage = PrintJobDailyUsage
+    if interval == UsageInterval.DAY:
+        period = usage.day
+    else:
+        period = cast(func.date_trunc(interval.value, cast(usage.day, DateTime)), Date)
+    groups = [getattr(usage, f"{group.value}_id") for group in dict.fromkeys(group_by or [])]
+    query = select(
+        period.label("period"),
+        *groups,
+        func.sum(usage.filament_used).label("filament_used"),
+        func.sum(usage.jobs).label("jobs"),
+    )
+
+    if current_user.role != UserRole.ADMIN:
+        query = query.where(usage.user_id == current_user.id)
+    elif user_id is not None:
+        query = query.where(usage.user_id == user_id)
+    if since is not None:
+        query = query.where(usage.day >= since)
+    if until is not None:
+        query = query.where(usage.day <= until)
+    if printer_id is not None:
+        query = query.where(usage.printer_id == printer_id)
+    if spool_id is not None:
+        query = query.where(usage.spool_id == spool_id)
+    if material_id is not None:
+        query = query.where(usage.material_id == material_id)
+
+    query = query.group_by(period, *groups).order_by(period, *groups)
+    rows = [row._asdict() for row in (await db.execute(query)).all()]
+    return usage_list.render(rows)
+
+
+@router.get("/{job_id}", response_model=PrintJobResponse)
+async def read_print_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get a specific print job"""
+    result = await db.execute(select(PrintJob).where(PrintJob.id == job_id))
+    print_job = result.scalar_one_or_none()
+
+    if print_job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Print job not found"
+        )
+
+    # Non-admin users can only see their own print jobs
+    if current_user.role != UserRole.ADMIN and print_job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+    return print_job
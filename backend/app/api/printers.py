@@ -3,17 +3,19 @@ Printers API routes
 """
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 from pydantic import BaseModel
 from uuid import UUID
+from datetime import datetime
 
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..responses import ResponseAdapter
 from ..models.printer import Printer, PrinterStatus
 from ..models.user import User, UserRole
 from ..auth.auth import get_current_active_user
+from .pagination import Paginator
 
 router = APIRouter()
 
@@ -43,23 +45,29 @@ class PrinterResponse(PrinterBase):
     id: UUID
     user_id: UUID
     status: PrinterStatus
-    created_at: str
-    updated_at: str
+    created_at: datetime
+    updated_at: datetime
 
     class Config:
         from_attributes = True
 
 
+printer_list = ResponseAdapter(List[PrinterResponse])
+
+
 @router.get("/", response_model=List[PrinterResponse])
 async def read_printers(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
     status: PrinterStatus | None = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all printers with optional filtering"""
-    query = select(Printer).options(selectinload(Printer.user))
+    """Get all printers with optional filtering (pass `cursor` for keyset paging)"""
+    query = select(Printer)
     
     # Non-admin users can only see their own printers
     if current_user.role != UserRole.ADMIN:
@@ -68,10 +76,10 @@ async def read_printers(
     if status:
         query = query.where(Printer.status == status)
     
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    printers = result.scalars().all()
-    return printers
+    page = Paginator(Printer, cursor, skip, limit)
+    result = await db.execute(page.apply(query))
+    printers = page.finish(result.scalars().all(), request, response)
+    return printer_list.render(printers, response)
 
 
 @router.post("/", response_model=PrinterResponse)
@@ -92,15 +100,11 @@ async def create_printer(
 @router.get("/{printer_id}", response_model=PrinterResponse)
 async def read_printer(
     printer_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific printer"""
-    result = await db.execute(
-        select(Printer)
-        .options(selectinload(Printer.user))
-        .where(Printer.id == printer_id)
-    )
+    result = await db.execute(select(Printer).where(Printer.id == printer_id))
     printer = result.scalar_one_or_none()
     
     if printer is None:
@@ -0,0 +1,149 @@
+"""
+Search API routes
+"""
+
+import re
+from enum import Enum
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from sqlalchemy import func, literal, literal_column, null, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_read_db
+from ..models.filament import Filament
+from ..models.manufacturer import Manufacturer
+from ..models.material import Material
+from ..models.spool import Spool
+from ..models.user import User, UserRole
+from ..auth.auth import get_current_active_user
+from ..responses import ResponseAdapter
+
+router = APIRouter()
+
+
+class SearchType(str, Enum):
+    FILAMENT = "filament"
+    MANUFACTURER = "manufacturer"
+    MATERIAL = "material"
+    SPOOL = "spool"
+
+
+class SearchResult(BaseModel):
+    type: SearchType
+    id: UUID
+    title: str
+    subtitle: Optional[str] = None
+    rank: float
+
+
+search_results = ResponseAdapter(List[SearchResult])
+
+
+def _notes_vector(notes):
+    # Must match the expression of idx_spools_notes_fts
+    return func.to_tsvector(literal_column("'simple'"), func.coalesce(notes, literal_column("''")))
+
+
+def _prefix_tsquery(q: str) -> Optional[str]:
+    """``"red pla"`` -> ``"red & pla:*"``; None when q has no words.
+
+    Only the word being typed is a prefix: prefix matches merge the posting
+    lists of every lexeme they cover, which is far slower for common words.
+    """
+    words = re.findall(r"\w+", q.lower())
+    if not words:
+        return None
+    return " & ".join(words[:-1] + [f"{words[-1]}:*"])
+
+
+def _fuzzy(column, q: str):
+    # column %> q is word_similarity(q, column) above the pg_trgm threshold,
+    # written column-first so the trigram index can serve it
+    return column.op("%>")(q)
+
+
+def _name_branch(type_: SearchType, model, q: str, limit: int, subtitle=None):
+    rank = func.word_similarity(q, model.name).label("rank")
+    return (
+        select(
+            literal(type_.value).label("type"),
+            model.id,
+            model.name.label("title"),
+            (subtitle if subtitle is not None else null()).label("subtitle"),
+            rank,
+        )
+        .where(_fuzzy(model.name, q))
+        .order_by(rank.desc())
+        .limit(limit)
+    )
+
+
+def _spool_branch(q: str, current_user: User, limit: int):
+    tsquery = _prefix_tsquery(q)
+    conditions = [_fuzzy(Spool.color, q), _fuzzy(Spool.location, q)]
+    if tsquery is not None:
+        query = func.to_tsquery(literal_column("'simple'"), tsquery)
+        conditions.append(_notes_vector(Spool.notes).op("@@")(query))
+
+    ranks = [
+        func.word_similarity(q, func.coalesce(Spool.color, "")),
+        func.word_similarity(q, func.coalesce(Spool.location, "")),
+    ]
+    if tsquery is not None:
+        ranks.append(func.ts_rank(_notes_vector(Spool.notes), query))
+    rank = func.greatest(*ranks).label("rank")
+
+    # Ranked before the limit, so the best matches are kept however many
+    # spools a common word matches
+    candidates = (
+        select(Spool.id, Spool.color, Spool.hex_color, Spool.location, rank)
+        .where(or_(*conditions))
+        .order_by(rank.desc())
+    )
+    # Non-admin users can only see their own spools
+    if current_user.role != UserRole.ADMIN:
+        candidates = candidates.where(Spool.user_id == current_user.id)
+    candidates = candidates.limit(limit).subquery()
+
+    return select(
+        literal(SearchType.SPOOL.value).label("type"),
+        candidates.c.id,
+        func.coalesce(candidates.c.color, candidates.c.hex_color, "").label("title"),
+        candidates.c.location.label("subtitle"),
+        candidates.c.rank,
+    )
+
+
+@router.get("/", response_model=List[SearchResult])
+async def search(
+    q: str = Query(..., min_length=2, max_length=100),
+    types: Optional[List[SearchType]] = Query(None, alias="type"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Ranked fuzzy search over filaments, manufacturers, materials and spools.
+
+    Names, spool colors and locations match by trigram similarity, so
+    typos and partial words still match; spool notes match by word prefix.
+    Everything runs as a single UNION ALL query.
+    """
+    q = q.strip()
+    types = set(types or SearchType)
+    branches = []
+    if SearchType.FILAMENT in types:
+        manufacturer = select(Manufacturer.name).where(Manufacturer.id == Filament.manufacturer_id).scalar_subquery()
+        branches.append(_name_branch(SearchType.FILAMENT, Filament, q, limit, subtitle=manufacturer))
+    if SearchType.MANUFACTURER in types:
+        branches.append(_name_branch(SearchType.MANUFACTURER, Manufacturer, q, limit))
+    if SearchType.MATERIAL in types:
+        branches.append(_name_branch(SearchType.MATERIAL, Material, q, limit))
+    if SearchType.SPOOL in types:
+        branches.append(_spool_branch(q, current_user, limit))
+
+    results = union_all(*(branch.subquery().select() for branch in branches)).subquery()
+    rows = await db.execute(select(results).order_by(results.c.rank.desc()).limit(limit))
+    return search_results.render([row._asdict() for row in rows])
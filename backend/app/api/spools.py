@@ -2,23 +2,40 @@
 Spools API routes
 """
 
+import uuid
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from pydantic import BaseModel
+from sqlalchemy import Select, and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from pydantic import BaseModel, Field
 from uuid import UUID
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime
 
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..responses import ResponseAdapter
+from ..models.filament import Filament
 from ..models.spool import Spool
 from ..models.user import User, UserRole
 from ..auth.auth import get_current_active_user
+from .expand import ExpandableResponse, expand_options, response_columns
+from .export import ExportFormat, export_response
+from .filaments import FilamentResponse
+from .pagination import Paginator
+from .printers import PrinterResponse
 
 router = APIRouter()
 
+# Relations that can be requested with ?expand=
+EXPANDABLE = {
+    "filament": (Spool.filament,),
+    "filament.manufacturer": (Spool.filament, Filament.manufacturer),
+    "filament.material": (Spool.filament, Filament.material),
+    "printer": (Spool.printer,),
+}
+
 
 class SpoolBase(BaseModel):
     filament_id: UUID
@@ -61,34 +78,73 @@ class SpoolUpdate(BaseModel):
     is_active: bool | None = None
 
 
-class SpoolResponse(SpoolBase):
+class SpoolConsume(BaseModel):
+    amount: Decimal = Field(gt=0, max_digits=8, decimal_places=2)  # grams
+    deactivate_when_empty: bool = False
+
+
+class SpoolResponse(SpoolBase, ExpandableResponse):
     id: UUID
     user_id: UUID
     printer_id: UUID | None = None
-    created_at: str
-    updated_at: str
+    created_at: datetime
+    updated_at: datetime
+    filament: FilamentResponse | None = None
+    printer: PrinterResponse | None = None
 
     class Config:
         from_attributes = True
 
 
-@router.get("/", response_model=List[SpoolResponse])
-async def read_spools(
-    skip: int = 0,
-    limit: int = 100,
-    filament_id: UUID | None = None,
-    printer_id: UUID | None = None,
-    is_active: bool | None = None,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    """Get all spools with optional filtering"""
-    query = select(Spool).options(
-        selectinload(Spool.filament),
-        selectinload(Spool.user),
-        selectinload(Spool.printer)
-    )
-    
+# Largest batch accepted by the bulk endpoints; keeps a multi-row INSERT
+# well under the 32767 bind parameter limit
+BULK_MAX_ITEMS = 1000
+
+
+class BulkError(BaseModel):
+    index: int
+    detail: str
+
+
+class SpoolBulkCreate(BaseModel):
+    items: List[SpoolCreate] = Field(max_length=BULK_MAX_ITEMS)
+    atomic: bool = False
+
+
+class SpoolBulkUpdateItem(SpoolUpdate):
+    id: UUID
+
+
+class SpoolBulkUpdate(BaseModel):
+    items: List[SpoolBulkUpdateItem] = Field(max_length=BULK_MAX_ITEMS)
+    atomic: bool = False
+
+
+class SpoolBulkDelete(BaseModel):
+    ids: List[UUID] = Field(max_length=BULK_MAX_ITEMS)
+    atomic: bool = False
+
+
+class SpoolBulkResult(BaseModel):
+    items: List[SpoolResponse]
+    errors: List[BulkError]
+
+
+class SpoolBulkDeleteResult(BaseModel):
+    deleted: List[UUID]
+    errors: List[BulkError]
+
+
+spool_list = ResponseAdapter(List[SpoolResponse], exclude_unset=True)
+
+
+def _filter_spools(
+    query: Select,
+    current_user: User,
+    filament_id: UUID | None,
+    printer_id: UUID | None,
+    is_active: bool | None
+) -> Select:
     # Non-admin users can only see their own spools
     if current_user.role != UserRole.ADMIN:
         query = query.where(Spool.user_id == current_user.id)
@@ -98,15 +154,310 @@ async def read_spools(
     if printer_id:
         query = query.where(Spool.printer_id == printer_id)
     if is_active is not None:
-        query = query.where(Spool.is_active == is_active)
+        # Literal predicate so the partial "active spools" index stays usable
+        # with generic (prepared) plans
+        query = query.where(Spool.is_active if is_active else ~Spool.is_active)
+    return query
+
+
+@router.get("/", response_model=List[SpoolResponse], response_model_exclude_unset=True)
+async def read_spools(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    filament_id: UUID | None = None,
+    printer_id: UUID | None = None,
+    is_active: bool | None = None,
+    expand: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get all spools with optional filtering (pass `cursor` for keyset paging)"""
+    if expand:
+        query = select(Spool).options(*expand_options(expand, EXPANDABLE))
+    else:
+        # Nothing nested requested: project the response columns only
+        query = select(*response_columns(Spool, SpoolResponse))
+    query = _filter_spools(query, current_user, filament_id, printer_id, is_active)
     
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    spools = result.scalars().all()
-    return spools
+    page = Paginator(Spool, cursor, skip, limit)
+    result = await db.execute(page.apply(query))
+    if expand:
+        rows = page.finish(result.unique().scalars().all(), request, response)
+    else:
+        rows = [row._asdict() for row in page.finish(result.all(), request, response)]
+    return spool_list.render(rows, response)
+
+
+@router.get("/export")
+async def export_spools(
+    request: Request,
+    format: ExportFormat = ExportFormat.NDJSON,
+    filament_id: UUID | None = None,
+    printer_id: UUID | None = None,
+    is_active: bool | None = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stream all visible spools as NDJSON or CSV"""
+    query = select(*response_columns(Spool, SpoolResponse))
+    query = _filter_spools(query, current_user, filament_id, printer_id, is_active)
+    return export_response(request, query.order_by(Spool.created_at, Spool.id), format, "spools")
+
+
+async def _identifier_conflicts(db: AsyncSession, items: list[tuple[int, UUID | None, str | None, str | None]]) -> dict[int, str]:
+    """Check NFC tags and QR codes of a batch, against each other and the table.
+
+    ``items`` are ``(index, spool_id, nfc_tag_id, qr_code)``; ``spool_id`` is
+    the spool being updated (None on create), so a spool keeping its own tag
+    is not a conflict. Returns error messages by index, using one query.
+    """
+    errors: dict[int, str] = {}
+    nfc_tags: dict[str, int] = {}
+    qr_codes: dict[str, int] = {}
+    for index, _, nfc_tag_id, qr_code in items:
+        if nfc_tag_id:
+            if nfc_tag_id in nfc_tags:
+                errors.setdefault(index, "Duplicate NFC tag ID in batch")
+            nfc_tags.setdefault(nfc_tag_id, index)
+        if qr_code:
+            if qr_code in qr_codes:
+                errors.setdefault(index, "Duplicate QR code in batch")
+            qr_codes.setdefault(qr_code, index)
+    if not nfc_tags and not qr_codes:
+        return errors
+
+    result = await db.execute(
+        select(Spool.id, Spool.nfc_tag_id, Spool.qr_code).where(
+            or_(Spool.nfc_tag_id.in_(list(nfc_tags)), Spool.qr_code.in_(list(qr_codes)))
+        )
+    )
+    taken_nfc_tags, taken_qr_codes = {}, {}
+    for spool_id, nfc_tag_id, qr_code in result:
+        taken_nfc_tags[nfc_tag_id] = spool_id
+        taken_qr_codes[qr_code] = spool_id
+    for index, spool_id, nfc_tag_id, qr_code in items:
+        if nfc_tag_id and taken_nfc_tags.get(nfc_tag_id, spool_id) != spool_id:
+            errors.setdefault(index, "NFC tag ID already exists")
+        if qr_code and taken_qr_codes.get(qr_code, spool_id) != spool_id:
+            errors.setdefault(index, "QR code already exists")
+    return errors
 
 
-@router.post("/", response_model=SpoolResponse)
+async def _missing_filaments(db: AsyncSession, filament_ids: dict[int, UUID]) -> dict[int, str]:
+    """Indexes of batch items pointing at filaments that do not exist"""
+    if not filament_ids:
+        return {}
+    result = await db.execute(select(Filament.id).where(Filament.id.in_(list(set(filament_ids.values())))))
+    found = set(result.scalars())
+    return {index: "Filament not found" for index, filament_id in filament_ids.items() if filament_id not in found}
+
+
+def _bulk_errors(errors: dict[int, str]) -> List[BulkError]:
+    return [BulkError(index=index, detail=detail) for index, detail in sorted(errors.items())]
+
+
+def _reject_batch(errors: dict[int, str]):
+    # Used for atomic batches: nothing is written if any item failed
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=[error.model_dump() for error in _bulk_errors(errors)]
+    )
+
+
+@router.post("/bulk", response_model=SpoolBulkResult, response_model_exclude_unset=True)
+async def create_spools_bulk(
+    batch: SpoolBulkCreate,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Create many spools in one transaction.
+
+    Invalid items are reported in ``errors`` by index and the rest are
+    created, unless ``atomic`` is set, in which case any error rejects the
+    whole batch with 409.
+    """
+    items = batch.items
+    errors = await _missing_filaments(db, {index: item.filament_id for index, item in enumerate(items)})
+    conflicts = await _identifier_conflicts(
+        db, [(index, None, item.nfc_tag_id, item.qr_code) for index, item in enumerate(items)]
+    )
+    for index, detail in conflicts.items():
+        errors.setdefault(index, detail)
+    if errors and batch.atomic:
+        _reject_batch(errors)
+
+    rows = {}
+    for index, item in enumerate(items):
+        if index not in errors:
+            rows[index] = {"id": uuid.uuid4(), "user_id": current_user.id, **item.model_dump()}
+
+    created = {}
+    if rows:
+        # DO NOTHING covers tags claimed by a concurrent request since the check
+        result = await db.execute(
+            insert(Spool.__table__)
+            .on_conflict_do_nothing()
+            .returning(*response_columns(Spool, SpoolResponse)),
+            list(rows.values())
+        )
+        created = {row.id: row._asdict() for row in result}
+        for index, row in rows.items():
+            if row["id"] not in created:
+                errors[index] = "NFC tag ID or QR code already exists"
+        if errors and batch.atomic:
+            await db.rollback()
+            _reject_batch(errors)
+    await db.commit()
+    # One activity log entry per spool
+    request.state.resource_ids = list(created)
+
+    return {
+        "items": [created[row["id"]] for row in rows.values() if row["id"] in created],
+        "errors": _bulk_errors(errors)
+    }
+
+
+async def _update_spool(db: AsyncSession, spool_id: UUID, update_data: dict):
+    if update_data:
+        await db.execute(
+            update(Spool)
+            .where(Spool.id == spool_id)
+            .values(**update_data)
+            .execution_options(synchronize_session=False)
+        )
+
+
+@router.patch("/bulk", response_model=SpoolBulkResult, response_model_exclude_unset=True)
+async def update_spools_bulk(
+    batch: SpoolBulkUpdate,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Update many spools in one transaction; only the fields given per item change.
+
+    Failing items are reported in ``errors`` by index, or reject the whole
+    batch with 409 when ``atomic`` is set, as on create.
+    """
+    items = batch.items
+    result = await db.execute(
+        select(Spool.id, Spool.user_id).where(Spool.id.in_([item.id for item in items])).with_for_update()
+    )
+    owners = dict(result.all())
+
+    errors: dict[int, str] = {}
+    seen = set()
+    for index, item in enumerate(items):
+        if item.id in seen:
+            errors[index] = "Duplicate spool ID in batch"
+        elif item.id not in owners:
+            errors[index] = "Spool not found"
+        # Non-admin users can only update their own spools
+        elif current_user.role != UserRole.ADMIN and owners[item.id] != current_user.id:
+            errors[index] = "Not enough permissions"
+        seen.add(item.id)
+
+    changes = {
+        index: item.model_dump(exclude_unset=True, exclude={"id"})
+        for index, item in enumerate(items) if index not in errors
+    }
+    missing = await _missing_filaments(db, {
+        index: update_data["filament_id"]
+        for index, update_data in changes.items() if update_data.get("filament_id")
+    })
+    conflicts = await _identifier_conflicts(db, [
+        (index, items[index].id, update_data.get("nfc_tag_id"), update_data.get("qr_code"))
+        for index, update_data in changes.items()
+    ])
+    for index, detail in {**conflicts, **missing}.items():
+        errors.setdefault(index, detail)
+    if errors and batch.atomic:
+        _reject_batch(errors)
+
+    pending = [index for index in changes if index not in errors]
+    try:
+        async with db.begin_nested():
+            for index in pending:
+                await _update_spool(db, items[index].id, changes[index])
+        updated_ids = [items[index].id for index in pending]
+    except IntegrityError:
+        # A tag or code claimed by a concurrent request since the check
+        if batch.atomic:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Batch conflicts with a concurrent change"
+            )
+        # Retry item by item, each in its own savepoint, so only the
+        # conflicting ones fail
+        updated_ids = []
+        for index in pending:
+            try:
+                async with db.begin_nested():
+                    await _update_spool(db, items[index].id, changes[index])
+                updated_ids.append(items[index].id)
+            except IntegrityError:
+                errors[index] = "NFC tag ID or QR code already exists"
+    # Re-read: updated_at is set by the database
+    result = await db.execute(
+        select(*response_columns(Spool, SpoolResponse)).where(Spool.id.in_(updated_ids))
+    )
+    updated = {row.id: row._asdict() for row in result}
+    await db.commit()
+    request.state.resource_ids = updated_ids
+
+    return {
+        "items": [updated[spool_id] for spool_id in updated_ids],
+        "errors": _bulk_errors(errors)
+    }
+
+
+@router.delete("/bulk", response_model=SpoolBulkDeleteResult)
+async def delete_spools_bulk(
+    batch: SpoolBulkDelete,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Delete many spools in one transaction"""
+    result = await db.execute(
+        select(Spool.id, Spool.user_id).where(Spool.id.in_(batch.ids)).with_for_update()
+    )
+    owners = dict(result.all())
+
+    errors: dict[int, str] = {}
+    deletable = []
+    seen = set()
+    for index, spool_id in enumerate(batch.ids):
+        if spool_id in seen:
+            errors[index] = "Duplicate spool ID in batch"
+        elif spool_id not in owners:
+            errors[index] = "Spool not found"
+        # Non-admin users can only delete their own spools
+        elif current_user.role != UserRole.ADMIN and owners[spool_id] != current_user.id:
+            errors[index] = "Not enough permissions"
+        else:
+            deletable.append(spool_id)
+        seen.add(spool_id)
+    if errors and batch.atomic:
+        _reject_batch(errors)
+
+    if deletable:
+        await db.execute(
+            delete(Spool)
+            .where(Spool.id.in_(deletable))
+            .execution_options(synchronize_session=False)
+        )
+    await db.commit()
+    request.state.resource_ids = deletable
+
+    return {"deleted": deletable, "errors": _bulk_errors(errors)}
+
+
+@router.post("/", response_model=SpoolResponse, response_model_exclude_unset=True)
 async def create_spool(
     spool: SpoolCreate,
     db: AsyncSession = Depends(get_db),
@@ -138,20 +489,17 @@ async def create_spool(
     return db_spool
 
 
-@router.get("/{spool_id}", response_model=SpoolResponse)
+@router.get("/{spool_id}", response_model=SpoolResponse, response_model_exclude_unset=True)
 async def read_spool(
     spool_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    expand: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific spool"""
     result = await db.execute(
         select(Spool)
-        .options(
-            selectinload(Spool.filament),
-            selectinload(Spool.user),
-            selectinload(Spool.printer)
-        )
+        .options(*expand_options(expand, EXPANDABLE))
         .where(Spool.id == spool_id)
     )
     spool = result.scalar_one_or_none()
@@ -172,7 +520,7 @@ async def read_spool(
     return spool
 
 
-@router.put("/{spool_id}", response_model=SpoolResponse)
+@router.put("/{spool_id}", response_model=SpoolResponse, response_model_exclude_unset=True)
 async def update_spool(
     spool_id: UUID,
     spool_update: SpoolUpdate,
@@ -207,6 +555,43 @@ async def update_spool(
     return spool
 
 
+@router.post("/{spool_id}/consume", response_model=SpoolResponse, response_model_exclude_unset=True)
+async def consume_spool(
+    spool_id: UUID,
+    consume: SpoolConsume,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Subtract used filament from a spool's remaining weight.
+
+    The decrement happens in a single UPDATE, so concurrent reports (two
+    printers, a scale and a slicer) all count. The remaining weight stops
+    at zero; with ``deactivate_when_empty`` an emptied spool is also marked
+    inactive.
+    """
+    remaining_weight = func.greatest(Spool.remaining_weight - consume.amount, 0)
+    values = {"remaining_weight": remaining_weight}
+    if consume.deactivate_when_empty:
+        values["is_active"] = and_(Spool.is_active, remaining_weight > 0)
+
+    query = update(Spool.__table__).where(Spool.id == spool_id)
+    # Non-admin users can only update their own spools
+    if current_user.role != UserRole.ADMIN:
+        query = query.where(Spool.user_id == current_user.id)
+    result = await db.execute(query.values(values).returning(*response_columns(Spool, SpoolResponse)))
+    spool = result.one_or_none()
+
+    if spool is None:
+        exists = await db.scalar(select(Spool.id).where(Spool.id == spool_id))
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN if exists else status.HTTP_404_NOT_FOUND,
+            detail="Not enough permissions" if exists else "Spool not found"
+        )
+
+    await db.commit()
+    return spool._asdict()
+
+
 @router.delete("/{spool_id}")
 async def delete_spool(
     spool_id: UUID,
@@ -236,20 +621,17 @@ async def delete_spool(
     return {"message": "Spool deleted successfully"}
 
 
-@router.get("/nfc/{nfc_tag_id}", response_model=SpoolResponse)
+@router.get("/nfc/{nfc_tag_id}", response_model=SpoolResponse, response_model_exclude_unset=True)
 async def read_spool_by_nfc(
     nfc_tag_id: str,
-    db: AsyncSession = Depends(get_db),
+    expand: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a spool by NFC tag ID"""
     result = await db.execute(
         select(Spool)
-        .options(
-            selectinload(Spool.filament),
-            selectinload(Spool.user),
-            selectinload(Spool.printer)
-        )
+        .options(*expand_options(expand, EXPANDABLE))
         .where(Spool.nfc_tag_id == nfc_tag_id)
     )
     spool = result.scalar_one_or_none()
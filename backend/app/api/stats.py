@@ -0,0 +1,119 @@
+"""
+Inventory statistics API routes
+"""
+
+from decimal import Decimal
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_read_db
+from ..responses import ResponseAdapter
+from ..models.filament import Filament
+from ..models.manufacturer import Manufacturer
+from ..models.material import Material
+from ..models.spool_stats import SpoolStats
+from ..models.user import User, UserRole
+from ..auth.auth import get_current_active_user
+
+router = APIRouter()
+
+# An active spool is nearly empty below this share of its weight; the
+# spool_stats triggers (migration 0008) count with the same value
+NEARLY_EMPTY_FRACTION = Decimal("0.1")
+
+TOTALS = (
+    func.coalesce(func.sum(SpoolStats.spools), 0).label("spools"),
+    func.coalesce(func.sum(SpoolStats.active_spools), 0).label("active_spools"),
+    func.coalesce(func.sum(SpoolStats.remaining_weight), 0).label("remaining_weight"),
+    func.coalesce(func.sum(SpoolStats.purchase_value), 0).label("purchase_value"),
+    func.coalesce(func.sum(SpoolStats.nearly_empty), 0).label("nearly_empty"),
+)
+
+
+class InventoryTotals(BaseModel):
+    spools: int
+    active_spools: int
+    remaining_weight: Decimal  # grams left on active spools
+    purchase_value: Decimal  # purchase price of active spools
+    nearly_empty: int  # active spools below NEARLY_EMPTY_FRACTION of their weight
+
+
+class MaterialTotals(InventoryTotals):
+    material_id: UUID | None = None
+    material: str | None = None
+
+
+class ManufacturerTotals(InventoryTotals):
+    manufacturer_id: UUID | None = None
+    manufacturer: str | None = None
+
+
+material_totals = ResponseAdapter(List[MaterialTotals])
+manufacturer_totals = ResponseAdapter(List[ManufacturerTotals])
+
+
+def _scope(query: Select, current_user: User, user_id: UUID | None) -> Select:
+    """Non-admins see their own inventory; admins everyone's unless ``user_id``"""
+    if current_user.role != UserRole.ADMIN:
+        return query.where(SpoolStats.user_id == current_user.id)
+    if user_id is not None:
+        return query.where(SpoolStats.user_id == user_id)
+    return query
+
+
+@router.get("/", response_model=InventoryTotals)
+async def read_inventory_totals(
+    user_id: UUID | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Spool counts, remaining grams, value and nearly-empty spools.
+
+    Read from per-filament aggregates that the database keeps current on
+    every spool write, so the cost does not depend on the number of spools.
+    """
+    query = _scope(select(*TOTALS), current_user, user_id)
+    return (await db.execute(query)).one()._asdict()
+
+
+@router.get("/materials", response_model=List[MaterialTotals])
+async def read_material_totals(
+    user_id: UUID | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Inventory totals per material, most grams remaining first"""
+    query = (
+        select(Material.id.label("material_id"), Material.name.label("material"), *TOTALS)
+        .select_from(SpoolStats)
+        .outerjoin(Filament, Filament.id == SpoolStats.filament_id)
+        .outerjoin(Material, Material.id == Filament.material_id)
+        .group_by(Material.id, Material.name)
+        .order_by(func.sum(SpoolStats.remaining_weight).desc(), Material.name)
+    )
+    query = _scope(query, current_user, user_id)
+    return material_totals.render([row._asdict() for row in (await db.execute(query)).all()])
+
+
+@router.get("/manufacturers", response_model=List[ManufacturerTotals])
+async def read_manufacturer_totals(
+    user_id: UUID | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Inventory totals per manufacturer, most spools first"""
+    query = (
+        select(Manufacturer.id.label("manufacturer_id"), Manufacturer.name.label("manufacturer"), *TOTALS)
+        .select_from(SpoolStats)
+        .outerjoin(Filament, Filament.id == SpoolStats.filament_id)
+        .outerjoin(Manufacturer, Manufacturer.id == Filament.manufacturer_id)
+        .group_by(Manufacturer.id, Manufacturer.name)
+        .order_by(func.sum(SpoolStats.spools).desc(), Manufacturer.name)
+    )
+    query = _scope(query, current_user, user_id)
+    return manufacturer_totals.render([row._asdict() for row in (await db.execute(query)).all()])
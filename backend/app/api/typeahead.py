@@ -0,0 +1,59 @@
+"""
+Typeahead API routes
+"""
+
+from enum import Enum
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_read_db
+from ..responses import ResponseAdapter
+from ..models.user import User
+from ..auth.auth import get_current_active_user
+from ..services.typeahead import KINDS, typeahead_index
+
+router = APIRouter()
+
+
+class TypeaheadType(str, Enum):
+    MANUFACTURER = "manufacturer"
+    MATERIAL = "material"
+    FILAMENT = "filament"
+
+
+class TypeaheadEntry(BaseModel):
+    type: TypeaheadType
+    id: UUID
+    name: str
+    manufacturer_id: UUID | None = None
+    manufacturer: str | None = None
+    material_id: UUID | None = None
+    material: str | None = None
+
+
+typeahead_entries = ResponseAdapter(List[TypeaheadEntry], exclude_unset=True)
+
+
+@router.get("/", response_model=List[TypeaheadEntry], response_model_exclude_unset=True)
+async def typeahead(
+    q: str = "",
+    types: Optional[List[TypeaheadType]] = Query(None, alias="type"),
+    manufacturer_id: UUID | None = None,
+    material_id: UUID | None = None,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Names starting with ``q`` (any word of the name), for form pickers.
+
+    Answered from an in-memory index, in manufacturer, material, filament
+    order. Filaments can be narrowed to a manufacturer and/or material.
+    """
+    await typeahead_index.ensure(db)
+    kinds = tuple(kind for kind in KINDS if types is None or kind in types)
+    results = typeahead_index.search(q, kinds, limit, manufacturer_id=manufacturer_id, material_id=material_id)
+    return typeahead_entries.render(results)
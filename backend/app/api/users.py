@@ -3,15 +3,19 @@ Users API routes
 """
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import BaseModel
 from uuid import UUID
+from datetime import datetime
 
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..responses import ResponseAdapter
 from ..models.user import User, UserRole
-from ..auth.auth import get_current_active_user, get_password_hash
+from ..auth.auth import get_current_active_user, get_password_hash_async
+from ..auth.cache import notify_user_changed, principal_cache
+from .pagination import Paginator
 
 router = APIRouter()
 
@@ -36,13 +40,16 @@ class UserUpdate(BaseModel):
 
 class UserResponse(UserBase):
     id: UUID
-    created_at: str
-    updated_at: str
+    created_at: datetime
+    updated_at: datetime
 
     class Config:
         from_attributes = True
 
 
+user_list = ResponseAdapter(List[UserResponse])
+
+
 @router.get("/me", response_model=UserResponse)
 async def read_users_me(current_user: User = Depends(get_current_active_user)):
     """Get current user information"""
@@ -51,9 +58,12 @@ async def read_users_me(current_user: User = Depends(get_current_active_user)):
 
 @router.get("/", response_model=List[UserResponse])
 async def read_users(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all users (admin only)"""
@@ -63,9 +73,10 @@ async def read_users(
             detail="Not enough permissions"
         )
     
-    result = await db.execute(select(User).offset(skip).limit(limit))
-    users = result.scalars().all()
-    return users
+    page = Paginator(User, cursor, skip, limit)
+    result = await db.execute(page.apply(select(User)))
+    users = page.finish(result.scalars().all(), request, response)
+    return user_list.render(users, response)
 
 
 @router.post("/", response_model=UserResponse)
@@ -97,7 +108,7 @@ async def create_user(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -116,7 +127,7 @@ async def create_user(
 @router.get("/{user_id}", response_model=UserResponse)
 async def read_user(
     user_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific user (admin only or own user)"""
@@ -174,8 +185,10 @@ async def update_user(
     for field, value in update_data.items():
         setattr(user, field, value)
     
+    await notify_user_changed(db, user.id)
     await db.commit()
     await db.refresh(user)
+    principal_cache.invalidate_user(user.id)
     
     return user
 
@@ -209,6 +222,8 @@ async def delete_user(
         )
     
     await db.delete(user)
+    await notify_user_changed(db, user_id)
     await db.commit()
+    principal_cache.invalidate_user(user_id)
     
     return {"message": "User deleted successfully"}
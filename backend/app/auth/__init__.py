@@ -5,15 +5,21 @@ Authentication module for FilaDB
 from .auth import (
     get_password_hash,
     verify_password,
+    get_password_hash_async,
+    verify_password_async,
     create_access_token,
     get_current_user,
     get_current_active_user
 )
+from .cache import principal_cache
 
 __all__ = [
     "get_password_hash",
     "verify_password", 
+    "get_password_hash_async",
+    "verify_password_async",
     "create_access_token",
     "get_current_user",
-    "get_current_active_user"
+    "get_current_active_user",
+    "principal_cache"
 ]
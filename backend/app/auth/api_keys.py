@@ -0,0 +1,129 @@
+"""
+API keys for machine clients (NFC readers, printer bridges)
+"""
+
+import hashlib
+import hmac
+import re
+import secrets
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.api_key import ApiKey
+
+API_KEY_PREFIX = "fdb"
+SCOPE_PATTERN = re.compile(r"^(\*|[a-z_-]+:(read|write|\*))$")
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+@dataclass(frozen=True)
+class ApiKeyEntry:
+    id: UUID
+    user_id: UUID
+    key_hash: str
+    scopes: frozenset
+    expires_at: Optional[float]
+
+
+def hash_api_key(key: str) -> str:
+    """Keyed SHA-256 of an API key; cheap to verify, useless without SECRET_KEY"""
+    return hmac.new(settings.SECRET_KEY.encode(), key.encode(), hashlib.sha256).hexdigest()
+
+
+def generate_api_key() -> tuple[str, str]:
+    """Return ``(prefix, full_key)`` for a new key"""
+    prefix = secrets.token_hex(6)
+    return prefix, f"{API_KEY_PREFIX}_{prefix}_{secrets.token_urlsafe(32)}"
+
+
+def parse_prefix(key: str) -> Optional[str]:
+    parts = key.split("_", 2)
+    if len(parts) != 3 or parts[0] != API_KEY_PREFIX:
+        return None
+    return parts[1]
+
+
+def looks_like_api_key(token: str) -> bool:
+    return token.startswith(API_KEY_PREFIX + "_")
+
+
+def scope_allows(scopes: frozenset, resource: str, method: str) -> bool:
+    """Check ``resource:read|write`` scopes against a request"""
+    action = "read" if method in READ_METHODS else "write"
+    return bool(scopes & {"*", f"{resource}:*", f"{resource}:{action}"})
+
+
+class ApiKeyIndex:
+    """Per-worker index of API keys by their public prefix.
+
+    Entries (including "no such key") live for ``ttl`` seconds, so keys
+    revoked on another worker stop working within that window. Keys
+    created or deleted on this worker are applied immediately.
+    """
+
+    max_negative_entries = 10000
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict[str, tuple[Optional[ApiKeyEntry], float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def put(self, prefix: str, entry: Optional[ApiKeyEntry]):
+        if entry is None and len(self._entries) >= self.max_negative_entries:
+            self._entries.pop(prefix, None)
+            return
+        self._entries[prefix] = (entry, time.monotonic() + self.ttl)
+
+    def discard(self, prefix: str):
+        self._entries.pop(prefix, None)
+
+    async def lookup(self, db: AsyncSession, prefix: str) -> Optional[ApiKeyEntry]:
+        cached = self._entries.get(prefix)
+        if cached is not None and cached[1] > time.monotonic():
+            self.hits += 1
+            return cached[0]
+        self.misses += 1
+        result = await db.execute(select(ApiKey).where(ApiKey.prefix == prefix))
+        api_key = result.scalar_one_or_none()
+        entry = None
+        if api_key is not None:
+            entry = entry_from_model(api_key)
+        self.put(prefix, entry)
+        return entry
+
+    async def verify(self, db: AsyncSession, key: str) -> Optional[ApiKeyEntry]:
+        """Return the entry for a valid, unexpired key"""
+        prefix = parse_prefix(key)
+        if prefix is None:
+            return None
+        entry = await self.lookup(db, prefix)
+        if entry is None or not hmac.compare_digest(entry.key_hash, hash_api_key(key)):
+            return None
+        if entry.expires_at is not None and entry.expires_at <= time.time():
+            return None
+        return entry
+
+    def stats(self) -> dict:
+        return {"keys_cached": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def entry_from_model(api_key: ApiKey) -> ApiKeyEntry:
+    expires_at: Optional[datetime] = api_key.expires_at
+    return ApiKeyEntry(
+        id=api_key.id,
+        user_id=api_key.user_id,
+        key_hash=api_key.key_hash,
+        scopes=frozenset(api_key.scopes or []),
+        expires_at=expires_at.timestamp() if expires_at else None,
+    )
+
+
+api_key_index = ApiKeyIndex(ttl=settings.AUTH_CACHE_TTL_SECONDS)
@@ -4,8 +4,8 @@ Authentication utilities
 
 from datetime import datetime, timedelta
 from typing import Optional
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,12 +14,16 @@ from sqlalchemy import select
 from ..config import settings
 from ..database import get_db
 from ..models.user import User
+from .api_keys import api_key_index, looks_like_api_key, scope_allows
+from .cache import principal_cache
+from .hashing import password_hasher
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# JWT token scheme
-security = HTTPBearer()
+# JWT token scheme; API keys may also be sent as a bearer token
+security = HTTPBearer(auto_error=False)
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -32,6 +36,16 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop"""
+    return await password_hasher.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -40,37 +54,92 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "type": "access"})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
+async def _get_api_key_user(
+    request: Request,
+    key: str,
+    db: AsyncSession,
+    credentials_exception: HTTPException
+) -> User:
+    """Resolve an API key to its owner and enforce the key's scopes"""
+    entry = await api_key_index.verify(db, key)
+    if entry is None:
+        raise credentials_exception
+    
+    path_parts = request.scope["path"].split("/")
+    resource = path_parts[2] if len(path_parts) > 2 and path_parts[1] == "api" else ""
+    if not scope_allows(entry.scopes, resource, request.method):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="API key scope does not allow this request"
+        )
+    
+    user = principal_cache.get_user_by_id(entry.user_id)
+    if user is None:
+        result = await db.execute(select(User).where(User.id == entry.user_id))
+        user = result.scalar_one_or_none()
+        if user is None:
+            raise credentials_exception
+        principal_cache.set_user(user)
+    
+    request.state.api_key_id = entry.id
+    return user
+
+
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    request: Request,
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    api_key: str | None = Depends(api_key_header),
     db: AsyncSession = Depends(get_db)
 ) -> User:
-    """Get current user from JWT token"""
+    """Get current user from JWT token or API key"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+    if api_key is None and credentials is not None and looks_like_api_key(credentials.credentials):
+        api_key = credentials.credentials
+    if api_key is not None:
+        user = await _get_api_key_user(request, api_key, db, credentials_exception)
+        request.state.user_id = user.id
+        return user
     
-    # Get user from database
-    result = await db.execute(select(User).where(User.username == username))
-    user = result.scalar_one_or_none()
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authenticated"
+        )
+    
+    token = credentials.credentials
+    username = principal_cache.get_token(token)
+    if username is None:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            username: str = payload.get("sub")
+            if username is None or payload.get("type", "access") != "access":
+                raise credentials_exception
+        except JWTError:
+            raise credentials_exception
+        principal_cache.set_token(token, username, payload.get("exp"))
     
+    user = principal_cache.get_user(username)
     if user is None:
-        raise credentials_exception
+        # Get user from database
+        result = await db.execute(select(User).where(User.username == username))
+        user = result.scalar_one_or_none()
+        
+        if user is None:
+            raise credentials_exception
+        
+        principal_cache.set_user(user)
     
+    request.state.user_id = user.id
     return user
 
 
@@ -88,6 +157,6 @@ async def authenticate_user(db: AsyncSession, username: str, password: str) -> O
     
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    if not await verify_password_async(password, user.password_hash):
         return None
     return user
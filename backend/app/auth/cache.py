@@ -0,0 +1,223 @@
+"""
+In-process cache of decoded tokens and authenticated principals
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Optional
+from uuid import UUID
+
+import asyncpg
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.user import User
+
+# Channel on which user changes are announced to every worker
+INVALIDATION_CHANNEL = "filadb_principal_changed"
+
+# Seconds between liveness checks of the listening connection, and before
+# reconnecting after it was lost
+LISTEN_CHECK_INTERVAL = 10.0
+LISTEN_RETRY_DELAY = 1.0
+
+
+async def notify_user_changed(db: AsyncSession, user_id: UUID):
+    """Announce a user change; every worker drops the user once ``db`` commits"""
+    await db.execute(text("SELECT pg_notify(:channel, :user_id)"), {
+        "channel": INVALIDATION_CHANNEL,
+        "user_id": str(user_id),
+    })
+
+
+class PrincipalCache:
+    """Bounded TTL/LRU cache used by get_current_user.
+
+    Two maps are kept: decoded access tokens (token -> username) and active
+    users (username -> transient User copy). A token entry never outlives the
+    token's own ``exp`` claim. Entries are only touched from the event loop,
+    so no locking is needed.
+
+    Users changed on any worker are dropped through Postgres LISTEN/NOTIFY
+    (``listen()``). Cached users are only served while that listener is
+    connected; without it every lookup goes to the database, since a
+    change made elsewhere could not be noticed.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._tokens: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+        self._users: "OrderedDict[str, tuple[User, float]]" = OrderedDict()
+        self._usernames_by_id: dict[UUID, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.token_hits = 0
+        self.token_misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.listening = False
+        self.reconnects = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def _evict_overflow(self, entries: OrderedDict):
+        while len(entries) > self.max_size:
+            key, value = entries.popitem(last=False)
+            if entries is self._users:
+                self._usernames_by_id.pop(value[0].id, None)
+            self.evictions += 1
+
+    def get_token(self, token: str) -> Optional[str]:
+        """Return the username for a previously decoded token"""
+        entry = self._tokens.get(token)
+        if entry is None:
+            self.token_misses += 1
+            return None
+        username, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._tokens[token]
+            self.token_misses += 1
+            return None
+        self._tokens.move_to_end(token)
+        self.token_hits += 1
+        return username
+
+    def set_token(self, token: str, username: str, exp: Optional[float] = None):
+        """Remember a decoded token until min(ttl, token exp)"""
+        if not self.enabled:
+            return
+        lifetime = self.ttl
+        if exp is not None:
+            lifetime = min(lifetime, exp - time.time())
+        if lifetime <= 0:
+            return
+        self._tokens[token] = (username, time.monotonic() + lifetime)
+        self._tokens.move_to_end(token)
+        self._evict_overflow(self._tokens)
+
+    def get_user(self, username: str) -> Optional[User]:
+        """Return a cached active user, or None on miss"""
+        entry = self._users.get(username) if self.listening else None
+        if entry is None:
+            self.misses += 1
+            return None
+        user, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._drop_user(username)
+            self.misses += 1
+            return None
+        self._users.move_to_end(username)
+        self.hits += 1
+        return user
+
+    def get_user_by_id(self, user_id: UUID) -> Optional[User]:
+        """Return a cached active user by primary key, or None on miss"""
+        username = self._usernames_by_id.get(user_id)
+        if username is None:
+            self.misses += 1
+            return None
+        return self.get_user(username)
+
+    def set_user(self, user: User):
+        """Cache an active user; inactive users are never cached"""
+        if not self.enabled or not self.listening or not user.is_active:
+            return
+        # Keep a transient copy so later expiry or mutation of the
+        # session-bound instance cannot leak into other requests
+        user = User(**{
+            attr.key: getattr(user, attr.key)
+            for attr in inspect(User).column_attrs
+        })
+        previous = self._usernames_by_id.get(user.id)
+        if previous is not None and previous != user.username:
+            self._users.pop(previous, None)
+        self._users[user.username] = (user, time.monotonic() + self.ttl)
+        self._users.move_to_end(user.username)
+        self._usernames_by_id[user.id] = user.username
+        self._evict_overflow(self._users)
+
+    def _drop_user(self, username: str):
+        entry = self._users.pop(username, None)
+        if entry is not None:
+            self._usernames_by_id.pop(entry[0].id, None)
+
+    def invalidate_user(self, user_id: UUID):
+        """Drop a user after it was updated, deactivated or deleted"""
+        username = self._usernames_by_id.pop(user_id, None)
+        if username is not None:
+            self._users.pop(username, None)
+        self.invalidations += 1
+
+    def clear(self):
+        self._tokens.clear()
+        self._users.clear()
+        self._usernames_by_id.clear()
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            self.invalidate_user(UUID(payload))
+        except ValueError:
+            pass
+
+    async def listen(self):
+        """Background task applying user changes announced by any worker"""
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(settings.DB_LISTEN_URL or settings.DATABASE_URL)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(INVALIDATION_CHANNEL, self._on_notification)
+                # Changes made while nobody was listening were missed
+                self._users.clear()
+                self._usernames_by_id.clear()
+                self.listening = True
+                while True:
+                    try:
+                        await asyncio.wait_for(closed.wait(), LISTEN_CHECK_INTERVAL)
+                        break
+                    except asyncio.TimeoutError:
+                        await asyncio.wait_for(connection.execute("SELECT 1"), LISTEN_CHECK_INTERVAL)
+                print("⚠️ Principal cache listener disconnected")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Principal cache listener failed: {e}")
+            finally:
+                self.listening = False
+                self._users.clear()
+                self._usernames_by_id.clear()
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+            self.reconnects += 1
+            await asyncio.sleep(LISTEN_RETRY_DELAY)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "users_cached": len(self._users),
+            "tokens_cached": len(self._tokens),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "token_hits": self.token_hits,
+            "token_misses": self.token_misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "listening": self.listening,
+            "listener_reconnects": self.reconnects,
+        }
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
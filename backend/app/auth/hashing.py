@@ -0,0 +1,78 @@
+"""
+Bounded executor for bcrypt hashing and verification
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+
+from ..config import settings
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """Runs CPU-heavy password work off the event loop.
+
+    bcrypt releases the GIL while hashing, so a small thread pool is enough
+    to keep the loop responsive. ``max_workers`` caps how many hashes run at
+    once and ``max_queue`` caps how many more may wait; beyond that callers
+    get a 503 instead of piling up behind a login burst.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+        self.rejected = 0
+
+    def _ensure_started(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-hash"
+            )
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """Run ``func(*args)`` on the hashing pool"""
+        self._ensure_started()
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent authentication requests",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        try:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+
+    async def shutdown(self):
+        """Wait for running hashes without blocking the event loop"""
+        if self._executor is not None:
+            executor, self._executor, self._slots = self._executor, None, None
+            await run_in_threadpool(executor.shutdown, wait=True)
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
@@ -0,0 +1,169 @@
+"""
+Rotating refresh tokens
+"""
+
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from jose import JWTError, jwt
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.refresh_token import RefreshToken
+from ..models.user import User
+from .cache import principal_cache
+
+REFRESH_TOKEN_TYPE = "refresh"
+
+
+class RevocationList:
+    """In-memory view of revoked refresh tokens and token families.
+
+    Postgres stays the source of truth; this only lets a worker reject a
+    revoked token without a round trip. Entries are dropped once the token
+    they describe would have expired anyway.
+    """
+
+    def __init__(self):
+        self._tokens: dict[UUID, float] = {}
+        self._families: dict[UUID, float] = {}
+
+    def revoke_token(self, jti: UUID, expires_at: float):
+        self._tokens[jti] = expires_at
+        if len(self._tokens) % 1024 == 0:
+            self.prune()
+
+    def revoke_family(self, family_id: UUID, expires_at: float):
+        self._families[family_id] = max(expires_at, self._families.get(family_id, 0))
+
+    def is_token_revoked(self, jti: UUID) -> bool:
+        return jti in self._tokens
+
+    def is_family_revoked(self, family_id: UUID) -> bool:
+        return family_id in self._families
+
+    def prune(self):
+        now = time.time()
+        self._tokens = {k: v for k, v in self._tokens.items() if v > now}
+        self._families = {k: v for k, v in self._families.items() if v > now}
+
+    def __len__(self):
+        return len(self._tokens) + len(self._families)
+
+
+revocation_list = RevocationList()
+
+
+async def load_revocations(db: AsyncSession):
+    """Prime the revocation list with revoked tokens that have not expired"""
+    result = await db.execute(
+        select(RefreshToken.jti, RefreshToken.expires_at).where(
+            RefreshToken.revoked_at.is_not(None),
+            RefreshToken.expires_at > datetime.now(timezone.utc)
+        )
+    )
+    for jti, expires_at in result:
+        revocation_list.revoke_token(jti, expires_at.timestamp())
+
+
+async def create_refresh_token(
+    db: AsyncSession,
+    user: User,
+    family_id: Optional[UUID] = None
+) -> str:
+    """Persist and sign a new refresh token; the caller commits"""
+    jti = uuid.uuid4()
+    family_id = family_id or uuid.uuid4()
+    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    db.add(RefreshToken(jti=jti, user_id=user.id, family_id=family_id, expires_at=expires_at))
+    return jwt.encode(
+        {
+            "sub": str(user.id),
+            "jti": str(jti),
+            "fam": str(family_id),
+            "type": REFRESH_TOKEN_TYPE,
+            "exp": expires_at,
+        },
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM
+    )
+
+
+def decode_refresh_token(token: str) -> Optional[dict]:
+    """Verify signature, expiry and type; returns None for anything invalid"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        if payload.get("type") != REFRESH_TOKEN_TYPE:
+            return None
+        return {
+            "user_id": UUID(payload["sub"]),
+            "jti": UUID(payload["jti"]),
+            "family_id": UUID(payload["fam"]),
+            "exp": float(payload["exp"]),
+        }
+    except (JWTError, KeyError, ValueError):
+        return None
+
+
+async def revoke_family(db: AsyncSession, family_id: UUID, expires_at: float):
+    """Revoke every token of a login session; the caller commits"""
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    revocation_list.revoke_family(family_id, expires_at)
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Optional[tuple[User, str]]:
+    """Exchange a refresh token for its successor.
+
+    The presented token is revoked with a single conditional UPDATE, so two
+    concurrent refreshes of the same token cannot both succeed. Presenting
+    an already rotated token is treated as theft and revokes the family.
+    Returns ``(user, new_refresh_token)`` or None; the caller commits.
+    """
+    claims = decode_refresh_token(token)
+    if claims is None or revocation_list.is_family_revoked(claims["family_id"]):
+        return None
+
+    if revocation_list.is_token_revoked(claims["jti"]):
+        await revoke_family(db, claims["family_id"], claims["exp"])
+        await db.commit()
+        return None
+
+    result = await db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.jti == claims["jti"],
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > datetime.now(timezone.utc)
+        )
+        .values(revoked_at=datetime.now(timezone.utc))
+        .returning(RefreshToken.user_id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.scalar_one_or_none() is None:
+        # Unknown, expired or already rotated: burn the whole family
+        await revoke_family(db, claims["family_id"], claims["exp"])
+        await db.commit()
+        return None
+
+    user = principal_cache.get_user_by_id(claims["user_id"])
+    if user is None:
+        result = await db.execute(select(User).where(User.id == claims["user_id"]))
+        user = result.scalar_one_or_none()
+        if user is not None:
+            principal_cache.set_user(user)
+    if user is None or not user.is_active:
+        await db.rollback()
+        return None
+
+    revocation_list.revoke_token(claims["jti"], claims["exp"])
+    new_token = await create_refresh_token(db, user, family_id=claims["family_id"])
+    return user, new_token
@@ -2,32 +2,294 @@
 Database configuration and connection
 """
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+import hashlib
+import hmac
+import itertools
+import time
+import uuid
+
+import orjson
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import MetaData
+from sqlalchemy.orm import Session
+from sqlalchemy import MetaData, event, exc, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from .config import settings
 
+
+class PoolMetrics:
+    """Connection checkout counters for the current worker"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float):
+        self.checkouts += 1
+        self.wait_total += waited
+        if waited > self.wait_max:
+            self.wait_max = waited
+
+    def stats(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_total_ms": round(self.wait_total * 1000, 3),
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class _TimedCheckoutMixin:
+    """Times how long each checkout waited for (or spent opening) a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        pool_metrics.record(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class InstrumentedNullPool(_TimedCheckoutMixin, NullPool):
+    pass
+
+
+def _async_url(url: str) -> str:
+    return url.replace("postgresql://", "postgresql+asyncpg://")
+
+
+def _engine_options() -> dict:
+    """Pool and driver options built from settings"""
+    if settings.DB_PGBOUNCER_MODE:
+        # PgBouncer in transaction mode owns pooling, and a server connection
+        # may change between statements, so prepared statements must be
+        # unnamed-per-use and never cached on the client side
+        return {
+            "poolclass": InstrumentedNullPool,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            },
+        }
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    }
+
+
 # Create async engine
 engine = create_async_engine(
-    settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
+    _async_url(settings.DATABASE_URL),
     echo=settings.DEBUG,
-    future=True
+    future=True,
+    json_deserializer=orjson.loads,
+    **_engine_options()
 )
 
+# Optional read replicas, only used by sessions from get_read_db
+replica_engines = [
+    create_async_engine(
+        _async_url(url), echo=settings.DEBUG, future=True, json_deserializer=orjson.loads, **_engine_options()
+    )
+    for url in settings.DATABASE_REPLICA_URLS
+]
+
+
+# Cookie telling every worker that the client wrote recently
+LAST_WRITE_COOKIE = "filadb_last_write"
+
+
+def _last_write_signature(user_id, written_at: int) -> str:
+    message = f"{user_id}.{written_at}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def set_last_write(response: Response, user_id):
+    """Mark on the client that ``user_id`` just committed a write"""
+    written_at = int(time.time() * 1000)
+    response.set_cookie(
+        LAST_WRITE_COOKIE,
+        f"{written_at}.{_last_write_signature(user_id, written_at)}",
+        max_age=int(settings.DB_REPLICA_READ_YOUR_WRITES_SECONDS) + 1,
+        path="/api",
+        httponly=True,
+        samesite="lax",
+    )
+
+
+def wrote_recently(request: Request, user_id) -> bool:
+    """Whether the request carries a valid marker of a recent write by ``user_id``"""
+    marker = request.cookies.get(LAST_WRITE_COOKIE)
+    if not marker:
+        return False
+    written_at, _, signature = marker.partition(".")
+    if not written_at.isdigit():
+        return False
+    if not hmac.compare_digest(signature, _last_write_signature(user_id, int(written_at))):
+        return False
+    return time.time() * 1000 - int(written_at) < settings.DB_REPLICA_READ_YOUR_WRITES_SECONDS * 1000
+
+
+class ReplicaRouter:
+    """Chooses a replica for read-only sessions.
+
+    A replica is used only while its last measured lag is within
+    DB_REPLICA_MAX_LAG_SECONDS, and never for a user who committed a write
+    within DB_REPLICA_READ_YOUR_WRITES_SECONDS. That marker is a signed
+    cookie on the client, so it holds whichever worker serves the next
+    request. Everything else falls back to the primary.
+    """
+
+    LAG_QUERY = text(
+        "SELECT CASE"
+        " WHEN NOT pg_is_in_recovery() THEN 0"
+        " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+        " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+        " END"
+    )
+
+    def __init__(self, replicas: list[AsyncEngine]):
+        self.replicas = replicas
+        self.lag: dict[int, Optional[float]] = {i: None for i in range(len(replicas))}
+        self._cycle = itertools.cycle(range(len(replicas)))
+        self.replica_reads = 0
+        self.primary_reads = 0
+
+    def choose(self, wrote_recently: bool = False) -> Optional[AsyncEngine]:
+        if self.replicas and not wrote_recently:
+            for _ in range(len(self.replicas)):
+                index = next(self._cycle)
+                lag = self.lag[index]
+                if lag is not None and lag <= settings.DB_REPLICA_MAX_LAG_SECONDS:
+                    self.replica_reads += 1
+                    return self.replicas[index]
+        self.primary_reads += 1
+        return None
+
+    async def check_lag(self):
+        for index, replica in enumerate(self.replicas):
+            try:
+                async with replica.connect() as conn:
+                    self.lag[index] = float((await conn.execute(self.LAG_QUERY)).scalar())
+            except Exception as e:
+                self.lag[index] = None
+                print(f"⚠️ Replica {index} lag check failed: {e}")
+
+    async def run(self):
+        """Background task refreshing replica lag"""
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(settings.DB_REPLICA_LAG_CHECK_INTERVAL)
+
+    def stats(self) -> dict:
+        return {
+            "replicas": len(self.replicas),
+            "lag_seconds": list(self.lag.values()),
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+        }
+
+
+replica_router = ReplicaRouter(replica_engines)
+
+
+class RoutingSession(Session):
+    """Session that sends read-only sessions to a replica when one is usable.
+
+    Flushes and DML statements always go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not self.info.get("read_only") or self._flushing or getattr(clause, "is_dml", False):
+            return engine.sync_engine
+        if "replica" not in self.info:
+            request = self.info.get("request")
+            user_id = getattr(request.state, "user_id", None) if request is not None else None
+            self.info["replica"] = replica_router.choose(
+                user_id is not None and wrote_recently(request, user_id)
+            )
+        replica = self.info["replica"]
+        return replica.sync_engine if replica is not None else engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_write(session):
+    request, response = session.info.get("request"), session.info.get("response")
+    user_id = getattr(request.state, "user_id", None) if request is not None else None
+    if replica_router.replicas and user_id is not None and response is not None and not session.info.get("read_only"):
+        set_last_write(response, user_id)
+
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False
 )
 
 # Create declarative base
 Base = declarative_base()
 
+
+def pool_status() -> dict:
+    """Live pool occupancy plus checkout metrics for this worker"""
+    pool = engine.sync_engine.pool
+    status = {
+        "pool_class": type(pool).__name__,
+        "pgbouncer_mode": settings.DB_PGBOUNCER_MODE,
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "timeout_seconds": settings.DB_POOL_TIMEOUT,
+        })
+    status.update(pool_metrics.stats())
+    status["replicas"] = replica_router.stats()
+    return status
+
+
 # Dependency to get database session
-async def get_db():
+async def get_db(request: Request, response: Response):
     """Dependency to get database session"""
-    async with AsyncSessionLocal() as session:
+    async with AsyncSessionLocal(info={"request": request, "response": response}) as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def get_read_db(request: Request):
+    """Dependency to get a read-only session, served by a replica when possible"""
+    async with AsyncSessionLocal(info={"request": request, "read_only": True}) as session:
         try:
             yield session
         finally:
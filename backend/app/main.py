@@ -6,12 +6,23 @@ Main FastAPI application
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import os
 from contextlib import asynccontextmanager
 
-from .database import engine, Base
-from .api import auth, users, manufacturers, materials, filaments, spools, printers
+from .database import AsyncSessionLocal, replica_engines, replica_router
+from .api import activity, auth, users, manufacturers, materials, filaments, spools, printers, print_jobs, imports, catalog, search, typeahead, stats, admin, api_keys
 from .config import settings
+from .responses import ORJSONResponse
+from .auth.cache import principal_cache
+from .auth.hashing import password_hasher
+from .auth.tokens import load_revocations
+from .schema import ensure_schema
+from .middleware import ActivityLogMiddleware
+from .services.activity_log import activity_log_writer
+from .services.partitions import partition_maintenance
+from .services.print_jobs import print_job_ingest
+from .services.spoolman_db import spoolman_db_sync
 
 
 @asynccontextmanager
@@ -20,14 +31,61 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting FilaDB...")
     
-    # Create database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Check the schema revision; migrates only when it is behind
+    await ensure_schema()
+    
+    # Prime the in-memory refresh token revocation list
+    async with AsyncSessionLocal() as db:
+        await load_revocations(db)
+    
+    # Drop cached users changed on other workers
+    principal_listener = None
+    if principal_cache.enabled:
+        principal_listener = asyncio.create_task(principal_cache.listen())
+    
+    # Track replica lag so reads only go to replicas that are caught up
+    replica_monitor = None
+    if replica_engines:
+        await replica_router.check_lag()
+        replica_monitor = asyncio.create_task(replica_router.run())
+    
+    # Keep catalog filaments in step with SpoolmanDB
+    catalog_sync = None
+    if settings.SPOOLMAN_DB_SYNC_INTERVAL > 0:
+        catalog_sync = asyncio.create_task(spoolman_db_sync.run())
+    
+    # Create upcoming monthly partitions and drop expired ones
+    partition_task = None
+    if settings.PARTITION_MAINTENANCE_INTERVAL > 0:
+        partition_task = asyncio.create_task(partition_maintenance.run())
+    
+    # Write queued print job events in batches
+    print_job_writer = asyncio.create_task(print_job_ingest.run())
+    
+    # Write the activity log in batches
+    activity_writer = asyncio.create_task(activity_log_writer.run())
     
     yield
     
     # Shutdown
     print("🛑 Shutting down FilaDB...")
+    if principal_listener is not None:
+        principal_listener.cancel()
+    if replica_monitor is not None:
+        replica_monitor.cancel()
+    if catalog_sync is not None:
+        catalog_sync.cancel()
+    if partition_task is not None:
+        partition_task.cancel()
+    print_job_writer.cancel()
+    await print_job_ingest.drain()
+    # After the print job writer: both may still be finishing requests' work
+    activity_writer.cancel()
+    await activity_log_writer.drain()
+    await spoolman_db_sync.close()
+    for replica in replica_engines:
+        await replica.dispose()
+    await password_hasher.shutdown()
 
 
 # Create FastAPI app
@@ -37,6 +95,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -49,6 +108,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Audit trail of create / update / delete requests
+if settings.ACTIVITY_LOG_ENABLED:
+    app.add_middleware(ActivityLogMiddleware)
+
 
 # Health check endpoint
 @app.get("/health")
@@ -77,6 +140,15 @@ app.include_router(materials.router, prefix="/api/materials", tags=["Materials"]
 app.include_router(filaments.router, prefix="/api/filaments", tags=["Filaments"])
 app.include_router(spools.router, prefix="/api/spools", tags=["Spools"])
 app.include_router(printers.router, prefix="/api/printers", tags=["Printers"])
+app.include_router(print_jobs.router, prefix="/api/print-jobs", tags=["Print Jobs"])
+app.include_router(imports.router, prefix="/api/import", tags=["Import"])
+app.include_router(catalog.router, prefix="/api/catalog", tags=["Catalog"])
+app.include_router(search.router, prefix="/api/search", tags=["Search"])
+app.include_router(typeahead.router, prefix="/api/typeahead", tags=["Search"])
+app.include_router(api_keys.router, prefix="/api/api-keys", tags=["API Keys"])
+app.include_router(stats.router, prefix="/api/stats", tags=["Statistics"])
+app.include_router(activity.router, prefix="/api/activity", tags=["Activity"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 
 # Global exception handler
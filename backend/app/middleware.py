@@ -0,0 +1,120 @@
+"""
+ASGI middleware for FilaDB
+"""
+
+import ipaddress
+import re
+from datetime import datetime, timezone
+from uuid import UUID
+
+import orjson
+
+from .services.activity_log import ActivityEntry, activity_log_writer
+
+MUTATING_METHODS = {"POST": "create", "PUT": "update", "PATCH": "update", "DELETE": "delete"}
+
+# Responses are only inspected (for the id of a created resource) up to this size
+MAX_CAPTURED_BODY = 16 * 1024
+
+# Paths whose responses must not be inspected (tokens)
+UNCAPTURED_PREFIXES = ("/api/auth/",)
+
+UUID_PATTERN = re.compile(r"^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$")
+
+
+def _describe(method: str, path: str) -> tuple[str, str, UUID | None]:
+    """``POST /api/spools/{id}/consume`` -> ``("consume", "spools", id)``
+
+    ``/bulk`` is not an action of its own: ``PATCH /api/spools/bulk`` is an
+    ``update`` of spools, recorded once per spool.
+    """
+    segments = [segment for segment in path.split("/")[2:] if segment]
+    resource_type = segments[0] if segments else ""
+    resource_id, actions = None, []
+    for segment in segments[1:]:
+        if resource_id is None and UUID_PATTERN.match(segment):
+            resource_id = UUID(segment)
+        elif segment != "bulk":
+            actions.append(segment)
+    return ".".join(actions) or MUTATING_METHODS[method], resource_type, resource_id
+
+
+def _created_id(body: bytes) -> UUID | None:
+    try:
+        data = orjson.loads(body)
+        return UUID(data["id"]) if isinstance(data, dict) and "id" in data else None
+    except (orjson.JSONDecodeError, TypeError, ValueError):
+        return None
+
+
+def _client_ip(scope) -> str | None:
+    """The peer address, if it is one; activity_logs.ip_address is INET.
+
+    Test clients and some servers (unix sockets) report names or paths
+    here, and a single bad value would fail the COPY of a whole batch.
+    """
+    client = scope.get("client")
+    if not client:
+        return None
+    try:
+        return str(ipaddress.ip_address(client[0]))
+    except ValueError:
+        return None
+
+
+class ActivityLogMiddleware:
+    """Records every successful create / update / delete under /api/.
+
+    The entry is queued after the response has been sent; the batched
+    writer stores it later, so requests never wait on the activity log.
+    Endpoints changing many resources at once list their ids in
+    ``request.state.resource_ids``; each of them gets an entry.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in MUTATING_METHODS or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        action, resource_type, resource_id = _describe(scope["method"], scope["path"])
+        capture = resource_id is None and scope["method"] == "POST" and not scope["path"].startswith(UNCAPTURED_PREFIXES)
+        response = {"status": 500, "body": bytearray()}
+
+        async def send_and_observe(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif capture and message["type"] == "http.response.body" and len(response["body"]) <= MAX_CAPTURED_BODY:
+                response["body"] += message.get("body", b"")
+            await send(message)
+
+        await self.app(scope, receive, send_and_observe)
+
+        if response["status"] >= 400:
+            return
+        if capture and len(response["body"]) <= MAX_CAPTURED_BODY:
+            resource_id = _created_id(bytes(response["body"]))
+
+        state = scope.get("state", {})
+        headers = dict(scope["headers"])
+        user_agent = headers.get(b"user-agent")
+        details = {"method": scope["method"], "path": scope["path"], "status": response["status"]}
+        if state.get("api_key_id") is not None:
+            details["api_key_id"] = str(state["api_key_id"])
+        resource_ids = state.get("resource_ids", [resource_id])
+        created_at = datetime.now(timezone.utc)
+        await activity_log_writer.record_many([
+            ActivityEntry(
+                user_id=state.get("user_id"),
+                action=action[:100],
+                resource_type=resource_type[:50],
+                resource_id=resource_id,
+                details=details,
+                ip_address=_client_ip(scope),
+                user_agent=user_agent.decode("latin-1") if user_agent else None,
+                created_at=created_at,
+            )
+            for resource_id in resource_ids
+        ])
@@ -7,9 +7,13 @@ from .manufacturer import Manufacturer
 from .material import Material
 from .filament import Filament
 from .spool import Spool
+from .spool_stats import SpoolStats
 from .printer import Printer
 from .print_job import PrintJob
+from .print_job_usage import PrintJobDailyUsage
 from .activity_log import ActivityLog
+from .refresh_token import RefreshToken
+from .api_key import ApiKey
 
 __all__ = [
     "User",
@@ -17,7 +21,11 @@ __all__ = [
     "Material",
     "Filament",
     "Spool",
+    "SpoolStats",
     "Printer",
     "PrintJob",
-    "ActivityLog"
+    "PrintJobDailyUsage",
+    "ActivityLog",
+    "RefreshToken",
+    "ApiKey"
 ]
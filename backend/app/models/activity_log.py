@@ -2,7 +2,7 @@
 Activity Log model
 """
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index, PrimaryKeyConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB, INET
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -12,9 +12,11 @@ from ..database import Base
 
 
 class ActivityLog(Base):
+    """Audit trail entry; the table is range-partitioned by month on created_at"""
+
     __tablename__ = "activity_logs"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), nullable=False, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     action = Column(String(100), nullable=False)
     resource_type = Column(String(50), nullable=False)
@@ -22,10 +24,19 @@ class ActivityLog(Base):
     details = Column(JSONB, default={})
     ip_address = Column(INET)
     user_agent = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     # Relationships
     user = relationship("User", backref="activity_logs")
 
+    __table_args__ = (
+        # The partition key has to be part of the primary key; leading with
+        # it also makes the key the index for time ranges and keyset pages
+        PrimaryKeyConstraint("created_at", "id", name="activity_logs_pkey"),
+        Index("idx_activity_logs_user_created", "user_id", "created_at", "id"),
+        Index("idx_activity_logs_resource_created", "resource_type", "resource_id", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
     def __repr__(self):
         return f"<ActivityLog(id={self.id}, action='{self.action}', resource_type='{self.resource_type}')>"
@@ -0,0 +1,34 @@
+"""
+API Key model
+"""
+
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import uuid
+
+from ..database import Base
+
+
+class ApiKey(Base):
+    __tablename__ = "api_keys"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String(255), nullable=False)
+    prefix = Column(String(32), unique=True, nullable=False)  # Public lookup part of the key
+    key_hash = Column(String(64), nullable=False)  # HMAC-SHA256 of the full key
+    scopes = Column(JSONB, default=[])  # e.g. ["spools:read", "printers:write"]
+    expires_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    user = relationship("User", backref="api_keys")
+
+    __table_args__ = (
+        Index("idx_api_keys_user_id", "user_id"),
+    )
+
+    def __repr__(self):
+        return f"<ApiKey(id={self.id}, name='{self.name}', prefix='{self.prefix}')>"
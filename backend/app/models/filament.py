@@ -2,7 +2,7 @@
 Filament model
 """
 
-from sqlalchemy import Column, String, DateTime, Integer, DECIMAL, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, DECIMAL, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -35,5 +35,12 @@ class Filament(Base):
     manufacturer = relationship("Manufacturer", backref="filaments")
     material = relationship("Material", backref="filaments")
 
+    __table_args__ = (
+        UniqueConstraint("manufacturer_id", "name"),
+        Index("idx_filaments_material_id", "material_id"),
+        Index("idx_filaments_created", "created_at", "id"),
+        Index("idx_filaments_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+
     def __repr__(self):
         return f"<Filament(id={self.id}, name='{self.name}')>"
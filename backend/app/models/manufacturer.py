@@ -2,7 +2,7 @@
 Manufacturer model
 """
 
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -20,5 +20,10 @@ class Manufacturer(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index("idx_manufacturers_created", "created_at", "id"),
+        Index("idx_manufacturers_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+
     def __repr__(self):
         return f"<Manufacturer(id={self.id}, name='{self.name}')>"
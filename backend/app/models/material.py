@@ -2,7 +2,7 @@
 Material model
 """
 
-from sqlalchemy import Column, String, DateTime, Integer, DECIMAL
+from sqlalchemy import Column, String, DateTime, Integer, DECIMAL, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 import uuid
@@ -24,5 +24,10 @@ class Material(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index("idx_materials_created", "created_at", "id"),
+        Index("idx_materials_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+
     def __repr__(self):
         return f"<Material(id={self.id}, name='{self.name}', density={self.density})>"
@@ -2,7 +2,7 @@
 Print Job model
 """
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, DECIMAL, Text, Enum
+from sqlalchemy import Column, String, DateTime, ForeignKey, DECIMAL, Text, Enum, Index, PrimaryKeyConstraint, desc
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -21,19 +21,25 @@ class PrintJobStatus(str, enum.Enum):
 
 
 class PrintJob(Base):
+    """Print job; the table is range-partitioned by month on start_time"""
+
     __tablename__ = "print_jobs"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), nullable=False, default=uuid.uuid4)
     printer_id = Column(UUID(as_uuid=True), ForeignKey("printers.id", ondelete="CASCADE"))
     spool_id = Column(UUID(as_uuid=True), ForeignKey("spools.id", ondelete="SET NULL"), nullable=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
     job_name = Column(String(255))
-    start_time = Column(DateTime(timezone=True))
+    start_time = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # queued jobs: when queued
     end_time = Column(DateTime(timezone=True))
     filament_used = Column(DECIMAL(8, 2))  # Filament used in grams
-    status = Column(Enum(PrintJobStatus), default=PrintJobStatus.QUEUED, nullable=False)
+    status = Column(
+        Enum(PrintJobStatus, native_enum=False, length=50, values_callable=lambda e: [m.value for m in e]),
+        default=PrintJobStatus.QUEUED,
+        nullable=False
+    )
     notes = Column(Text)
-    job_metadata = Column(JSONB, default={})
+    job_metadata = Column("metadata", JSONB, default={})  # "metadata" is reserved on declarative classes
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -42,6 +48,18 @@ class PrintJob(Base):
     spool = relationship("Spool", backref="print_jobs")
     user = relationship("User", backref="print_jobs")
 
+    __table_args__ = (
+        # The partition key has to be part of the primary key, so ids are
+        # only unique per start time; the ingest creates jobs under an
+        # advisory lock per id instead
+        PrimaryKeyConstraint("start_time", "id", name="print_jobs_pkey"),
+        Index("idx_print_jobs_id", "id"),
+        Index("idx_print_jobs_printer_start", "printer_id", desc("start_time")),
+        Index("idx_print_jobs_spool_start", "spool_id", desc("start_time")),
+        Index("idx_print_jobs_user_start", "user_id", desc("start_time")),
+        {"postgresql_partition_by": "RANGE (start_time)"},
+    )
+
     @property
     def duration(self):
         """Calculate print duration"""
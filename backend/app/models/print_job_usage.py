@@ -0,0 +1,40 @@
+"""
+Print Job Daily Usage model
+"""
+
+from sqlalchemy import Column, Date, DECIMAL, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+
+from ..database import Base
+
+
+class PrintJobDailyUsage(Base):
+    """Filament used by finished print jobs, per UTC day of their end time.
+
+    Maintained by the print job ingest in the same transaction that ends
+    the jobs. Spool, printer and material ids are kept as plain values so
+    the history outlives them.
+    """
+
+    __tablename__ = "print_job_daily_usage"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    printer_id = Column(UUID(as_uuid=True))
+    spool_id = Column(UUID(as_uuid=True))
+    material_id = Column(UUID(as_uuid=True))
+    filament_used = Column(DECIMAL(12, 2), nullable=False, default=0)  # grams
+    jobs = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # One row per group; also the index for a user's usage over time
+        UniqueConstraint(
+            "user_id", "day", "printer_id", "spool_id", "material_id",
+            name="uq_print_job_daily_usage_group", postgresql_nulls_not_distinct=True
+        ),
+    )
+
+    def __repr__(self):
+        return f"<PrintJobDailyUsage(day={self.day}, spool_id={self.spool_id}, filament_used={self.filament_used})>"
@@ -2,7 +2,7 @@
 Printer model
 """
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Text, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -27,7 +27,11 @@ class Printer(Base):
     name = Column(String(255), nullable=False)
     type = Column(String(100))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
-    status = Column(Enum(PrinterStatus), default=PrinterStatus.OFFLINE, nullable=False)
+    status = Column(
+        Enum(PrinterStatus, native_enum=False, length=50, values_callable=lambda e: [m.value for m in e]),
+        default=PrinterStatus.OFFLINE,
+        nullable=False
+    )
     location = Column(String(255))
     notes = Column(Text)
     settings = Column(JSONB, default={})
@@ -37,5 +41,11 @@ class Printer(Base):
     # Relationships
     user = relationship("User", backref="printers")
 
+    __table_args__ = (
+        Index("idx_printers_user_status", "user_id", "status"),
+        Index("idx_printers_created", "created_at", "id"),
+        Index("idx_printers_user_created", "user_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Printer(id={self.id}, name='{self.name}', status='{self.status}')>"
@@ -2,7 +2,7 @@
 Spool model
 """
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, DECIMAL, Boolean, Date, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, DECIMAL, Boolean, Date, Text, Index, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -40,6 +40,19 @@ class Spool(Base):
     user = relationship("User", backref="spools")
     printer = relationship("Printer", backref="spools")
 
+    __table_args__ = (
+        Index("idx_spools_filament_id", "filament_id"),
+        Index("idx_spools_printer_id", "printer_id"),
+        Index("idx_spools_created", "created_at", "id"),
+        Index("idx_spools_user_created", "user_id", "created_at", "id"),
+        Index("idx_spools_user_active_created", "user_id", "is_active", "created_at", "id"),
+        Index("idx_spools_user_filament_active", "user_id", "filament_id", postgresql_where=text("is_active")),
+        Index("idx_spools_user_printer", "user_id", "printer_id", postgresql_where=text("printer_id IS NOT NULL")),
+        Index("idx_spools_color_trgm", "color", postgresql_using="gin", postgresql_ops={"color": "gin_trgm_ops"}),
+        Index("idx_spools_location_trgm", "location", postgresql_using="gin", postgresql_ops={"location": "gin_trgm_ops"}),
+        Index("idx_spools_notes_fts", text("to_tsvector('simple', coalesce(notes, ''))"), postgresql_using="gin"),
+    )
+
     @property
     def filament_used(self):
         """Calculate filament used in grams"""
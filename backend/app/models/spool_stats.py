@@ -0,0 +1,39 @@
+"""
+Spool Stats model
+"""
+
+from sqlalchemy import Column, DECIMAL, Index, Integer, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+
+from ..database import Base
+
+
+class SpoolStats(Base):
+    """Inventory totals per user and filament.
+
+    Written only by the statement-level triggers on ``spools`` (migration
+    0008), in the same transaction as the spool writes; read-only here.
+    Weight, value and nearly-empty counts cover active spools.
+    """
+
+    __tablename__ = "spool_stats"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True))
+    filament_id = Column(UUID(as_uuid=True))
+    spools = Column(Integer, nullable=False, default=0)
+    active_spools = Column(Integer, nullable=False, default=0)
+    remaining_weight = Column(DECIMAL(14, 2), nullable=False, default=0)  # grams
+    purchase_value = Column(DECIMAL(14, 2), nullable=False, default=0)
+    nearly_empty = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "filament_id", name="uq_spool_stats_user_filament", postgresql_nulls_not_distinct=True
+        ),
+        Index("idx_spool_stats_empty", "id", postgresql_where=text("spools = 0")),
+    )
+
+    def __repr__(self):
+        return f"<SpoolStats(user_id={self.user_id}, filament_id={self.filament_id}, spools={self.spools})>"
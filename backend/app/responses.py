@@ -0,0 +1,62 @@
+"""
+JSON response rendering
+"""
+
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+
+def json_default(value: Any) -> Any:
+    # Same representation pydantic uses, so both render paths agree.
+    # UUID lands here for subclasses such as asyncpg's, which orjson
+    # only serializes natively for the exact uuid.UUID type.
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """Default response class: orjson with Decimal and UUID support"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ResponseAdapter:
+    """Validate and render a response type in one pass.
+
+    FastAPI validates a route's return value against ``response_model``,
+    dumps it to JSON-compatible Python objects and then encodes those.
+    Returning ``adapter.render(...)`` instead goes straight from rows or ORM
+    objects to JSON bytes inside pydantic-core with an adapter built once at
+    import time. Keep ``response_model`` on the route for the OpenAPI schema.
+    """
+
+    def __init__(self, type_: Any, exclude_unset: bool = False):
+        self.adapter = TypeAdapter(type_)
+        self.exclude_unset = exclude_unset
+
+    def render(self, value: Any, response: Response | None = None) -> Response:
+        """Build the response; status and headers set on the injected ``response`` are kept"""
+        body = self.adapter.dump_json(
+            self.adapter.validate_python(value),
+            exclude_unset=self.exclude_unset
+        )
+        rendered = Response(body, media_type="application/json")
+        if response is not None:
+            # FastAPI leaves the injected response's status unset unless a
+            # dependency or the route assigns one
+            if response.status_code:
+                rendered.status_code = response.status_code
+            # Raw headers, so repeated ones such as Set-Cookie survive
+            rendered.raw_headers.extend(
+                (name, value) for name, value in response.raw_headers
+                if name not in (b"content-length", b"content-type")
+            )
+        return rendered
@@ -0,0 +1,109 @@
+"""
+Schema revision check and migrations at startup
+"""
+
+import os
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+
+from .config import settings
+from .database import engine
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(__file__)), "alembic.ini")
+
+# Revision matching the schema that database/init.sql used to create
+BASELINE_REVISION = "0001"
+
+# Arbitrary key shared by all workers so only one of them migrates
+MIGRATION_LOCK_KEY = 0x46494C41  # "FILA"
+
+
+def _alembic_config(connection=None) -> Config:
+    config = Config(ALEMBIC_INI)
+    config.attributes["connection"] = connection
+    return config
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(_alembic_config()).get_current_head()
+
+
+def _current_revision(sync_conn):
+    return MigrationContext.configure(sync_conn).get_current_revision()
+
+
+def _complete_baseline(sync_conn, config: Config):
+    """Add the baseline indexes and triggers a create_all database lacks.
+
+    init.sql created them, Base.metadata.create_all() did not; later
+    migrations replace some of them, so they must exist before stamping.
+    """
+    baseline = ScriptDirectory.from_config(config).get_revision(BASELINE_REVISION).module
+    indexes = set(sync_conn.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()"
+    )).scalars())
+    triggers = set(sync_conn.execute(text("SELECT tgname FROM pg_trigger WHERE NOT tgisinternal")).scalars())
+    missing = []
+    for statement in baseline.SCHEMA:
+        words = statement.split()
+        if words[:2] in (["CREATE", "EXTENSION"], ["CREATE", "OR"]):
+            # Idempotent: CREATE EXTENSION IF NOT EXISTS / CREATE OR REPLACE FUNCTION
+            sync_conn.exec_driver_sql(statement)
+        elif words[:2] == ["CREATE", "INDEX"] and words[2] not in indexes:
+            missing.append(statement)
+        elif words[:2] == ["CREATE", "TRIGGER"] and words[2] not in triggers:
+            missing.append(statement)
+    if missing:
+        print(f"📦 Adding {len(missing)} baseline indexes and triggers missing from the existing schema...")
+    for statement in missing:
+        sync_conn.exec_driver_sql(statement)
+
+
+def _upgrade(sync_conn, head: str):
+    # Re-check under the lock: another worker may have finished already
+    current = _current_revision(sync_conn)
+    if current == head:
+        return
+    config = _alembic_config(sync_conn)
+    if current is None and inspect(sync_conn).has_table("users"):
+        # Database created by init.sql / create_all before migrations existed
+        _complete_baseline(sync_conn, config)
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+
+async def ensure_schema():
+    """Fast path: compare the stored revision with the code's head.
+
+    Only when they differ (and DB_AUTO_MIGRATE is on) are migrations run,
+    serialized across workers with a Postgres advisory lock.
+    """
+    head = head_revision()
+    async with engine.connect() as conn:
+        current = await conn.run_sync(_current_revision)
+    if current == head:
+        return
+
+    if not settings.DB_AUTO_MIGRATE:
+        raise RuntimeError(
+            f"Database schema is at revision {current}, expected {head}. "
+            "Run 'alembic upgrade head' in the backend directory."
+        )
+
+    print(f"📦 Migrating database schema {current} -> {head}...")
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        await conn.commit()
+        try:
+            await conn.run_sync(_upgrade, head)
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            await conn.commit()
@@ -0,0 +1,5 @@
+"""
+Background and batch services for FilaDB
+"""
+
+# This file makes the services directory a Python package
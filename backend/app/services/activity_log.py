@@ -0,0 +1,94 @@
+"""
+Batched writer for the activity log (audit trail)
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.activity_log import ActivityLog
+from .batching import BatchWriter
+
+COPY_COLUMNS = (
+    "id", "user_id", "action", "resource_type", "resource_id",
+    "details", "ip_address", "user_agent", "created_at",
+)
+
+
+@dataclass
+class ActivityEntry:
+    user_id: Optional[UUID]
+    action: str
+    resource_type: str
+    resource_id: Optional[UUID]
+    details: dict
+    ip_address: Optional[str]
+    user_agent: Optional[str]
+    created_at: datetime
+
+
+class ActivityLogWriter(BatchWriter):
+    """Queues activity entries and COPYs them into activity_logs.
+
+    Recording never waits longer than ``enqueue_timeout``: when the queue
+    stays full for that long the entries are dropped and counted, so a
+    slow database can never hold requests up.
+    """
+
+    item_name = "activity log entries"
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float, enqueue_timeout: float):
+        super().__init__(max_size, batch_size, flush_interval)
+        self.enqueue_timeout = enqueue_timeout
+        self.recorded = 0
+        self.dropped = 0
+
+    async def record(self, entry: ActivityEntry):
+        await self.record_many([entry])
+
+    async def record_many(self, entries: list[ActivityEntry]):
+        """Queue the entries of one request; together they wait at most ``enqueue_timeout``"""
+        deadline = None
+        for entry in entries:
+            try:
+                self.queue.put_nowait(entry)
+            except asyncio.QueueFull:
+                if deadline is None:
+                    deadline = time.monotonic() + self.enqueue_timeout
+                try:
+                    await asyncio.wait_for(self.queue.put(entry), max(deadline - time.monotonic(), 0))
+                except asyncio.TimeoutError:
+                    self.dropped += 1
+                    continue
+            self.recorded += 1
+
+    async def flush(self, db: AsyncSession, batch: list[ActivityEntry]):
+        connection = await db.connection()
+        driver_connection = (await connection.get_raw_connection()).driver_connection
+        records = [
+            (uuid.uuid4(), entry.user_id, entry.action, entry.resource_type, entry.resource_id,
+             orjson.dumps(entry.details).decode(), entry.ip_address, entry.user_agent, entry.created_at)
+            for entry in batch
+        ]
+        await driver_connection.copy_records_to_table(
+            ActivityLog.__tablename__, records=records, columns=COPY_COLUMNS
+        )
+
+    def stats(self) -> dict:
+        return {**super().stats(), "recorded": self.recorded, "dropped": self.dropped}
+
+
+activity_log_writer = ActivityLogWriter(
+    max_size=settings.ACTIVITY_LOG_QUEUE_SIZE,
+    batch_size=settings.ACTIVITY_LOG_FLUSH_BATCH_SIZE,
+    flush_interval=settings.ACTIVITY_LOG_FLUSH_INTERVAL_MS / 1000,
+    enqueue_timeout=settings.ACTIVITY_LOG_ENQUEUE_TIMEOUT_MS / 1000
+)
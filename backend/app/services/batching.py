@@ -0,0 +1,82 @@
+"""
+Queue-backed writers that flush to the database in batches
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import AsyncSessionLocal
+
+
+class BatchWriter(ABC):
+    """Bounded queue drained by one background task per worker.
+
+    ``run()`` takes whatever is queued every ``flush_interval`` seconds or
+    ``batch_size`` items, whichever comes first, and hands it to
+    ``flush()`` in its own transaction, so a writer holds at most one
+    pooled connection however fast items arrive. After cancelling
+    ``run()`` on shutdown, ``drain()`` writes what is left.
+    """
+
+    # Used in the warning printed when a batch cannot be written
+    item_name = "items"
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.failed = 0
+        self.batches = 0
+        # Items taken off the queue but not yet written, for drain()
+        self._pending: list = []
+        self._flushing: Optional[asyncio.Future] = None
+
+    @abstractmethod
+    async def flush(self, db: AsyncSession, batch: list):
+        """Write one batch in the current transaction"""
+
+    async def run(self):
+        """Background task flushing the queue"""
+        while True:
+            self._pending.append(await self.queue.get())
+            deadline = time.monotonic() + self.flush_interval
+            while len(self._pending) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    self._pending.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            batch, self._pending = self._pending, []
+            # Cancelling run() must not abort a flush halfway
+            self._flushing = asyncio.ensure_future(self._flush_logged(batch))
+            await asyncio.shield(self._flushing)
+
+    async def drain(self):
+        """Write whatever is still queued; call after cancelling run()"""
+        if self._flushing is not None:
+            await self._flushing
+        batch, self._pending = self._pending, []
+        while batch or not self.queue.empty():
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            await self._flush_logged(batch)
+            batch = []
+
+    async def _flush_logged(self, batch: list):
+        self.batches += 1
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.flush(db, batch)
+                await db.commit()
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"⚠️ Dropped {len(batch)} {self.item_name}: {e}")
+
+    def stats(self) -> dict:
+        return {"queued": self.queue.qsize(), "failed": self.failed, "batches": self.batches}
@@ -0,0 +1,201 @@
+"""
+Memory-mapped snapshot of the SpoolmanDB catalog shared by all workers
+"""
+
+import mmap
+import os
+import struct
+import time
+from typing import Iterator, Optional
+
+import orjson
+
+from ..config import settings
+
+MAGIC = b"FDBCAT\x00\x00"
+FORMAT_VERSION = 1
+
+# magic, format version, record count, generation, then the offsets of the
+# record table and of the id / manufacturer / material indexes
+HEADER = struct.Struct("<8sIIQQQQQ")
+# Record table entry: offset and length of the record's JSON
+RECORD = struct.Struct("<QI")
+# Index entry: offset and length of the key, record number; entries are
+# sorted by key so lookups are a binary search over the mapped file
+ENTRY = struct.Struct("<QHI")
+COUNT = struct.Struct("<I")
+
+# How often readers look for a newer snapshot file, in seconds
+REMAP_CHECK_INTERVAL = 1.0
+
+
+def write_snapshot(path: str, records: dict[str, dict], generation: Optional[int] = None):
+    """Write ``records`` (keyed by spoolman_db_id) as a new snapshot file.
+
+    The file is written next to ``path`` and renamed over it, so readers
+    see either the old or the new snapshot, never a partial one.
+    """
+    generation = generation or time.time_ns()
+    ids = sorted(records)
+    blobs = [orjson.dumps({"spoolman_db_id": id, **records[id]}) for id in ids]
+
+    data = bytearray(HEADER.size)
+    record_table = []
+    for blob in blobs:
+        record_table.append((len(data), len(blob)))
+        data += blob
+
+    keys: dict[bytes, int] = {}
+    key_blob_offset = len(data)
+    key_blob = bytearray()
+
+    def key_ref(key: str) -> tuple[int, int]:
+        encoded = key.encode()[:0xFFFF]
+        if encoded not in keys:
+            keys[encoded] = key_blob_offset + len(key_blob)
+            key_blob.extend(encoded)
+        return keys[encoded], len(encoded)
+
+    indexes = {
+        "id": sorted((id, number) for number, id in enumerate(ids)),
+        "manufacturer": sorted((records[id]["manufacturer"].lower(), number) for number, id in enumerate(ids)),
+        "material": sorted((records[id]["material"].lower(), number) for number, id in enumerate(ids)),
+    }
+    entries = {name: [(*key_ref(key), number) for key, number in index] for name, index in indexes.items()}
+    data += key_blob
+
+    records_offset = len(data)
+    for offset, length in record_table:
+        data += RECORD.pack(offset, length)
+
+    index_offsets = {}
+    for name, index in entries.items():
+        index_offsets[name] = len(data)
+        data += COUNT.pack(len(index))
+        for entry in index:
+            data += ENTRY.pack(*entry)
+
+    HEADER.pack_into(
+        data, 0, MAGIC, FORMAT_VERSION, len(ids), generation, records_offset,
+        index_offsets["id"], index_offsets["manufacturer"], index_offsets["material"]
+    )
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+class _Mapping:
+    """One opened snapshot file"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.identity = os.fstat(f.fileno())
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.count, self.generation, self.records_offset,
+         id_index, manufacturer_index, material_index) = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} catalog snapshot")
+        self.indexes = {"id": id_index, "manufacturer": manufacturer_index, "material": material_index}
+
+    def record(self, number: int) -> bytes:
+        offset, length = RECORD.unpack_from(self.buffer, self.records_offset + number * RECORD.size)
+        return self.buffer[offset:offset + length]
+
+    def _key(self, index_offset: int, position: int) -> bytes:
+        key_offset, key_length, _ = ENTRY.unpack_from(self.buffer, index_offset + COUNT.size + position * ENTRY.size)
+        return self.buffer[key_offset:key_offset + key_length]
+
+    def find(self, index: str, key: str) -> Iterator[int]:
+        """Record numbers whose index key equals ``key``"""
+        index_offset = self.indexes[index]
+        (size,) = COUNT.unpack_from(self.buffer, index_offset)
+        encoded = key.encode()
+        low, high = 0, size
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(index_offset, middle) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        while low < size and self._key(index_offset, low) == encoded:
+            _, _, number = ENTRY.unpack_from(self.buffer, index_offset + COUNT.size + low * ENTRY.size)
+            yield number
+            low += 1
+
+
+class CatalogSnapshot:
+    """Read-only view of the snapshot file written by the catalog sync.
+
+    Each worker maps the same file, so the catalog lives once in the page
+    cache instead of once per process as Python objects. Lookups return
+    the stored JSON bytes without decoding them. When the sync replaces the
+    file, readers notice within REMAP_CHECK_INTERVAL and map the new one.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mapping: Optional[_Mapping] = None
+        self._checked_at = 0.0
+
+    def _current(self) -> Optional[_Mapping]:
+        now = time.monotonic()
+        if now - self._checked_at < REMAP_CHECK_INTERVAL:
+            return self._mapping
+        self._checked_at = now
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._mapping = None
+            return None
+        current = self._mapping
+        if current is None or (current.identity.st_ino, current.identity.st_mtime_ns) != (stat.st_ino, stat.st_mtime_ns):
+            try:
+                # The old map is released once no lookup still holds it
+                self._mapping = _Mapping(self.path)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Could not map catalog snapshot: {e}")
+        return self._mapping
+
+    @property
+    def available(self) -> bool:
+        return self._current() is not None
+
+    def get(self, spoolman_db_id: str) -> Optional[bytes]:
+        mapping = self._current()
+        if mapping is None:
+            return None
+        for number in mapping.find("id", spoolman_db_id):
+            return mapping.record(number)
+        return None
+
+    def search(self, manufacturer: Optional[str] = None, material: Optional[str] = None) -> list[bytes]:
+        """Records matching the manufacturer and/or material (case-insensitive)"""
+        mapping = self._current()
+        if mapping is None:
+            return []
+        numbers = None
+        for index, key in (("manufacturer", manufacturer), ("material", material)):
+            if key is not None:
+                found = set(mapping.find(index, key.lower()))
+                numbers = found if numbers is None else numbers & found
+        return [mapping.record(number) for number in sorted(numbers or ())]
+
+    def stats(self) -> dict:
+        mapping = self._current()
+        if mapping is None:
+            return {"available": False, "path": self.path}
+        return {
+            "available": True,
+            "path": self.path,
+            "generation": mapping.generation,
+            "filaments": mapping.count,
+            "bytes": len(mapping.buffer),
+        }
+
+
+catalog_snapshot = CatalogSnapshot(os.path.join(settings.UPLOAD_DIR, "spoolmandb", "catalog.bin"))
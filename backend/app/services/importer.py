@@ -0,0 +1,493 @@
+"""
+Bulk import of filaments and spools from Spoolman exports or spreadsheets
+"""
+
+import csv
+import enum
+import io
+import itertools
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, AsyncIterator, BinaryIO, Iterator
+from uuid import UUID
+
+import orjson
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from ..models.manufacturer import Manufacturer
+from ..models.material import Material
+from .typeahead import typeahead_index
+
+# Records parsed, resolved and copied into the staging table per round
+IMPORT_BATCH_SIZE = 5000
+
+# Invalid rows listed in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+# JSON uploads are decoded in chunks of this many characters; a single
+# record may not be longer than MAX_JSON_RECORD_SIZE
+JSON_READ_SIZE = 64 * 1024
+MAX_JSON_RECORD_SIZE = 1024 * 1024
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+JSON_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")
+
+# Density for materials first seen in an import without one (PLA)
+DEFAULT_MATERIAL_DENSITY = Decimal("1.24")
+DEFAULT_DIAMETER = Decimal("1.75")
+
+
+class ImportFormat(str, enum.Enum):
+    CSV = "csv"
+    JSON = "json"
+    NDJSON = "ndjson"
+
+
+# Accepted source keys per field, in order of preference. Dotted keys are
+# Spoolman's spool export (flattened in CSV, nested in JSON); the plain ones
+# match FilaDB's own field names for hand-made spreadsheets.
+FIELD_ALIASES = {
+    "manufacturer": ("filament.vendor.name", "manufacturer", "vendor"),
+    "material": ("filament.material", "material"),
+    "filament": ("filament.name", "filament"),
+    "density": ("filament.density", "density"),
+    "extruder_temp": ("filament.settings_extruder_temp", "extruder_temp"),
+    "bed_temp": ("filament.settings_bed_temp", "bed_temp"),
+    "diameter": ("filament.diameter", "diameter"),
+    "hex_color": ("filament.color_hex", "color_hex", "hex_color"),
+    "color": ("color", "filament.color_name"),
+    "weight": ("initial_weight", "weight", "filament.weight"),
+    "remaining_weight": ("remaining_weight",),
+    "used_weight": ("used_weight",),
+    "spool_weight": ("spool_weight", "filament.spool_weight"),
+    "purchase_price": ("price", "purchase_price", "filament.price"),
+    "purchase_date": ("registered", "purchase_date"),
+    "location": ("location",),
+    "notes": ("comment", "notes"),
+    "nfc_tag_id": ("nfc_tag_id",),
+    "qr_code": ("qr_code",),
+    "archived": ("archived",),
+    "external_id": ("id", "import_id"),
+}
+
+STAGING_TABLE = "import_rows"
+STAGING_COLUMNS = (
+    ("row_number", "integer"),
+    ("manufacturer_id", "uuid"),
+    ("material_id", "uuid"),
+    ("filament", "varchar(255)"),
+    ("density", "numeric"),
+    ("extruder_temp", "integer"),
+    ("bed_temp", "integer"),
+    ("diameter", "numeric"),
+    ("hex_color", "varchar(7)"),
+    ("color", "varchar(100)"),
+    ("weight", "numeric"),
+    ("remaining_weight", "numeric"),
+    ("spool_weight", "numeric"),
+    ("purchase_price", "numeric"),
+    ("purchase_date", "date"),
+    ("location", "varchar(255)"),
+    ("notes", "text"),
+    ("nfc_tag_id", "varchar(255)"),
+    ("qr_code", "varchar(255)"),
+    ("is_active", "boolean"),
+    ("external_id", "text"),
+)
+
+MERGE_FILAMENTS = text(f"""
+    INSERT INTO filaments (manufacturer_id, material_id, name, density,
+                           extruder_temp_min, extruder_temp_max, bed_temp_min, bed_temp_max)
+    SELECT DISTINCT ON (manufacturer_id, filament)
+           manufacturer_id, material_id, filament, density,
+           extruder_temp, extruder_temp, bed_temp, bed_temp
+    FROM {STAGING_TABLE}
+    ORDER BY manufacturer_id, filament, row_number
+    ON CONFLICT (manufacturer_id, name) DO NOTHING
+""")
+
+COUNT_SPOOL_ROWS = text(f"SELECT count(*) FROM {STAGING_TABLE} WHERE weight IS NOT NULL")
+
+# Rows carrying a source id are skipped when that id was imported before,
+# so re-running the same export only adds what is new. Within the file only
+# the first row of each source id is kept; rows without one are all kept.
+MERGE_SPOOLS = text(f"""
+    INSERT INTO spools (filament_id, user_id, weight, remaining_weight, spool_weight,
+                        color, hex_color, diameter, purchase_date, purchase_price,
+                        location, nfc_tag_id, qr_code, notes, custom_fields, is_active)
+    SELECT f.id, :user_id, r.weight, r.remaining_weight, r.spool_weight,
+           r.color, r.hex_color, r.diameter, r.purchase_date, r.purchase_price,
+           r.location, r.nfc_tag_id, r.qr_code, r.notes,
+           CASE WHEN r.external_id IS NULL THEN '{{}}'::jsonb
+                ELSE jsonb_build_object('import_id', r.external_id) END,
+           r.is_active
+    FROM (
+        SELECT DISTINCT ON (external_id, CASE WHEN external_id IS NULL THEN row_number END) *
+        FROM {STAGING_TABLE}
+        WHERE weight IS NOT NULL
+        ORDER BY external_id, CASE WHEN external_id IS NULL THEN row_number END, row_number
+    ) r
+    JOIN filaments f ON f.manufacturer_id = r.manufacturer_id AND f.name = r.filament
+    WHERE r.external_id IS NULL OR NOT EXISTS (
+        SELECT 1 FROM spools s
+        WHERE s.user_id = :user_id AND s.custom_fields->>'import_id' = r.external_id
+    )
+    ON CONFLICT DO NOTHING
+""")
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    invalid_rows: int = 0
+    manufacturers_created: int = 0
+    materials_created: int = 0
+    filaments_created: int = 0
+    spools_created: int = 0
+    spools_skipped: int = 0
+    dry_run: bool = False
+    errors: list = field(default_factory=list)
+
+    def add_error(self, row_number: int, detail: str):
+        self.invalid_rows += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "detail": detail})
+
+
+def _flatten(record: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, dict) and key != "extra":
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def _read_records(file: BinaryIO, format: ImportFormat) -> Iterator[dict]:
+    """Yield raw records, reading the file incrementally"""
+    if format == ImportFormat.CSV:
+        yield from csv.DictReader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    elif format == ImportFormat.NDJSON:
+        for line in file:
+            if line.strip():
+                yield orjson.loads(line)
+    else:
+        yield from _json_records(_JSONStream(file))
+
+
+class _JSONStream:
+    """Decodes a JSON document value by value, holding about one record in memory"""
+
+    def __init__(self, file: BinaryIO):
+        self.file = io.TextIOWrapper(file, encoding="utf-8-sig")
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def _read(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(JSON_READ_SIZE)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return not self.eof
+
+    def peek(self) -> str:
+        """The next non-whitespace character, or "" at the end of the file"""
+        while True:
+            self.position = JSON_WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer) or not self._read():
+                return self.buffer[self.position:self.position + 1]
+
+    def expect(self, characters: str) -> str:
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError(f"Expected one of {characters!r}, found {character or 'the end of the file'!r}")
+        self.position += 1
+        return character
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                # A number cut off by the end of the buffer may go on
+                if self.eof or not (isinstance(value, (int, float)) and JSON_NUMBER_TAIL.match(self.buffer, end)):
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if len(self.buffer) - self.position > MAX_JSON_RECORD_SIZE:
+                raise ValueError(f"A record is longer than {MAX_JSON_RECORD_SIZE} characters")
+            self._read()
+
+    def array(self) -> Iterator[Any]:
+        """Elements of an array whose "[" has been read"""
+        if self.peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+def _json_records(stream: _JSONStream) -> Iterator[dict]:
+    """Records of a JSON array, of the "items" array of an object, or a single object"""
+    if stream.expect("[{") == "[":
+        yield from stream.array()
+    else:
+        record, items = {}, False
+        if stream.peek() == "}":
+            stream.position += 1
+        else:
+            while True:
+                key = stream.value()
+                stream.expect(":")
+                if key == "items" and stream.peek() == "[":
+                    stream.position += 1
+                    yield from stream.array()
+                    items = True
+                else:
+                    record[key] = stream.value()
+                if stream.expect(",}") == "}":
+                    break
+        if not items:
+            yield record
+    if stream.peek():
+        raise ValueError("Unexpected data after the JSON document")
+
+
+def _pick(record: dict, name: str) -> Any:
+    for key in FIELD_ALIASES[name]:
+        value = record.get(key)
+        if value is not None and value != "":
+            return value
+    return None
+
+
+def _text(value: Any, max_length: int | None = None) -> str | None:
+    if value is None:
+        return None
+    value = str(value).strip()
+    if max_length is not None and len(value) > max_length:
+        raise ValueError(f"'{value[:20]}...' is longer than {max_length} characters")
+    return value or None
+
+
+def _decimal(value: Any, precision: int = 10, scale: int = 2) -> Decimal | None:
+    """Parse a number that must fit the target NUMERIC(precision, scale)"""
+    if value is None:
+        return None
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"'{value}' is not a number")
+    # An out of range value would abort the whole merge, so reject it here
+    if not number.is_finite() or abs(number) >= 10 ** (precision - scale):
+        raise ValueError(f"{value} is out of range")
+    return number
+
+
+def _integer(value: Any) -> int | None:
+    number = _decimal(value, precision=9, scale=0)
+    return int(number) if number is not None else None
+
+
+def _date(value: Any) -> date | None:
+    if value is None:
+        return None
+    return datetime.fromisoformat(str(value).strip().replace("Z", "+00:00")).date()
+
+
+def _boolean(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+
+def _normalize(record: dict) -> dict:
+    """Map one source record onto the staging columns (ids resolved later)"""
+    record = _flatten(record)
+    row = {
+        "manufacturer": _text(_pick(record, "manufacturer"), 255),
+        "material": _text(_pick(record, "material"), 100),
+        "filament": _text(_pick(record, "filament"), 255),
+    }
+    for name, value in row.items():
+        if value is None:
+            raise ValueError(f"Missing {name}")
+
+    hex_color = _text(_pick(record, "hex_color"))
+    if hex_color:
+        # Spoolman stores RRGGBB or RRGGBBAA without the hash
+        hex_color = "#" + hex_color.lstrip("#")[:6]
+
+    weight = _decimal(_pick(record, "weight"), 8, 2)
+    remaining_weight = _decimal(_pick(record, "remaining_weight"), 8, 2)
+    if remaining_weight is None and weight is not None:
+        used_weight = _decimal(_pick(record, "used_weight"), 8, 2) or 0
+        remaining_weight = max(weight - used_weight, Decimal(0))
+    if weight is None and remaining_weight is not None:
+        weight = remaining_weight
+
+    row.update(
+        density=_decimal(_pick(record, "density"), 5, 3),
+        extruder_temp=_integer(_pick(record, "extruder_temp")),
+        bed_temp=_integer(_pick(record, "bed_temp")),
+        diameter=_decimal(_pick(record, "diameter"), 4, 2) or DEFAULT_DIAMETER,
+        hex_color=hex_color,
+        color=_text(_pick(record, "color"), 100),
+        weight=weight,
+        remaining_weight=remaining_weight,
+        spool_weight=_decimal(_pick(record, "spool_weight"), 8, 2),
+        purchase_price=_decimal(_pick(record, "purchase_price")),
+        purchase_date=_date(_pick(record, "purchase_date")),
+        location=_text(_pick(record, "location"), 255),
+        notes=_text(_pick(record, "notes")),
+        nfc_tag_id=_text(_pick(record, "nfc_tag_id"), 255),
+        qr_code=_text(_pick(record, "qr_code"), 255),
+        is_active=not _boolean(_pick(record, "archived") or False),
+        external_id=_text(_pick(record, "external_id")),
+    )
+    return row
+
+
+class NameResolver:
+    """In-memory name -> id map for a lookup table, creating missing names.
+
+    Names match case-insensitively, so "prusament" in a file reuses an
+    existing "Prusament". New names are inserted in one statement per batch.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.ids: dict[str, UUID] = {}
+        self.created = 0
+
+    async def load(self, db: AsyncSession):
+        result = await db.execute(select(self.model.id, self.model.name))
+        for id, name in result:
+            self.ids.setdefault(name.lower(), id)
+
+    async def resolve(self, db: AsyncSession, names: dict[str, dict]):
+        """Make sure every name has an id; ``names`` maps name -> column values"""
+        missing = {}
+        for name, values in names.items():
+            if name.lower() not in self.ids:
+                missing.setdefault(name.lower(), {"name": name, **values})
+        if not missing:
+            return
+        result = await db.execute(
+            insert(self.model)
+            .values(list(missing.values()))
+            .on_conflict_do_nothing()
+            .returning(self.model.id, self.model.name)
+        )
+        for id, name in result:
+            self.ids[name.lower()] = id
+            self.created += 1
+        # Anything left was created concurrently under the same name
+        left = [values["name"] for key, values in missing.items() if key not in self.ids]
+        if left:
+            result = await db.execute(
+                select(self.model.id, self.model.name).where(self.model.name.in_(left))
+            )
+            for id, name in result:
+                self.ids[name.lower()] = id
+
+    def __getitem__(self, name: str) -> UUID:
+        return self.ids[name.lower()]
+
+
+async def run_import(
+    db: AsyncSession,
+    user_id: UUID,
+    file: BinaryIO,
+    format: ImportFormat,
+    dry_run: bool = False
+) -> AsyncIterator[dict]:
+    """Import a file in one transaction, yielding progress events.
+
+    Records are parsed in batches, their manufacturer and material names
+    resolved through in-memory maps, and COPYed into a temporary staging
+    table. Filaments and spools are then merged with one INSERT ... SELECT
+    each. Invalid records are skipped and reported. With ``dry_run`` every
+    step runs but the transaction is rolled back.
+    """
+    report = ImportReport(dry_run=dry_run)
+    manufacturers = NameResolver(Manufacturer)
+    materials = NameResolver(Material)
+    await manufacturers.load(db)
+    await materials.load(db)
+
+    columns = ", ".join(f"{name} {type}" for name, type in STAGING_COLUMNS)
+    await db.execute(text(f"CREATE TEMPORARY TABLE {STAGING_TABLE} ({columns}) ON COMMIT DROP"))
+    connection = await db.connection()
+    driver_connection = (await connection.get_raw_connection()).driver_connection
+
+    records = _read_records(file, format)
+    while True:
+        # File reads and parsing are blocking; keep them off the event loop
+        try:
+            batch = await run_in_threadpool(lambda: list(itertools.islice(records, IMPORT_BATCH_SIZE)))
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            report.add_error(report.rows + 1, f"Unreadable file: {e}")
+            break
+        if not batch:
+            break
+
+        rows = []
+        for record in batch:
+            report.rows += 1
+            try:
+                if not isinstance(record, dict):
+                    raise ValueError("Record is not an object")
+                row = _normalize(record)
+            except (ValueError, TypeError) as e:
+                report.add_error(report.rows, str(e))
+                continue
+            row["row_number"] = report.rows
+            rows.append(row)
+
+        await manufacturers.resolve(db, {row["manufacturer"]: {} for row in rows})
+        densities = {}
+        for row in rows:
+            densities.setdefault(row["material"], {"density": row["density"] or DEFAULT_MATERIAL_DENSITY})
+        await materials.resolve(db, densities)
+        for row in rows:
+            row["manufacturer_id"] = manufacturers[row["manufacturer"]]
+            row["material_id"] = materials[row["material"]]
+
+        await driver_connection.copy_records_to_table(
+            STAGING_TABLE,
+            records=[tuple(row[name] for name, _ in STAGING_COLUMNS) for row in rows],
+            columns=[name for name, _ in STAGING_COLUMNS]
+        )
+        yield {"stage": "staging", "rows": report.rows, "invalid_rows": report.invalid_rows}
+
+    yield {"stage": "merging", "rows": report.rows}
+    report.manufacturers_created = manufacturers.created
+    report.materials_created = materials.created
+    result = await db.execute(MERGE_FILAMENTS)
+    report.filaments_created = result.rowcount
+    candidates = (await db.execute(COUNT_SPOOL_ROWS)).scalar()
+    result = await db.execute(MERGE_SPOOLS, {"user_id": user_id})
+    report.spools_created = result.rowcount
+    report.spools_skipped = candidates - result.rowcount
+
+    if dry_run:
+        await db.rollback()
+    else:
+        await db.commit()
+        typeahead_index.invalidate()
+    yield {"stage": "done", **asdict(report)}
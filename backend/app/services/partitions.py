@@ -0,0 +1,167 @@
+"""
+Monthly range partitions: created ahead of time, dropped when expired
+"""
+
+import asyncio
+import re
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ..config import settings
+from ..database import engine
+
+# Only one worker maintains partitions at a time; the others skip the round
+PARTITION_LOCK_KEY = 0x46494C50  # "FILP"
+
+# Months created beyond the current one, so inserts never reach the default
+# partition while maintenance is late
+MONTHS_AHEAD = 3
+
+# DDL on the parent waits at most this long for its lock instead of
+# queueing every insert behind a long-running query
+LOCK_TIMEOUT = "5s"
+
+
+def month_start(moment: datetime, offset: int = 0) -> datetime:
+    """First instant (UTC) of the month ``offset`` months from ``moment``'s"""
+    months = moment.year * 12 + moment.month - 1 + offset
+    return datetime(months // 12, months % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+class MonthlyPartitions:
+    """Partitions of one table ``PARTITION BY RANGE`` on a timestamp column.
+
+    Partitions are named ``<table>_YYYY_MM`` and hold one UTC month each;
+    ``<table>_default`` takes rows outside all of them. Expired months are
+    detached and dropped whole, so retention never deletes rows one by one.
+    """
+
+    def __init__(self, table: str, column: str, retention_months: int = 0):
+        self.table = table
+        self.column = column
+        self.retention_months = retention_months
+        self._name = re.compile(rf"^{re.escape(table)}_(\d{{4}})_(\d{{2}})$")
+
+    def partition_name(self, month: datetime) -> str:
+        return f"{self.table}_{month:%Y_%m}"
+
+    async def existing(self, conn: AsyncConnection) -> dict[str, datetime]:
+        """Monthly partitions attached to the table, by name"""
+        names = (await conn.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:table AS regclass)"
+        ), {"table": self.table})).scalars()
+        partitions = {}
+        for name in names:
+            match = self._name.match(name)
+            if match:
+                partitions[name] = datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)
+        return partitions
+
+    async def maintain(self, conn: AsyncConnection, now: Optional[datetime] = None) -> dict:
+        """Create the coming months' partitions and drop expired ones"""
+        now = now or datetime.now(timezone.utc)
+        existing = await self.existing(conn)
+        created, dropped = [], []
+        await conn.execute(text(f"SET lock_timeout = '{LOCK_TIMEOUT}'"))
+        try:
+            for offset in range(MONTHS_AHEAD + 1):
+                month = month_start(now, offset)
+                name = self.partition_name(month)
+                if name in existing:
+                    continue
+                await self._create(conn, name, month)
+                await conn.commit()
+                created.append(name)
+
+            if self.retention_months > 0:
+                # A partition goes once its whole month is past retention
+                cutoff = month_start(now, -self.retention_months)
+                for name, month in sorted(existing.items(), key=lambda item: item[1]):
+                    if month_start(month, 1) > cutoff:
+                        break
+                    await conn.execute(text(f'ALTER TABLE "{self.table}" DETACH PARTITION "{name}"'))
+                    await conn.execute(text(f'DROP TABLE "{name}"'))
+                    await conn.commit()
+                    dropped.append(name)
+        finally:
+            await conn.rollback()
+            await conn.execute(text("RESET lock_timeout"))
+        return {"created": created, "dropped": dropped}
+
+    async def _create(self, conn: AsyncConnection, name: str, month: datetime):
+        lower, upper = month.isoformat(), month_start(month, 1).isoformat()
+        bounds = f"FROM ('{lower}') TO ('{upper}')"
+        in_month = f"\"{self.column}\" >= '{lower}' AND \"{self.column}\" < '{upper}'"
+        default = f"{self.table}_default"
+        stray = (await conn.execute(text(f'SELECT 1 FROM "{default}" WHERE {in_month} LIMIT 1'))).first()
+        if stray is None:
+            await conn.execute(text(f'CREATE TABLE "{name}" PARTITION OF "{self.table}" FOR VALUES {bounds}'))
+            return
+        # Rows with far-off timestamps wait in the default partition; the
+        # new month cannot be attached while they are there, so move them
+        await conn.execute(text(f'CREATE TABLE "{name}" (LIKE "{self.table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+        await conn.execute(text(
+            f'WITH moved AS (DELETE FROM "{default}" WHERE {in_month} RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ))
+        await conn.execute(text(f'ALTER TABLE "{self.table}" ATTACH PARTITION "{name}" FOR VALUES {bounds}'))
+
+
+PARTITIONED_TABLES = [
+    MonthlyPartitions("activity_logs", "created_at", retention_months=settings.ACTIVITY_LOG_RETENTION_MONTHS),
+    MonthlyPartitions("print_jobs", "start_time", retention_months=settings.PRINT_JOB_RETENTION_MONTHS),
+]
+
+
+class PartitionMaintenance:
+    """Runs ``maintain()`` for every partitioned table, one worker at a time"""
+
+    def __init__(self, tables: list[MonthlyPartitions]):
+        self.tables = tables
+        self.last_report: Optional[dict] = None
+
+    async def maintain(self) -> dict:
+        async with engine.connect() as conn:
+            locked = (await conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": PARTITION_LOCK_KEY}
+            )).scalar()
+            await conn.commit()
+            if not locked:
+                return {"skipped": "Another worker is maintaining partitions"}
+            try:
+                report = {}
+                for table in self.tables:
+                    try:
+                        report[table.table] = await table.maintain(conn)
+                    except Exception as e:
+                        # One table failing (e.g. lock timeout) must not stop the others
+                        report[table.table] = {"error": str(e)}
+            finally:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": PARTITION_LOCK_KEY})
+                await conn.commit()
+        self.last_report = report
+        return report
+
+    async def run(self):
+        """Background task maintaining partitions every PARTITION_MAINTENANCE_INTERVAL seconds"""
+        while True:
+            try:
+                report = await self.maintain()
+                for table, changes in report.items():
+                    if not isinstance(changes, dict):
+                        continue
+                    if changes.get("error"):
+                        print(f"⚠️ Partition maintenance of {table} failed: {changes['error']}")
+                    elif changes.get("created") or changes.get("dropped"):
+                        print(f"🗂️ {table}: created {changes['created']}, dropped {changes['dropped']}")
+            except Exception as e:
+                print(f"⚠️ Partition maintenance failed: {e}")
+            await asyncio.sleep(settings.PARTITION_MAINTENANCE_INTERVAL)
+
+
+partition_maintenance = PartitionMaintenance(PARTITIONED_TABLES)
@@ -0,0 +1,252 @@
+"""
+Write-behind ingestion of print job events
+"""
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import bindparam, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.filament import Filament
+from ..models.print_job import PrintJob, PrintJobStatus
+from ..models.print_job_usage import PrintJobDailyUsage
+from ..models.printer import Printer
+from ..models.spool import Spool
+from .batching import BatchWriter
+
+# Event type -> status it moves the job to
+EVENT_STATUS = {
+    "start": PrintJobStatus.PRINTING,
+    "progress": PrintJobStatus.PRINTING,
+    "finish": PrintJobStatus.COMPLETED,
+    "fail": PrintJobStatus.FAILED,
+    "cancel": PrintJobStatus.CANCELLED,
+}
+
+# A job in one of these states ignores further events; reaching one applies
+# the job's filament_used to its spool
+TERMINAL_STATUSES = {PrintJobStatus.COMPLETED, PrintJobStatus.FAILED, PrintJobStatus.CANCELLED}
+
+# start_time is the partition key and is set when the job is created
+UPDATE_COLUMNS = ("spool_id", "job_name", "end_time", "filament_used", "status", "metadata")
+
+# First key of the per-job advisory locks (the second is derived from the id)
+JOB_LOCK_NAMESPACE = 0x46494C4A  # "FILJ"
+
+# Rollup row identity: (user_id, day, printer_id, spool_id)
+USAGE_GROUP = ("user_id", "day", "printer_id", "spool_id")
+
+
+def _job_lock_key(job_id: UUID) -> int:
+    return int.from_bytes(job_id.bytes[:4], "big", signed=True)
+
+
+def _utc_day(moment: datetime) -> date:
+    if moment.tzinfo is None:
+        return moment.date()
+    return moment.astimezone(timezone.utc).date()
+
+
+class IngestQueueFull(Exception):
+    """The ingest queue cannot take the batch; the client should retry later"""
+
+
+def _apply_event(job: dict, event: dict):
+    """Fold one event into the job's row values"""
+    if job["status"] in TERMINAL_STATUSES:
+        return
+    timestamp = event["timestamp"]
+    job["status"] = EVENT_STATUS[event["type"]]
+    if job["start_time"] is None:
+        job["start_time"] = timestamp
+    if job["status"] in TERMINAL_STATUSES:
+        job["end_time"] = timestamp
+    for field in ("spool_id", "job_name", "filament_used"):
+        if event.get(field) is not None:
+            job[field] = event[field]
+    if event.get("progress") is not None:
+        job["metadata"] = {**(job["metadata"] or {}), "progress": event["progress"]}
+
+
+class PrintJobIngest(BatchWriter):
+    """Queues print job events and writes them in batches.
+
+    Request handlers only enqueue. Each flush coalesces all events of a job
+    into one row update; jobs reaching a terminal status subtract their
+    ``filament_used`` from the spool and add it to the daily usage rollup in
+    the same transaction, exactly once.
+    """
+
+    item_name = "print job events"
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float):
+        super().__init__(max_size, batch_size, flush_interval)
+        self.accepted = 0
+        self.written = 0
+        self.rejected = 0
+
+    def submit(self, user_id: UUID, is_admin: bool, events: list[dict]):
+        """Enqueue all events or none of them"""
+        if self.queue.maxsize - self.queue.qsize() < len(events):
+            raise IngestQueueFull()
+        for event in events:
+            self.queue.put_nowait((user_id, is_admin, event))
+        self.accepted += len(events)
+
+    async def flush(self, db: AsyncSession, batch: list):
+        """Write one batch of ``(user_id, is_admin, event)`` in the current transaction"""
+        printer_ids = {event["printer_id"] for _, _, event in batch}
+        spool_ids = {event["spool_id"] for _, _, event in batch if event.get("spool_id")}
+        printers = dict((await db.execute(
+            select(Printer.id, Printer.user_id).where(Printer.id.in_(printer_ids))
+        )).all())
+        spools = dict((await db.execute(
+            select(Spool.id, Spool.user_id).where(Spool.id.in_(spool_ids))
+        )).all()) if spool_ids else {}
+
+        # Group by job, keeping only events about the sender's printers and spools
+        events_by_job: dict[UUID, list] = {}
+        for user_id, is_admin, event in batch:
+            owner = printers.get(event["printer_id"])
+            spool_owner = spools.get(event["spool_id"]) if event.get("spool_id") else owner
+            if owner is None or spool_owner != owner or (not is_admin and owner != user_id):
+                self.rejected += 1
+                continue
+            events_by_job.setdefault(event["job_id"], []).append((owner, event))
+        if not events_by_job:
+            return
+
+        # print_jobs is partitioned by start_time, so job ids are not unique
+        # constraints there: new jobs are created under a transaction-level
+        # advisory lock per id, taken in a fixed order. The same locks
+        # serialize concurrent flushes (other workers) per job.
+        job_ids = sorted(events_by_job)
+        await db.execute(
+            text("SELECT pg_advisory_xact_lock(:namespace, key) FROM unnest(CAST(:keys AS integer[])) AS key"),
+            {"namespace": JOB_LOCK_NAMESPACE, "keys": sorted({_job_lock_key(job_id) for job_id in job_ids})}
+        )
+        try:
+            async with db.begin_nested():
+                written, rejected = await self._write_jobs(db, events_by_job)
+        except Exception as e:
+            # Retry job by job, so one job that cannot be written does not
+            # drop the events of all the others
+            print(f"⚠️ Print job batch failed, writing its jobs one by one: {e}")
+            written = rejected = 0
+            for job_id in job_ids:
+                try:
+                    async with db.begin_nested():
+                        job_written, job_rejected = await self._write_jobs(db, {job_id: events_by_job[job_id]})
+                except Exception as e:
+                    self.failed += len(events_by_job[job_id])
+                    print(f"⚠️ Dropped {len(events_by_job[job_id])} {self.item_name} of job {job_id}: {e}")
+                    continue
+                written += job_written
+                rejected += job_rejected
+        self.written += written
+        self.rejected += rejected
+
+    async def _write_jobs(self, db: AsyncSession, events_by_job: dict[UUID, list]) -> tuple[int, int]:
+        """Create and update the jobs of ``events_by_job``; returns (written, rejected) event counts"""
+        job_ids = sorted(events_by_job)
+        written = rejected = 0
+        existing = set((await db.execute(select(PrintJob.id).where(PrintJob.id.in_(job_ids)))).scalars())
+        new_jobs = [
+            {"id": job_id, "printer_id": events_by_job[job_id][0][1]["printer_id"],
+             "user_id": events_by_job[job_id][0][0], "status": PrintJobStatus.QUEUED,
+             "start_time": min(event["timestamp"] for _, event in events_by_job[job_id])}
+            for job_id in job_ids if job_id not in existing
+        ]
+        if new_jobs:
+            await db.execute(insert(PrintJob.__table__), new_jobs)
+        current = await db.execute(
+            select(PrintJob.id, PrintJob.user_id, PrintJob.printer_id, PrintJob.start_time,
+                   *(PrintJob.__table__.c[column] for column in UPDATE_COLUMNS))
+            .where(PrintJob.id.in_(job_ids))
+            .order_by(PrintJob.id)
+        )
+
+        updates, consumed, ended = [], {}, []
+        for row in current:
+            job = row._asdict()
+            previous = job["status"]
+            for owner, event in sorted(events_by_job[row.id], key=lambda item: item[1]["timestamp"]):
+                # A job id belongs to the printer and user that first reported it
+                if (owner, event["printer_id"]) != (row.user_id, row.printer_id):
+                    rejected += 1
+                    continue
+                _apply_event(job, event)
+                written += 1
+            if job["status"] in TERMINAL_STATUSES and previous not in TERMINAL_STATUSES:
+                ended.append(job)
+                if job["spool_id"] is not None and job["filament_used"]:
+                    consumed[job["spool_id"]] = consumed.get(job["spool_id"], Decimal(0)) + job["filament_used"]
+            updates.append({f"b_{column}": job[column] for column in ("id", "start_time", *UPDATE_COLUMNS)})
+
+        await db.execute(
+            update(PrintJob.__table__)
+            .where(PrintJob.id == bindparam("b_id"), PrintJob.start_time == bindparam("b_start_time"))
+            .values({PrintJob.__table__.c[column]: bindparam(f"b_{column}") for column in UPDATE_COLUMNS}),
+            updates
+        )
+        if consumed:
+            await db.execute(
+                update(Spool.__table__)
+                .where(Spool.id == bindparam("b_id"))
+                .values(remaining_weight=func.greatest(Spool.remaining_weight - bindparam("b_used"), 0)),
+                [{"b_id": spool_id, "b_used": used} for spool_id, used in sorted(consumed.items())]
+            )
+        if ended:
+            await self._add_usage(db, ended)
+        return written, rejected
+
+    async def _add_usage(self, db: AsyncSession, jobs: list[dict]):
+        """Add jobs that just ended to the daily usage rollup"""
+        spool_ids = {job["spool_id"] for job in jobs if job["spool_id"] is not None}
+        materials = dict((await db.execute(
+            select(Spool.id, Filament.material_id).join(Filament, Spool.filament_id == Filament.id)
+            .where(Spool.id.in_(spool_ids))
+        )).all()) if spool_ids else {}
+
+        groups: dict[tuple, dict] = {}
+        for job in jobs:
+            key = (job["user_id"], _utc_day(job["end_time"]), job["printer_id"], job["spool_id"])
+            group = groups.setdefault(key, {
+                **dict(zip(USAGE_GROUP, key)),
+                "material_id": materials.get(job["spool_id"]),
+                "filament_used": Decimal(0),
+                "jobs": 0,
+            })
+            group["filament_used"] += job["filament_used"] or 0
+            group["jobs"] += 1
+
+        table = PrintJobDailyUsage.__table__
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            constraint="uq_print_job_daily_usage_group",
+            set_={
+                "filament_used": table.c.filament_used + statement.excluded.filament_used,
+                "jobs": table.c.jobs + statement.excluded.jobs,
+            }
+        )
+        # Same order in every flush, so concurrent flushes cannot deadlock
+        await db.execute(statement, [groups[key] for key in sorted(groups, key=lambda key: tuple(map(str, key)))])
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "accepted": self.accepted,
+            "written": self.written,
+            "rejected": self.rejected,
+        }
+
+
+print_job_ingest = PrintJobIngest(
+    max_size=settings.PRINT_JOB_QUEUE_SIZE,
+    batch_size=settings.PRINT_JOB_FLUSH_BATCH_SIZE,
+    flush_interval=settings.PRINT_JOB_FLUSH_INTERVAL_MS / 1000
+)
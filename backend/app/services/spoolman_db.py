@@ -0,0 +1,299 @@
+"""
+Incremental sync of the SpoolmanDB filament catalog
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from decimal import Decimal
+from typing import Any, Optional
+from urllib.parse import unquote, urlparse
+
+import httpx
+import orjson
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models.filament import Filament
+from ..models.manufacturer import Manufacturer
+from ..models.material import Material
+from .catalog import catalog_snapshot, write_snapshot
+from .importer import DEFAULT_MATERIAL_DENSITY, NameResolver
+from .typeahead import typeahead_index
+
+CATALOG_FILE = "filaments.json"
+
+# Only one worker syncs at a time; the others skip the round
+SYNC_LOCK_KEY = 0x46494C42  # "FILB"
+
+# Filaments per INSERT ... ON CONFLICT DO UPDATE
+UPSERT_BATCH_SIZE = 500
+
+# Columns owned by the catalog; the content hash covers exactly these
+CATALOG_COLUMNS = (
+    "manufacturer_id", "material_id", "name", "density",
+    "extruder_temp_min", "extruder_temp_max", "bed_temp_min", "bed_temp_max",
+    "colors", "weights", "diameters", "settings",
+)
+
+# Variant attributes kept in Filament.settings
+VARIANT_SETTINGS = ("finish", "pattern", "translucent", "glow", "multi_color_direction")
+
+
+def _density(value: Any) -> Optional[Decimal]:
+    if value is None:
+        return None
+    return Decimal(str(value)).quantize(Decimal("0.001"))
+
+
+def _content_hash(row: dict) -> str:
+    canonical = {column: row[column] for column in CATALOG_COLUMNS}
+    canonical["density"] = str(_density(canonical["density"]))
+    return hashlib.sha1(orjson.dumps(canonical, option=orjson.OPT_SORT_KEYS, default=str)).hexdigest()
+
+
+def _temperature_range(variants: list[dict], key: str) -> tuple[Optional[int], Optional[int]]:
+    values = []
+    for variant in variants:
+        if variant.get(key) is not None:
+            values.append(int(variant[key]))
+        values.extend(int(value) for value in variant.get(f"{key}_range") or [])
+    return (min(values), max(values)) if values else (None, None)
+
+
+def _unique(items: list) -> list:
+    seen, unique = set(), []
+    for item in items:
+        key = orjson.dumps(item, option=orjson.OPT_SORT_KEYS)
+        if key not in seen:
+            seen.add(key)
+            unique.append(item)
+    return unique
+
+
+def group_catalog(variants: list[dict]) -> dict[str, dict]:
+    """Collapse SpoolmanDB variants into one filament per (manufacturer, name).
+
+    SpoolmanDB lists every diameter/weight combination separately; FilaDB
+    keeps those as the ``diameters`` and ``weights`` of a single filament.
+    Returns groups keyed by their ``spoolman_db_id``.
+    """
+    by_name: dict[tuple[str, str], list[dict]] = {}
+    for variant in variants:
+        if variant.get("manufacturer") and variant.get("name") and variant.get("material"):
+            by_name.setdefault((variant["manufacturer"], variant["name"]), []).append(variant)
+
+    groups = {}
+    for (manufacturer, name), members in sorted(by_name.items()):
+        members.sort(key=lambda variant: variant.get("id") or "")
+        first = members[0]
+        extruder_temp_min, extruder_temp_max = _temperature_range(members, "extruder_temp")
+        bed_temp_min, bed_temp_max = _temperature_range(members, "bed_temp")
+        groups[f"{manufacturer}/{name}"[:255]] = {
+            "manufacturer": manufacturer,
+            "material": first["material"],
+            "name": name,
+            "density": first.get("density"),
+            "extruder_temp_min": extruder_temp_min,
+            "extruder_temp_max": extruder_temp_max,
+            "bed_temp_min": bed_temp_min,
+            "bed_temp_max": bed_temp_max,
+            "colors": _unique([
+                {"hex": variant.get("color_hex"), "hexes": variant.get("color_hexes")}
+                for variant in members if variant.get("color_hex") or variant.get("color_hexes")
+            ]),
+            "weights": _unique([
+                {
+                    "weight": variant.get("weight"),
+                    "spool_weight": variant.get("spool_weight"),
+                    "spool_type": variant.get("spool_type"),
+                }
+                for variant in members if variant.get("weight") is not None
+            ]),
+            "diameters": sorted({variant["diameter"] for variant in members if variant.get("diameter")}),
+            "settings": {key: first[key] for key in VARIANT_SETTINGS if first.get(key) not in (None, False)},
+        }
+    return groups
+
+
+class SpoolmanDBSync:
+    """Keeps catalog filaments in step with SpoolmanDB.
+
+    The catalog is fetched conditionally (ETag / Last-Modified); validators
+    are stored under ``state_dir`` once a fetch has been applied, so an
+    unchanged catalog costs a single 304 even after a restart. A changed
+    catalog is diffed against the local rows by content hash and only the
+    differing filaments are upserted. ``base_url`` may be a ``file://``
+    directory, in which case the file's mtime and size act as its ETag.
+    """
+
+    def __init__(self, base_url: str, state_dir: str):
+        self.base_url = base_url.rstrip("/")
+        self.state_path = os.path.join(state_dir, "sync_state.json")
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = asyncio.Lock()
+        self.last_report: Optional[dict] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=30.0, follow_redirects=True)
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _load_state(self) -> dict:
+        try:
+            with open(self.state_path, "rb") as f:
+                return orjson.loads(f.read())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return {}
+
+    def _save_state(self, state: dict):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        temporary = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(orjson.dumps(state))
+        os.replace(temporary, self.state_path)
+
+    async def fetch(self, name: str, validators: dict) -> tuple[Optional[bytes], dict]:
+        """Return ``(body, validators)``, or ``(None, validators)`` when unchanged"""
+        url = f"{self.base_url}/{name}"
+        if url.startswith("file://"):
+            path = unquote(urlparse(url).path)
+            stat = os.stat(path)
+            etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+            if validators.get("etag") == etag:
+                return None, validators
+            with open(path, "rb") as f:
+                return await asyncio.to_thread(f.read), {"etag": etag}
+
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        response = await self.client.get(url, headers=headers)
+        if response.status_code == 304:
+            return None, validators
+        response.raise_for_status()
+        return response.content, {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+        }
+
+    async def sync(self, force: bool = False) -> dict:
+        """Run one sync round; ``force`` ignores the stored validators"""
+        async with self._lock:
+            async with AsyncSessionLocal() as db:
+                # Transaction-scoped, so lock and release stay on one server
+                # connection behind PgBouncer too
+                locked = (await db.execute(
+                    text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": SYNC_LOCK_KEY}
+                )).scalar()
+                if not locked:
+                    return {"skipped": "Another worker is syncing"}
+                report = await self._sync(db, force)
+            self.last_report = report
+            return report
+
+    async def _sync(self, db: AsyncSession, force: bool) -> dict:
+        started = time.monotonic()
+        state = self._load_state()
+        # Without a snapshot the catalog has to be fetched again to write one
+        force = force or not os.path.exists(catalog_snapshot.path)
+        body, validators = await self.fetch(CATALOG_FILE, {} if force else state.get(CATALOG_FILE, {}))
+        report = {"modified": body is not None}
+        if body is not None:
+            groups = group_catalog(orjson.loads(body))
+            report.update(await self.apply(db, groups))
+            # Written while the lock is still held; committing releases it
+            await asyncio.to_thread(write_snapshot, catalog_snapshot.path, groups)
+            await db.commit()
+            typeahead_index.invalidate()
+            state[CATALOG_FILE] = validators
+            self._save_state(state)
+        report["seconds"] = round(time.monotonic() - started, 3)
+        return report
+
+    async def apply(self, db: AsyncSession, groups: dict[str, dict]) -> dict:
+        """Upsert the groups whose content differs from the local rows"""
+        manufacturers = NameResolver(Manufacturer)
+        materials = NameResolver(Material)
+        await manufacturers.load(db)
+        await materials.load(db)
+        await manufacturers.resolve(db, {group["manufacturer"]: {} for group in groups.values()})
+        densities = {}
+        for group in groups.values():
+            densities.setdefault(group["material"], {"density": _density(group["density"]) or DEFAULT_MATERIAL_DENSITY})
+        await materials.resolve(db, densities)
+
+        result = await db.execute(
+            select(Filament.spoolman_db_id, *(getattr(Filament, column) for column in CATALOG_COLUMNS))
+            .where(Filament.spoolman_db_id.is_not(None))
+        )
+        local = {row.spoolman_db_id: _content_hash(row._asdict()) for row in result}
+
+        changed = []
+        seen = set()
+        for spoolman_db_id, group in groups.items():
+            row = {
+                **group,
+                "manufacturer_id": manufacturers[group["manufacturer"]],
+                "material_id": materials[group["material"]],
+                "density": _density(group["density"]),
+            }
+            # Manufacturer names match case-insensitively, so two groups can
+            # land on the same row; one statement may only upsert it once
+            key = (row["manufacturer_id"], row["name"])
+            if key in seen:
+                continue
+            seen.add(key)
+            if local.get(spoolman_db_id) != _content_hash(row):
+                changed.append({"spoolman_db_id": spoolman_db_id, **{column: row[column] for column in CATALOG_COLUMNS}})
+
+        # A filament a user created under a catalog name stays theirs: only
+        # rows that came from SpoolmanDB are updated, the others are counted
+        upserted = 0
+        for start in range(0, len(changed), UPSERT_BATCH_SIZE):
+            statement = insert(Filament).values(changed[start:start + UPSERT_BATCH_SIZE])
+            result = await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[Filament.manufacturer_id, Filament.name],
+                    set_={
+                        **{column: statement.excluded[column] for column in CATALOG_COLUMNS + ("spoolman_db_id",)},
+                        "updated_at": func.now(),
+                    },
+                    where=Filament.spoolman_db_id.is_not(None),
+                ).returning(Filament.id)
+            )
+            upserted += len(result.all())
+
+        return {
+            "filaments": len(groups),
+            "filaments_upserted": upserted,
+            "filaments_kept_local": len(changed) - upserted,
+            "manufacturers_created": manufacturers.created,
+            "materials_created": materials.created,
+        }
+
+    async def run(self):
+        """Background task syncing every SPOOLMAN_DB_SYNC_INTERVAL seconds"""
+        while True:
+            try:
+                report = await self.sync()
+                if report.get("filaments_upserted"):
+                    print(f"📚 SpoolmanDB sync updated {report['filaments_upserted']} filaments")
+            except Exception as e:
+                print(f"⚠️ SpoolmanDB sync failed: {e}")
+            await asyncio.sleep(settings.SPOOLMAN_DB_SYNC_INTERVAL)
+
+
+spoolman_db_sync = SpoolmanDBSync(settings.SPOOLMAN_DB_URL, os.path.join(settings.UPLOAD_DIR, "spoolmandb"))
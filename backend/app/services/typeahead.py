@@ -0,0 +1,254 @@
+"""
+In-process prefix index for the manufacturer, material and filament pickers
+"""
+
+import asyncio
+import bisect
+import time
+from typing import Callable, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.filament import Filament
+from ..models.manufacturer import Manufacturer
+from ..models.material import Material
+
+KINDS = ("manufacturer", "material", "filament")
+MODELS = {Manufacturer: "manufacturer", Material: "material", Filament: "filament"}
+
+# Changes whenever a row is added, updated or deleted
+VERSION_COLUMNS = [
+    column
+    for model in MODELS
+    for column in (
+        select(func.count()).select_from(model).scalar_subquery(),
+        select(func.max(model.updated_at)).scalar_subquery(),
+    )
+]
+
+
+def _fold(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+def _keys(name: str, *qualifiers: str) -> set[str]:
+    """Every word suffix of the name, so any word can start the query.
+
+    ``"PLA Basic"`` -> ``{"pla basic", "basic"}``; qualifiers (the
+    manufacturer of a filament) are also accepted in front of the name.
+    """
+    folded = _fold(name)
+    words = folded.split(" ")
+    keys = {" ".join(words[start:]) for start in range(len(words))}
+    for qualifier in qualifiers:
+        keys.add(f"{_fold(qualifier)} {folded}")
+    return keys
+
+
+class _SortedKeys:
+    """Sorted ``(key, id)`` array of one kind; a prefix is a contiguous run"""
+
+    def __init__(self):
+        self.keys: list[tuple[str, UUID]] = []
+        self.entries: dict[UUID, dict] = {}
+        self._entry_keys: dict[UUID, set[str]] = {}
+
+    def load(self, entries: list[tuple[dict, set[str]]]):
+        self.keys = sorted((key, entry["id"]) for entry, keys in entries for key in keys)
+        self.entries = {entry["id"]: entry for entry, _ in entries}
+        self._entry_keys = {entry["id"]: keys for entry, keys in entries}
+
+    def put(self, entry: dict, keys: set[str]):
+        self.remove(entry["id"])
+        for key in keys:
+            bisect.insort(self.keys, (key, entry["id"]))
+        self.entries[entry["id"]] = entry
+        self._entry_keys[entry["id"]] = keys
+
+    def remove(self, id: UUID):
+        for key in self._entry_keys.pop(id, ()):
+            del self.keys[bisect.bisect_left(self.keys, (key, id))]
+        self.entries.pop(id, None)
+
+    def search(self, prefix: str, limit: int, predicate: Optional[Callable[[dict], bool]] = None) -> list[dict]:
+        results, seen = [], set()
+        position = bisect.bisect_left(self.keys, (prefix,))
+        while position < len(self.keys) and len(results) < limit:
+            key, id = self.keys[position]
+            if not key.startswith(prefix):
+                break
+            position += 1
+            if id in seen:
+                continue
+            seen.add(id)
+            entry = self.entries[id]
+            if predicate is None or predicate(entry):
+                results.append(entry)
+        return results
+
+
+class TypeaheadIndex:
+    """Per-worker prefix index over manufacturers, materials and filaments.
+
+    Queries are answered from memory. Writes made through this worker's
+    handlers are applied immediately, and the known version is moved along
+    with them; every ``ttl`` seconds a single count/max(updated_at) query
+    detects writes made elsewhere (other workers, imports, the catalog
+    sync) and reloads the index.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._kinds: Optional[dict[str, _SortedKeys]] = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self.reloads = 0
+
+    async def ensure(self, db: AsyncSession):
+        if self._kinds is not None and time.monotonic() < self._checked_at + self.ttl:
+            return
+        async with self._lock:
+            if self._kinds is not None and time.monotonic() < self._checked_at + self.ttl:
+                return
+            version = tuple((await db.execute(select(*VERSION_COLUMNS))).one())
+            if self._kinds is None or version != self._version:
+                await self._load(db)
+                self._version = version
+            self._checked_at = time.monotonic()
+
+    async def _load(self, db: AsyncSession):
+        manufacturers = (await db.execute(select(Manufacturer.id, Manufacturer.name))).all()
+        materials = (await db.execute(select(Material.id, Material.name))).all()
+        filaments = (await db.execute(
+            select(Filament.id, Filament.name, Filament.manufacturer_id, Filament.material_id)
+        )).all()
+
+        kinds = {kind: _SortedKeys() for kind in KINDS}
+        kinds["manufacturer"].load([self._named("manufacturer", row.id, row.name) for row in manufacturers])
+        kinds["material"].load([self._named("material", row.id, row.name) for row in materials])
+        kinds["filament"].load([
+            self._filament(kinds, row.id, row.name, row.manufacturer_id, row.material_id) for row in filaments
+        ])
+        self._kinds = kinds
+        self.reloads += 1
+
+    @staticmethod
+    def _named(kind: str, id: UUID, name: str) -> tuple[dict, set[str]]:
+        return {"type": kind, "id": id, "name": name}, _keys(name)
+
+    @staticmethod
+    def _filament(kinds, id, name, manufacturer_id, material_id) -> tuple[dict, set[str]]:
+        manufacturer = kinds["manufacturer"].entries.get(manufacturer_id)
+        material = kinds["material"].entries.get(material_id)
+        entry = {
+            "type": "filament",
+            "id": id,
+            "name": name,
+            "manufacturer_id": manufacturer_id,
+            "manufacturer": manufacturer["name"] if manufacturer else None,
+            "material_id": material_id,
+            "material": material["name"] if material else None,
+        }
+        return entry, _keys(name, *([manufacturer["name"]] if manufacturer else []))
+
+    def invalidate(self):
+        """Reload on the next query (after bulk writes such as imports)"""
+        self._version = None
+        self._checked_at = 0.0
+
+    def put(self, instance):
+        """Apply a created or updated manufacturer, material or filament"""
+        if self._kinds is None:
+            return
+        kind = MODELS[type(instance)]
+        self._track(kind, added=0 if instance.id in self._kinds[kind].entries else 1, updated_at=instance.updated_at)
+        if kind == "filament":
+            self._kinds[kind].put(*self._filament(
+                self._kinds, instance.id, instance.name, instance.manufacturer_id, instance.material_id
+            ))
+            return
+        self._kinds[kind].put(*self._named(kind, instance.id, instance.name))
+        # Filament entries carry the manufacturer / material name
+        self._refresh_filaments(f"{kind}_id", instance.id)
+
+    def remove(self, instance):
+        """Apply a deleted manufacturer, material or filament"""
+        if self._kinds is None:
+            return
+        kind = MODELS[type(instance)]
+        self._track(kind, added=-1, removed_updated_at=instance.updated_at)
+        self._kinds[kind].remove(instance.id)
+        if kind != "filament":
+            # Their filaments are deleted by ON DELETE CASCADE
+            filaments = self._kinds["filament"]
+            cascaded = [entry for entry in filaments.entries.values() if entry[f"{kind}_id"] == instance.id]
+            if cascaded:
+                # Whether one of them was the newest filament is unknown here
+                self._version = None
+            for entry in cascaded:
+                filaments.remove(entry["id"])
+
+    def _track(self, kind: str, added: int, updated_at=None, removed_updated_at=None):
+        """Move the known version past a write made through this worker.
+
+        The version is what the count/max(updated_at) query will return once
+        the write is visible, so the next check does not reload for it; a
+        write made elsewhere in the meantime still shows up as a mismatch.
+        Deleting the newest row lowers max(updated_at) to a value only the
+        database knows, so then the version is dropped and the index reloads.
+        """
+        if self._version is None:
+            return
+        version = list(self._version)
+        position = 2 * list(MODELS.values()).index(kind)
+        newest = version[position + 1]
+        if removed_updated_at is not None and (newest is None or removed_updated_at >= newest):
+            self._version = None
+            return
+        version[position] += added
+        if updated_at is not None and (newest is None or updated_at > newest):
+            version[position + 1] = updated_at
+        self._version = tuple(version)
+
+    def _refresh_filaments(self, field: str, id: UUID):
+        filaments = self._kinds["filament"]
+        for entry in [entry for entry in filaments.entries.values() if entry[field] == id]:
+            filaments.put(*self._filament(
+                self._kinds, entry["id"], entry["name"], entry["manufacturer_id"], entry["material_id"]
+            ))
+
+    def search(
+        self,
+        q: str,
+        kinds: tuple = KINDS,
+        limit: int = 10,
+        manufacturer_id: Optional[UUID] = None,
+        material_id: Optional[UUID] = None
+    ) -> list[dict]:
+        prefix = _fold(q)
+        results = []
+        for kind in kinds:
+            predicate = None
+            if kind == "filament" and (manufacturer_id or material_id):
+                def predicate(entry):
+                    return ((manufacturer_id is None or entry["manufacturer_id"] == manufacturer_id)
+                            and (material_id is None or entry["material_id"] == material_id))
+            results.extend(self._kinds[kind].search(prefix, limit - len(results), predicate))
+            if len(results) >= limit:
+                break
+        return results
+
+    def stats(self) -> dict:
+        kinds = self._kinds or {}
+        return {
+            "loaded": self._kinds is not None,
+            "reloads": self.reloads,
+            **{f"{kind}s": len(keys.entries) for kind, keys in kinds.items()},
+        }
+
+
+typeahead_index = TypeaheadIndex(ttl=settings.TYPEAHEAD_REFRESH_SECONDS)
@@ -0,0 +1,76 @@
+"""
+Spool and filament list pages: ORM entities against column projections
+
+Fetches a page, validates it against the response model and dumps it to
+JSON, once through ``select(Spool)`` and once through the projection the
+list endpoints use, and reports rows per second and peak memory. Runs
+against DATABASE_URL, e.g. the test database after a pytest run:
+
+    cd backend
+    DATABASE_URL=postgresql://postgres@localhost:5432/filadb_test python -m benchmarks.list_queries
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app.api.expand import response_columns
+from app.api.filaments import FilamentResponse
+from app.api.spools import SpoolResponse
+from app.database import AsyncSessionLocal, engine
+from app.models import Filament, Spool
+
+
+async def fetch_and_dump(model, schema, limit: int, projected: bool) -> int:
+    adapter = TypeAdapter(List[schema])
+    query = select(*response_columns(model, schema)) if projected else select(model)
+    query = query.order_by(model.created_at, model.id).limit(limit)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(query)
+        rows = [row._asdict() for row in result.all()] if projected else result.scalars().all()
+        adapter.dump_json(adapter.validate_python(rows), exclude_unset=True)
+    return len(rows)
+
+
+async def measure(model, schema, limit: int, runs: int, projected: bool) -> tuple[int, float, float]:
+    await fetch_and_dump(model, schema, limit, projected)
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        count = await fetch_and_dump(model, schema, limit, projected)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    await fetch_and_dump(model, schema, limit, projected)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, statistics.median(timings), peak
+
+
+async def main(limit: int, runs: int):
+    for model, schema in ((Spool, SpoolResponse), (Filament, FilamentResponse)):
+        for projected in (False, True):
+            count, median, peak = await measure(model, schema, limit, runs, projected)
+            if not count:
+                print(f"{model.__tablename__}: no rows, seed the database first")
+                break
+            path = "projection" if projected else "ORM"
+            print(
+                f"{model.__tablename__:<10} {path:<10} {count:>6} rows  "
+                f"{count / median / 1000:6.1f}k rows/s  peak {peak / 1e6:5.1f} MB"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--limit", type=int, default=5000, help="rows per page")
+    parser.add_argument("--runs", type=int, default=11, help="timed runs; the median is reported")
+    args = parser.parse_args()
+    asyncio.run(main(args.limit, args.runs))
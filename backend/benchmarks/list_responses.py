@@ -0,0 +1,106 @@
+"""
+Rendering list responses: FastAPI's default path against ResponseAdapter
+
+Renders a page of spool rows the three ways a route can return it and
+reports rows per second, then times the list endpoints end to end over
+ASGI as the first admin user. Runs against DATABASE_URL, e.g. the test
+database after a pytest run:
+
+    cd backend
+    DATABASE_URL=postgresql://postgres@localhost:5432/filadb_test python -m benchmarks.list_responses
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import select
+
+from app.api.expand import response_columns
+from app.api.spools import SpoolResponse
+from app.auth.auth import create_access_token
+from app.database import AsyncSessionLocal, engine
+from app.main import app
+from app.models import Spool, User
+from app.models.user import UserRole
+from app.responses import ORJSONResponse, ResponseAdapter
+
+ENDPOINTS = ["/api/spools/?limit=2000", "/api/filaments/?limit=500", "/api/printers/?limit=1000"]
+
+
+def median_time(func, runs: int) -> float:
+    func()
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def render(rows: list[dict], runs: int):
+    field = create_response_field(name="spools", type_=List[SpoolResponse])
+    adapter = ResponseAdapter(List[SpoolResponse], exclude_unset=True)
+
+    def serialized():
+        # What FastAPI does with a route's return value; the coroutine never
+        # suspends for a plain response model, so drive it to completion here
+        coroutine = serialize_response(field=field, response_content=rows, exclude_unset=True, is_coroutine=True)
+        try:
+            coroutine.send(None)
+        except StopIteration as done:
+            return done.value
+        raise RuntimeError("serialize_response suspended")
+
+    paths = {
+        "FastAPI default": lambda: JSONResponse(serialized()),
+        "FastAPI + orjson": lambda: ORJSONResponse(serialized()),
+        "ResponseAdapter": lambda: adapter.render(rows),
+    }
+    for name, func in paths.items():
+        print(f"  {name:<18} {len(rows) / median_time(func, runs) / 1000:6.1f}k rows/s")
+
+
+async def end_to_end(username: str, runs: int):
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for path in ENDPOINTS:
+            timings = []
+            for _ in range(runs + 1):
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                timings.append(time.perf_counter() - started)
+            response.raise_for_status()
+            print(f"  {path:<28} {len(response.json()):>5} rows  {statistics.median(timings[1:]) * 1000:6.1f} ms")
+
+
+async def main(limit: int, runs: int):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(*response_columns(Spool, SpoolResponse)).order_by(Spool.created_at, Spool.id).limit(limit)
+        )
+        rows = [row._asdict() for row in result.all()]
+        username = await db.scalar(select(User.username).where(User.role == UserRole.ADMIN).limit(1))
+    if not rows:
+        print("No spools, seed the database first")
+        return
+
+    print(f"Rendering {len(rows)} spool rows (median of {runs})")
+    render(rows, runs)
+    print(f"End to end over ASGI as {username} (median of {runs})")
+    await end_to_end(username, runs)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--limit", type=int, default=5000, help="spool rows to render")
+    parser.add_argument("--runs", type=int, default=9, help="timed runs; the median is reported")
+    args = parser.parse_args()
+    asyncio.run(main(args.limit, args.runs))
@@ -0,0 +1,93 @@
+"""
+Concurrent logins against the password hashing pool
+
+Runs N password verifications at once, the way a login burst reaches the
+API, and reports their latency and how long the event loop stalled:
+
+    cd backend
+    python -m benchmarks.password_hashing --logins 64 --workers 2 --queue 32
+    python -m benchmarks.password_hashing --logins 16 --inline   # without the pool
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import HTTPException
+
+from app.auth.auth import get_password_hash, verify_password
+from app.auth.hashing import PasswordHasher
+
+PASSWORD = "correct horse battery staple"
+
+# How often the loop is expected to wake up; the lateness of these
+# wake-ups is the stall every other request would see
+TICK = 0.001
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def measure_stall(stop: asyncio.Event) -> list[float]:
+    lateness = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lateness.append(time.perf_counter() - started - TICK)
+    return lateness
+
+
+async def login(hasher: PasswordHasher | None, password_hash: str) -> tuple[float, bool]:
+    started = time.perf_counter()
+    try:
+        if hasher is None:
+            verify_password(PASSWORD, password_hash)
+        else:
+            await hasher.run(verify_password, PASSWORD, password_hash)
+    except HTTPException:
+        return time.perf_counter() - started, False
+    return time.perf_counter() - started, True
+
+
+async def main(logins: int, workers: int, queue: int, inline: bool):
+    password_hash = get_password_hash(PASSWORD)
+    hasher = None if inline else PasswordHasher(max_workers=workers, max_queue=queue)
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_stall(stop))
+    await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login(hasher, password_hash) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    lateness = await ticker
+    if hasher is not None:
+        await hasher.shutdown()
+
+    accepted = [latency for latency, ok in results if ok]
+    mode = "inline" if inline else f"pool of {workers}, queue {queue}"
+    print(f"{logins} concurrent logins ({mode}) in {elapsed:.2f} s")
+    print(f"  accepted {len(accepted)}, rejected with 503: {logins - len(accepted)}")
+    if accepted:
+        print(
+            f"  latency p50 {percentile(accepted, 0.5) * 1000:.0f} ms, "
+            f"p99 {percentile(accepted, 0.99) * 1000:.0f} ms, "
+            f"mean {statistics.mean(accepted) * 1000:.0f} ms"
+        )
+    print(
+        f"  event loop stall p50 {percentile(lateness, 0.5) * 1000:.1f} ms, "
+        f"p99 {percentile(lateness, 0.99) * 1000:.1f} ms, max {max(lateness) * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--queue", type=int, default=32)
+    parser.add_argument("--inline", action="store_true", help="verify on the event loop, as before the pool")
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.workers, args.queue, args.inline))
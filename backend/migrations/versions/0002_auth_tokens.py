@@ -0,0 +1,61 @@
+"""Refresh tokens and API keys
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# IF NOT EXISTS: these tables may already exist from create_all at startup
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS refresh_tokens (
+        jti UUID PRIMARY KEY,
+        user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        family_id UUID NOT NULL,
+        expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        revoked_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS api_keys (
+        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+        user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        name VARCHAR(255) NOT NULL,
+        prefix VARCHAR(32) UNIQUE NOT NULL,
+        key_hash VARCHAR(64) NOT NULL,
+        scopes JSONB DEFAULT '[]',
+        expires_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "DROP INDEX IF EXISTS ix_refresh_tokens_user_id",
+    "DROP INDEX IF EXISTS ix_refresh_tokens_family_id",
+    "DROP INDEX IF EXISTS ix_api_keys_user_id",
+    "CREATE INDEX IF NOT EXISTS idx_refresh_tokens_user_id ON refresh_tokens(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_refresh_tokens_family_id ON refresh_tokens(family_id)",
+    "CREATE INDEX IF NOT EXISTS idx_api_keys_user_id ON api_keys(user_id)",
+]
+
+
+def upgrade() -> None:
+    for statement in SCHEMA:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS api_keys")
+    op.execute("DROP TABLE IF EXISTS refresh_tokens")
@@ -0,0 +1,69 @@
+"""Composite and partial indexes for list endpoint access paths
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # read_spools: user_id + is_active (+ filament_id / printer_id); the
+    # trailing (created_at, id) also serves the keyset order added in 0004
+    op.create_index("idx_spools_user_active_created", "spools", ["user_id", "is_active", "created_at", "id"])
+    op.create_index(
+        "idx_spools_user_filament_active", "spools", ["user_id", "filament_id"],
+        postgresql_where=sa.text("is_active")
+    )
+    op.create_index(
+        "idx_spools_user_printer", "spools", ["user_id", "printer_id"],
+        postgresql_where=sa.text("printer_id IS NOT NULL")
+    )
+    # read_printers: user_id + status
+    op.create_index("idx_printers_user_status", "printers", ["user_id", "status"])
+    # read_filaments: material filter (manufacturer is covered by the unique key)
+    op.create_index("idx_filaments_material_id", "filaments", ["material_id"])
+    # Print job history per printer / spool / user, newest first
+    op.create_index("idx_print_jobs_printer_start", "print_jobs", ["printer_id", sa.text("start_time DESC")])
+    op.create_index("idx_print_jobs_spool_start", "print_jobs", ["spool_id", sa.text("start_time DESC")])
+    op.create_index("idx_print_jobs_user_start", "print_jobs", ["user_id", sa.text("start_time DESC")])
+
+    # Superseded by the composites above or duplicated by UNIQUE constraints.
+    # IF EXISTS: databases created with create_all() never had them.
+    op.drop_index("idx_spools_user_id", "spools", if_exists=True)
+    op.drop_index("idx_spools_nfc_tag_id", "spools", if_exists=True)
+    op.drop_index("idx_users_username", "users", if_exists=True)
+    op.drop_index("idx_users_email", "users", if_exists=True)
+    op.drop_index("idx_print_jobs_printer_id", "print_jobs", if_exists=True)
+    op.drop_index("idx_print_jobs_spool_id", "print_jobs", if_exists=True)
+    op.drop_index("idx_print_jobs_user_id", "print_jobs", if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index("idx_print_jobs_user_id", "print_jobs", ["user_id"])
+    op.create_index("idx_print_jobs_spool_id", "print_jobs", ["spool_id"])
+    op.create_index("idx_print_jobs_printer_id", "print_jobs", ["printer_id"])
+    op.create_index("idx_users_email", "users", ["email"])
+    op.create_index("idx_users_username", "users", ["username"])
+    op.create_index("idx_spools_nfc_tag_id", "spools", ["nfc_tag_id"])
+    op.create_index("idx_spools_user_id", "spools", ["user_id"])
+
+    op.drop_index("idx_print_jobs_user_start", "print_jobs")
+    op.drop_index("idx_print_jobs_spool_start", "print_jobs")
+    op.drop_index("idx_print_jobs_printer_start", "print_jobs")
+    op.drop_index("idx_filaments_material_id", "filaments")
+    op.drop_index("idx_printers_user_status", "printers")
+    op.drop_index("idx_spools_user_printer", "spools")
+    op.drop_index("idx_spools_user_filament_active", "spools")
+    op.drop_index("idx_spools_user_active_created", "spools")
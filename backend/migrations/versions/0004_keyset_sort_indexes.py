@@ -0,0 +1,41 @@
+"""Indexes backing the (created_at, id) keyset sort of list endpoints
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# idx_spools_user_active_created (0003) already ends in created_at, id
+SORT_INDEXES = [
+    ("idx_spools_created", "spools", ["created_at", "id"]),
+    ("idx_spools_user_created", "spools", ["user_id", "created_at", "id"]),
+    ("idx_printers_created", "printers", ["created_at", "id"]),
+    ("idx_printers_user_created", "printers", ["user_id", "created_at", "id"]),
+    ("idx_filaments_created", "filaments", ["created_at", "id"]),
+    ("idx_manufacturers_created", "manufacturers", ["created_at", "id"]),
+    ("idx_materials_created", "materials", ["created_at", "id"]),
+    ("idx_users_created", "users", ["created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in SORT_INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, columns in reversed(SORT_INDEXES):
+        op.drop_index(name, table)
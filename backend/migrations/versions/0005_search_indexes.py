@@ -0,0 +1,45 @@
+"""GIN indexes backing /api/search
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Short names are matched fuzzily with trigrams
+TRIGRAM_INDEXES = [
+    ("idx_filaments_name_trgm", "filaments", "name"),
+    ("idx_manufacturers_name_trgm", "manufacturers", "name"),
+    ("idx_materials_name_trgm", "materials", "name"),
+    ("idx_spools_color_trgm", "spools", "color"),
+    ("idx_spools_location_trgm", "spools", "location"),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(name, table, [column], postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+    # Notes are free text, matched by words
+    op.create_index(
+        "idx_spools_notes_fts", "spools", [sa.text("to_tsvector('simple', coalesce(notes, ''))")],
+        postgresql_using="gin"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_spools_notes_fts", "spools")
+    for name, table, column in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table)
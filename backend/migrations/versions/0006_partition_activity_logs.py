@@ -0,0 +1,112 @@
+"""Partition activity_logs by month on created_at
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Months created beyond the current one; the application keeps this many
+# ahead from then on (app.services.partitions)
+MONTHS_AHEAD = 3
+
+COLUMNS = "id, user_id, action, resource_type, resource_id, details, ip_address, user_agent, created_at"
+
+# One partition per UTC month from the oldest entry to MONTHS_AHEAD ahead
+CREATE_MONTHLY_PARTITIONS = f"""
+DO $$
+DECLARE
+    month timestamptz;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', coalesce((SELECT min(created_at) FROM activity_logs_unpartitioned), now()), 'UTC'),
+            date_trunc('month', now(), 'UTC') + interval '{MONTHS_AHEAD} months',
+            interval '1 month'
+        )
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF activity_logs FOR VALUES FROM (%L) TO (%L)',
+            'activity_logs_' || to_char(month AT TIME ZONE 'UTC', 'YYYY_MM'),
+            month,
+            month + interval '1 month'
+        );
+    END LOOP;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE activity_logs RENAME TO activity_logs_unpartitioned")
+    op.execute("ALTER TABLE activity_logs_unpartitioned RENAME CONSTRAINT activity_logs_pkey TO activity_logs_unpartitioned_pkey")
+    op.execute("DROP INDEX IF EXISTS idx_activity_logs_user_id")
+    op.execute("DROP INDEX IF EXISTS idx_activity_logs_created_at")
+
+    # The partition key has to be part of the primary key; leading with it
+    # makes the key the index for time ranges and (created_at, id) keyset pages
+    op.execute("""
+        CREATE TABLE activity_logs (
+            id UUID NOT NULL DEFAULT uuid_generate_v4(),
+            user_id UUID REFERENCES users(id) ON DELETE SET NULL,
+            action VARCHAR(100) NOT NULL,
+            resource_type VARCHAR(50) NOT NULL,
+            resource_id UUID,
+            details JSONB DEFAULT '{}',
+            ip_address INET,
+            user_agent TEXT,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT activity_logs_pkey PRIMARY KEY (created_at, id)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute(CREATE_MONTHLY_PARTITIONS)
+    # Catches rows outside every monthly partition instead of failing the insert
+    op.execute("CREATE TABLE activity_logs_default PARTITION OF activity_logs DEFAULT")
+    op.execute(
+        f"INSERT INTO activity_logs ({COLUMNS}) "
+        f"SELECT {COLUMNS.replace('created_at', 'coalesce(created_at, CURRENT_TIMESTAMP)')} "
+        "FROM activity_logs_unpartitioned"
+    )
+    op.execute("DROP TABLE activity_logs_unpartitioned")
+
+    # Created on the parent after the copy; every partition gets its own
+    op.execute("CREATE INDEX idx_activity_logs_user_created ON activity_logs (user_id, created_at, id)")
+    op.execute(
+        "CREATE INDEX idx_activity_logs_resource_created "
+        "ON activity_logs (resource_type, resource_id, created_at, id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE activity_logs RENAME TO activity_logs_partitioned")
+    op.execute("ALTER TABLE activity_logs_partitioned RENAME CONSTRAINT activity_logs_pkey TO activity_logs_partitioned_pkey")
+    op.execute("DROP INDEX idx_activity_logs_user_created")
+    op.execute("DROP INDEX idx_activity_logs_resource_created")
+    op.execute("""
+        CREATE TABLE activity_logs (
+            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            user_id UUID REFERENCES users(id) ON DELETE SET NULL,
+            action VARCHAR(100) NOT NULL,
+            resource_type VARCHAR(50) NOT NULL,
+            resource_id UUID,
+            details JSONB DEFAULT '{}',
+            ip_address INET,
+            user_agent TEXT,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    op.execute(f"INSERT INTO activity_logs ({COLUMNS}) SELECT {COLUMNS} FROM activity_logs_partitioned")
+    op.execute("DROP TABLE activity_logs_partitioned CASCADE")
+    op.execute("CREATE INDEX idx_activity_logs_user_id ON activity_logs(user_id)")
+    op.execute("CREATE INDEX idx_activity_logs_created_at ON activity_logs(created_at)")
@@ -0,0 +1,169 @@
+"""Partition print_jobs by month on start_time; daily usage rollup
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Months created beyond the current one; the application keeps this many
+# ahead from then on (app.services.partitions)
+MONTHS_AHEAD = 3
+
+COLUMNS = (
+    "id, printer_id, spool_id, user_id, job_name, start_time, end_time, filament_used, "
+    "status, notes, metadata, created_at, updated_at"
+)
+
+INDEXES = [
+    ("idx_print_jobs_printer_start", "printer_id, start_time DESC"),
+    ("idx_print_jobs_spool_start", "spool_id, start_time DESC"),
+    ("idx_print_jobs_user_start", "user_id, start_time DESC"),
+]
+
+# One partition per UTC month from the oldest job to MONTHS_AHEAD ahead
+CREATE_MONTHLY_PARTITIONS = f"""
+DO $$
+DECLARE
+    month timestamptz;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', coalesce((SELECT min(coalesce(start_time, created_at)) FROM print_jobs_unpartitioned), now()), 'UTC'),
+            date_trunc('month', now(), 'UTC') + interval '{MONTHS_AHEAD} months',
+            interval '1 month'
+        )
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF print_jobs FOR VALUES FROM (%L) TO (%L)',
+            'print_jobs_' || to_char(month AT TIME ZONE 'UTC', 'YYYY_MM'),
+            month,
+            month + interval '1 month'
+        );
+    END LOOP;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE print_jobs RENAME TO print_jobs_unpartitioned")
+    op.execute("ALTER TABLE print_jobs_unpartitioned RENAME CONSTRAINT print_jobs_pkey TO print_jobs_unpartitioned_pkey")
+    op.execute("DROP TRIGGER IF EXISTS update_print_jobs_updated_at ON print_jobs_unpartitioned")
+    for name, _ in INDEXES:
+        op.execute(f"DROP INDEX {name}")
+
+    # The partition key has to be part of the primary key, so the id alone
+    # is no longer a unique constraint; the print job ingest creates jobs
+    # under an advisory lock per id. Jobs that have not started yet get the
+    # time they were queued.
+    op.execute("""
+        CREATE TABLE print_jobs (
+            id UUID NOT NULL DEFAULT uuid_generate_v4(),
+            printer_id UUID REFERENCES printers(id) ON DELETE CASCADE,
+            spool_id UUID REFERENCES spools(id) ON DELETE SET NULL,
+            user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+            job_name VARCHAR(255),
+            start_time TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            end_time TIMESTAMP WITH TIME ZONE,
+            filament_used DECIMAL(8,2), -- Filament used in grams
+            status VARCHAR(50) DEFAULT 'queued' CHECK (status IN ('queued', 'printing', 'completed', 'failed', 'cancelled')),
+            notes TEXT,
+            metadata JSONB DEFAULT '{}',
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT print_jobs_pkey PRIMARY KEY (start_time, id)
+        ) PARTITION BY RANGE (start_time)
+    """)
+    op.execute(CREATE_MONTHLY_PARTITIONS)
+    # Catches far-off start times reported by printers
+    op.execute("CREATE TABLE print_jobs_default PARTITION OF print_jobs DEFAULT")
+    op.execute(
+        f"INSERT INTO print_jobs ({COLUMNS}) "
+        f"SELECT {COLUMNS.replace('start_time', 'coalesce(start_time, created_at, CURRENT_TIMESTAMP)')} "
+        "FROM print_jobs_unpartitioned"
+    )
+    op.execute("DROP TABLE print_jobs_unpartitioned")
+
+    op.execute("CREATE INDEX idx_print_jobs_id ON print_jobs (id)")
+    for name, columns in INDEXES:
+        op.execute(f"CREATE INDEX {name} ON print_jobs ({columns})")
+    op.execute(
+        "CREATE TRIGGER update_print_jobs_updated_at BEFORE UPDATE ON print_jobs "
+        "FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()"
+    )
+
+    # Grams used per UTC day of the jobs' end, maintained by the ingest.
+    # Printer, spool and material ids are plain values so history outlives them.
+    op.execute("""
+        CREATE TABLE print_job_daily_usage (
+            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            day DATE NOT NULL,
+            printer_id UUID,
+            spool_id UUID,
+            material_id UUID,
+            filament_used DECIMAL(12,2) NOT NULL DEFAULT 0,
+            jobs INTEGER NOT NULL DEFAULT 0,
+            CONSTRAINT uq_print_job_daily_usage_group
+                UNIQUE NULLS NOT DISTINCT (user_id, day, printer_id, spool_id, material_id)
+        )
+    """)
+    op.execute("""
+        INSERT INTO print_job_daily_usage (user_id, day, printer_id, spool_id, material_id, filament_used, jobs)
+        SELECT print_jobs.user_id, (print_jobs.end_time AT TIME ZONE 'UTC')::date, print_jobs.printer_id,
+               print_jobs.spool_id, filaments.material_id, coalesce(sum(print_jobs.filament_used), 0), count(*)
+        FROM print_jobs
+        LEFT JOIN spools ON spools.id = print_jobs.spool_id
+        LEFT JOIN filaments ON filaments.id = spools.filament_id
+        WHERE print_jobs.status IN ('completed', 'failed', 'cancelled')
+          AND print_jobs.end_time IS NOT NULL
+          AND print_jobs.user_id IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE print_job_daily_usage")
+
+    op.execute("ALTER TABLE print_jobs RENAME TO print_jobs_partitioned")
+    op.execute("ALTER TABLE print_jobs_partitioned RENAME CONSTRAINT print_jobs_pkey TO print_jobs_partitioned_pkey")
+    op.execute("DROP INDEX idx_print_jobs_id")
+    for name, _ in INDEXES:
+        op.execute(f"DROP INDEX {name}")
+    op.execute("""
+        CREATE TABLE print_jobs (
+            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            printer_id UUID REFERENCES printers(id) ON DELETE CASCADE,
+            spool_id UUID REFERENCES spools(id) ON DELETE SET NULL,
+            user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+            job_name VARCHAR(255),
+            start_time TIMESTAMP WITH TIME ZONE,
+            end_time TIMESTAMP WITH TIME ZONE,
+            filament_used DECIMAL(8,2), -- Filament used in grams
+            status VARCHAR(50) DEFAULT 'queued' CHECK (status IN ('queued', 'printing', 'completed', 'failed', 'cancelled')),
+            notes TEXT,
+            metadata JSONB DEFAULT '{}',
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    op.execute(f"INSERT INTO print_jobs ({COLUMNS}) SELECT {COLUMNS} FROM print_jobs_partitioned")
+    op.execute("DROP TABLE print_jobs_partitioned CASCADE")
+    for name, columns in INDEXES:
+        op.execute(f"CREATE INDEX {name} ON print_jobs ({columns})")
+    op.execute(
+        "CREATE TRIGGER update_print_jobs_updated_at BEFORE UPDATE ON print_jobs "
+        "FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()"
+    )
@@ -0,0 +1,128 @@
+"""Inventory aggregates per user and filament, kept current by triggers
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must match app.api.stats.NEARLY_EMPTY_FRACTION
+NEARLY_EMPTY_FRACTION = "0.1"
+
+# Spool columns the aggregates depend on
+COUNTED = "user_id, filament_id, is_active, weight, remaining_weight, purchase_price"
+
+
+# Adds the signed spool rows of ``delta`` to their (user, filament) rows;
+# groups whose totals do not change (updates of other columns, or of
+# nothing) are skipped, so they cost no write
+UPSERT = f"""
+        INSERT INTO spool_stats AS stats
+            (user_id, filament_id, spools, active_spools, remaining_weight, purchase_value, nearly_empty)
+        SELECT * FROM (
+            SELECT user_id, filament_id,
+                   sum(sign) AS spools,
+                   coalesce(sum(sign) FILTER (WHERE is_active), 0) AS active_spools,
+                   coalesce(sum(sign * remaining_weight) FILTER (WHERE is_active), 0) AS remaining_weight,
+                   coalesce(sum(sign * purchase_price) FILTER (WHERE is_active), 0) AS purchase_value,
+                   coalesce(sum(sign) FILTER (
+                       WHERE is_active AND remaining_weight < weight * {NEARLY_EMPTY_FRACTION}
+                   ), 0) AS nearly_empty
+            FROM ({{delta}}) delta
+            GROUP BY user_id, filament_id
+        ) totals
+        WHERE (spools, active_spools, remaining_weight, purchase_value, nearly_empty) <> (0, 0, 0, 0, 0)
+        ORDER BY user_id, filament_id
+        ON CONFLICT (user_id, filament_id) DO UPDATE SET
+            spools = stats.spools + excluded.spools,
+            active_spools = stats.active_spools + excluded.active_spools,
+            remaining_weight = stats.remaining_weight + excluded.remaining_weight,
+            purchase_value = stats.purchase_value + excluded.purchase_value,
+            nearly_empty = stats.nearly_empty + excluded.nearly_empty"""
+
+NEW_ROWS = f"SELECT {COUNTED}, 1 AS sign FROM new_rows"
+OLD_ROWS = f"SELECT {COUNTED}, -1 AS sign FROM old_rows"
+
+# Statement-level: one aggregate upsert per statement however many spools
+# it touched (bulk endpoints, imports, cascades from filament / user deletes).
+# Rows are upserted in key order so concurrent writers cannot deadlock.
+REFRESH_FUNCTION = f"""
+CREATE FUNCTION spool_stats_refresh() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {UPSERT.format(delta=NEW_ROWS)};
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        {UPSERT.format(delta=OLD_ROWS)};
+    ELSE
+        {UPSERT.format(delta=f"{NEW_ROWS} UNION ALL {OLD_ROWS}")};
+    END IF;
+    DELETE FROM spool_stats WHERE spools = 0;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+TRIGGERS = [
+    ("spool_stats_insert", "INSERT", "NEW TABLE AS new_rows"),
+    ("spool_stats_update", "UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    ("spool_stats_delete", "DELETE", "OLD TABLE AS old_rows"),
+]
+
+
+def upgrade() -> None:
+    # No foreign keys: rows are removed by the triggers once their last
+    # spool is gone, including when a user or filament delete cascades
+    op.execute("""
+        CREATE TABLE spool_stats (
+            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            user_id UUID,
+            filament_id UUID,
+            spools INTEGER NOT NULL DEFAULT 0,
+            active_spools INTEGER NOT NULL DEFAULT 0,
+            remaining_weight DECIMAL(14,2) NOT NULL DEFAULT 0,
+            purchase_value DECIMAL(14,2) NOT NULL DEFAULT 0,
+            nearly_empty INTEGER NOT NULL DEFAULT 0,
+            CONSTRAINT uq_spool_stats_user_filament UNIQUE NULLS NOT DISTINCT (user_id, filament_id)
+        )
+    """)
+    op.execute("CREATE INDEX idx_spool_stats_empty ON spool_stats (id) WHERE spools = 0")
+    op.execute(REFRESH_FUNCTION)
+    # Triggers first: they block spool writes until this transaction commits,
+    # so the backfill below cannot miss any
+    for name, event, referencing in TRIGGERS:
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER {event} ON spools REFERENCING {referencing} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION spool_stats_refresh()"
+        )
+    op.execute(f"""
+        INSERT INTO spool_stats (user_id, filament_id, spools, active_spools, remaining_weight, purchase_value, nearly_empty)
+        SELECT user_id, filament_id,
+               count(*),
+               count(*) FILTER (WHERE is_active),
+               coalesce(sum(remaining_weight) FILTER (WHERE is_active), 0),
+               coalesce(sum(purchase_price) FILTER (WHERE is_active), 0),
+               count(*) FILTER (WHERE is_active AND remaining_weight < weight * {NEARLY_EMPTY_FRACTION})
+        FROM spools
+        GROUP BY user_id, filament_id
+    """)
+
+
+def downgrade() -> None:
+    for name, _, _ in TRIGGERS:
+        op.execute(f"DROP TRIGGER {name} ON spools")
+    op.execute("DROP FUNCTION spool_stats_refresh()")
+    op.execute("DROP TABLE spool_stats")
@@ -0,0 +1,206 @@
+"""
+Shared fixtures: a freshly migrated and seeded database plus an API client
+
+The database tests need a PostgreSQL server where the test database may be
+dropped and re-created, given as TEST_DATABASE_URL, e.g.
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost:5432/filadb_test pytest
+
+Without it they are skipped; tests that need no database still run.
+"""
+
+import asyncio
+import os
+import random
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    # Must be set before the app (and its engine) is imported
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+
+import asyncpg  # noqa: E402
+import httpx  # noqa: E402
+from sqlalchemy import event, insert, select, text  # noqa: E402
+
+from app.auth.auth import create_access_token, get_password_hash  # noqa: E402
+from app.database import AsyncSessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Filament, Manufacturer, Material, Printer, Spool, User  # noqa: E402
+from app.models.printer import PrinterStatus  # noqa: E402
+from app.models.user import UserRole  # noqa: E402
+from app.schema import ensure_schema  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+
+# Enough rows that the planner prefers indexes wherever one applies
+SEED_USERS = 20
+SEED_SPOOLS_PER_USER = 500
+SEED_PRINTERS_PER_USER = 4
+# Added to the ones the baseline migration creates
+MANUFACTURERS = ["Sunlu", "Elegoo"]
+MATERIALS = ["Nylon", "PVA"]
+# SpoolmanDB-sized catalog: every line in every color
+LINES = ["Basic", "Matte", "Silk", "Pro", "HF"]
+COLORS = ["Galaxy Black", "Jet Black", "Signal White", "Lipstick Red", "Azure Blue", "Olive Green",
+          "Pearl Mouse", "Mystic Brown", "Orange", "Silver", "Transparent", "Gold"]
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    # The app's engine is module-global, so every test shares one loop
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+async def database():
+    """Drops and re-creates the test database and migrates it to head"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    base, name = TEST_DATABASE_URL.rsplit("/", 1)
+    admin = await asyncpg.connect(f"{base}/postgres")
+    try:
+        await admin.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+        await admin.execute(f'CREATE DATABASE "{name}"')
+    finally:
+        await admin.close()
+    await engine.dispose()
+    # The same path the app takes at startup
+    await ensure_schema()
+    yield engine
+    await engine.dispose()
+
+
+def _row(**values) -> dict:
+    return {"id": uuid.uuid4(), **values}
+
+
+@pytest.fixture(scope="session")
+async def seed(database):
+    """Users, catalog, printers and spools with a realistic spread, analyzed"""
+    rng = random.Random(8)
+    password_hash = get_password_hash(PASSWORD)
+    admin = _row(username="seed_admin", email="seed_admin@example.com", password_hash=password_hash,
+                 role=UserRole.ADMIN.value, is_active=True)
+    users = [
+        _row(username=f"user{i}", email=f"user{i}@example.com", password_hash=password_hash,
+             role=UserRole.USER.value, is_active=True)
+        for i in range(SEED_USERS)
+    ]
+    new_manufacturers = [_row(name=name) for name in MANUFACTURERS]
+    new_materials = [_row(name=name, density=Decimal("1.240")) for name in MATERIALS]
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(Manufacturer.__table__), new_manufacturers)
+        await db.execute(insert(Material.__table__), new_materials)
+        await db.commit()
+        manufacturers = [row._asdict() for row in await db.execute(select(Manufacturer.id, Manufacturer.name))]
+        materials = [row._asdict() for row in await db.execute(select(Material.id, Material.name))]
+    filaments = [
+        _row(manufacturer_id=manufacturer["id"], material_id=material["id"],
+             name=f"{manufacturer['name']} {material['name']} {line} {color}", colors=[], weights=[], diameters=[])
+        for manufacturer in manufacturers for material in materials for line in LINES for color in COLORS
+    ]
+    statuses = list(PrinterStatus)
+    printers = [
+        _row(name=f"Printer {i}", user_id=user["id"], status=statuses[i % len(statuses)].value)
+        for user in users for i in range(SEED_PRINTERS_PER_USER)
+    ]
+    printers_by_user = {}
+    for printer in printers:
+        printers_by_user.setdefault(printer["user_id"], []).append(printer)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    spools = []
+    for number, user in enumerate(users):
+        for i in range(SEED_SPOOLS_PER_USER):
+            weight = Decimal(rng.choice([250, 500, 1000, 2000]))
+            spools.append(_row(
+                filament_id=rng.choice(filaments)["id"],
+                user_id=user["id"],
+                printer_id=rng.choice(printers_by_user[user["id"]])["id"] if i % 10 == 0 else None,
+                weight=weight,
+                remaining_weight=(weight * Decimal(rng.randint(0, 100)) / 100).quantize(Decimal("0.01")),
+                color=rng.choice(COLORS),
+                diameter=Decimal("1.75"),
+                purchase_date=date(2025, 1, 1) + timedelta(days=rng.randint(0, 600)),
+                purchase_price=Decimal(rng.randint(15, 60)),
+                location=f"Shelf {rng.randint(1, 40)}",
+                nfc_tag_id=f"TAG-{number}-{i}",
+                notes=rng.choice([None, "opened", "dry before use", "gift from a friend"]),
+                custom_fields={},
+                is_active=i % 5 != 0,
+                created_at=start + timedelta(minutes=number * SEED_SPOOLS_PER_USER + i),
+            ))
+
+    async with AsyncSessionLocal() as db:
+        for model, rows in ((User, [admin, *users]), (Filament, filaments), (Printer, printers), (Spool, spools)):
+            await db.execute(insert(model.__table__), rows)
+        await db.commit()
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE"))
+        await conn.commit()
+
+    return SimpleNamespace(
+        admin=admin, users=users, manufacturers=manufacturers, materials=materials,
+        filaments=filaments, printers=printers, spools=spools,
+    )
+
+
+def auth_headers(user: dict) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': user['username']})}"}
+
+
+@pytest.fixture
+async def client(database):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+async def make_user(database):
+    """Creates users of their own for tests that write, so the seed stays intact"""
+    async def make(role: UserRole = UserRole.USER) -> dict:
+        name = f"t{uuid.uuid4().hex[:12]}"
+        user = _row(username=name, email=f"{name}@example.com", password_hash=get_password_hash(PASSWORD),
+                    role=role.value, is_active=True)
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(User.__table__), [user])
+            await db.commit()
+        return user
+    return make
+
+
+class QueryLog:
+    """SELECT statements the engine ran, with their parameters"""
+
+    def __init__(self):
+        self.queries: list[tuple[str, tuple]] = []
+
+    def __enter__(self):
+        event.listen(engine.sync_engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine.sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.queries.append((statement, parameters))
+
+    def matching(self, table: str) -> list[tuple[str, tuple]]:
+        return [query for query in self.queries if f"FROM {table}" in query[0]]
+
+
+async def explain(statement: str, parameters: tuple, seqscan: bool = True) -> str:
+    """Plan of a captured statement; ``seqscan=False`` shows whether an index can serve it at all"""
+    async with engine.connect() as conn:
+        if not seqscan:
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        return "\n".join(row[0] for row in plan)
@@ -0,0 +1,108 @@
+"""
+Activity log entries recorded by the middleware
+"""
+
+import time
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app import middleware
+from app.database import AsyncSessionLocal
+from app.middleware import ActivityLogMiddleware
+from app.models.activity_log import ActivityLog
+from app.services.activity_log import ActivityEntry, ActivityLogWriter, activity_log_writer
+
+from conftest import auth_headers
+
+
+async def _recorded(monkeypatch, scope) -> list[ActivityEntry]:
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    entries = []
+
+    async def record_many(batch):
+        entries.extend(batch)
+
+    monkeypatch.setattr(middleware.activity_log_writer, "record_many", record_many)
+    await ActivityLogMiddleware(app)({
+        "type": "http", "method": "POST", "path": "/api/printers/", "headers": [], **scope
+    }, receive, send)
+    return entries
+
+
+@pytest.mark.parametrize("client, expected", [
+    (("203.0.113.7", 50000), "203.0.113.7"),
+    (("2001:db8::1", 50000), "2001:db8::1"),
+    (("testclient", 50000), None),
+    (("/run/filadb.sock", 0), None),
+    (None, None),
+])
+async def test_client_address_is_validated(monkeypatch, client, expected):
+    [entry] = await _recorded(monkeypatch, {"client": client})
+    assert entry.ip_address == expected
+
+
+async def test_entries_without_a_valid_address_are_written(database):
+    entries = [
+        ActivityEntry(user_id=None, action="create", resource_type="printers", resource_id=None,
+                      details={"path": path}, ip_address=ip, user_agent=None,
+                      created_at=datetime.now(timezone.utc))
+        for path, ip in (("/api/a", "203.0.113.7"), ("/api/b", None))
+    ]
+    async with AsyncSessionLocal() as db:
+        await activity_log_writer.flush(db, entries)
+        await db.commit()
+        rows = (await db.execute(
+            select(ActivityLog.details["path"].astext, ActivityLog.ip_address)
+            .where(ActivityLog.details["path"].astext.in_(["/api/a", "/api/b"]))
+            .order_by(ActivityLog.details["path"].astext)
+        )).all()
+    assert [(path, str(ip) if ip else None) for path, ip in rows] == [("/api/a", "203.0.113.7"), ("/api/b", None)]
+
+
+async def test_bulk_changes_are_logged_per_spool(client, seed, make_user, monkeypatch):
+    entries = []
+
+    async def record_many(batch):
+        entries.extend(batch)
+
+    monkeypatch.setattr(middleware.activity_log_writer, "record_many", record_many)
+    user = await make_user()
+    headers = auth_headers(user)
+    spool = {"filament_id": str(seed.filaments[0]["id"]), "weight": "1000", "remaining_weight": "1000",
+             "diameter": "1.75"}
+
+    created = (await client.post("/api/spools/bulk", json={"items": [spool] * 3}, headers=headers)).json()
+    ids = [item["id"] for item in created["items"]]
+    await client.patch("/api/spools/bulk", json={"items": [
+        {"id": ids[0], "location": "Shelf 1"}, {"id": str(uuid.uuid4()), "location": "Shelf 2"},
+    ]}, headers=headers)
+    await client.request("DELETE", "/api/spools/bulk", json={"ids": ids[1:]}, headers=headers)
+
+    assert [(entry.action, entry.resource_type, str(entry.resource_id)) for entry in entries] == [
+        *(("create", "spools", id) for id in ids),
+        ("update", "spools", ids[0]),
+        *(("delete", "spools", id) for id in ids[1:]),
+    ]
+    assert {entry.user_id for entry in entries} == {user["id"]}
+
+
+async def test_entries_of_one_request_share_the_enqueue_timeout():
+    writer = ActivityLogWriter(max_size=1, batch_size=1, flush_interval=1, enqueue_timeout=0.05)
+    entry = ActivityEntry(user_id=None, action="delete", resource_type="spools", resource_id=None,
+                          details={}, ip_address=None, user_agent=None, created_at=datetime.now(timezone.utc))
+    started = time.monotonic()
+    await writer.record_many([entry] * 100)
+    assert time.monotonic() - started < 0.5
+    assert (writer.recorded, writer.dropped) == (1, 99)
@@ -0,0 +1,101 @@
+"""
+API keys: scopes, expiry and revocation
+"""
+
+import time
+
+import pytest
+
+from app.auth.api_keys import scope_allows
+
+from conftest import auth_headers
+
+
+@pytest.mark.parametrize("scopes, resource, method, allowed", [
+    ({"spools:read"}, "spools", "GET", True),
+    ({"spools:read"}, "spools", "HEAD", True),
+    ({"spools:read"}, "spools", "POST", False),
+    ({"spools:read"}, "printers", "GET", False),
+    ({"spools:write"}, "spools", "DELETE", True),
+    ({"spools:write"}, "spools", "GET", False),
+    ({"spools:*"}, "spools", "PATCH", True),
+    ({"*"}, "printers", "PUT", True),
+])
+def test_scope_allows(scopes, resource, method, allowed):
+    assert scope_allows(frozenset(scopes), resource, method) is allowed
+
+
+@pytest.fixture
+async def owner(make_user):
+    user = await make_user()
+    return user, auth_headers(user)
+
+
+async def _create_key(client, headers, scopes: list[str], **values) -> dict:
+    response = await client.post("/api/api-keys/", json={"name": "printer bridge", "scopes": scopes, **values},
+                                 headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_key_is_limited_to_its_scopes(client, owner):
+    user, headers = owner
+    key = await _create_key(client, headers, ["printers:read", "spools:write"])
+    assert key["key"].startswith(f"fdb_{key['prefix']}_")
+    as_key = {"X-API-Key": key["key"]}
+
+    assert (await client.get("/api/printers/", headers=as_key)).status_code == 200
+    assert (await client.post("/api/printers/", json={"name": "Mk4"}, headers=as_key)).status_code == 403
+    assert (await client.get("/api/spools/", headers=as_key)).status_code == 403
+    assert (await client.get("/api/filaments/", headers=as_key)).status_code == 403
+    # Also accepted as a bearer token
+    assert (await client.get("/api/printers/", headers={"Authorization": f"Bearer {key['key']}"})).status_code == 200
+
+
+async def test_key_acts_as_its_owner(client, owner, seed):
+    user, headers = owner
+    key = await _create_key(client, headers, ["*"])
+    response = await client.get("/api/users/me", headers={"X-API-Key": key["key"]})
+    assert response.json()["id"] == str(user["id"])
+    # Not a way around the owner's permissions
+    spool = seed.spools[0]
+    assert (await client.get(f"/api/spools/{spool['id']}", headers={"X-API-Key": key["key"]})).status_code == 403
+
+
+async def test_keys_cannot_manage_keys(client, owner):
+    _, headers = owner
+    key = await _create_key(client, headers, ["*"])
+    as_key = {"X-API-Key": key["key"]}
+    assert (await client.get("/api/api-keys/", headers=as_key)).status_code == 403
+    assert (await client.post("/api/api-keys/", json={"name": "x", "scopes": ["*"]}, headers=as_key)).status_code == 403
+
+
+@pytest.mark.parametrize("scopes", [[], ["spools"], ["spools:delete"], ["Spools:read"]])
+async def test_invalid_scopes_are_rejected(client, owner, scopes):
+    _, headers = owner
+    response = await client.post("/api/api-keys/", json={"name": "x", "scopes": scopes}, headers=headers)
+    assert response.status_code == 422
+
+
+async def test_deleted_key_stops_working(client, owner):
+    _, headers = owner
+    key = await _create_key(client, headers, ["printers:read"])
+    as_key = {"X-API-Key": key["key"]}
+    assert (await client.get("/api/printers/", headers=as_key)).status_code == 200
+
+    assert (await client.delete(f"/api/api-keys/{key['id']}", headers=headers)).status_code == 200
+    assert (await client.get("/api/printers/", headers=as_key)).status_code == 401
+    assert [listed["id"] for listed in (await client.get("/api/api-keys/", headers=headers)).json()] == []
+
+
+async def test_wrong_secret_and_expired_keys_are_rejected(client, owner, monkeypatch):
+    _, headers = owner
+    key = await _create_key(client, headers, ["*"])
+    forged = key["key"][:-4] + "AAAA"
+    assert (await client.get("/api/printers/", headers={"X-API-Key": forged})).status_code == 401
+
+    expiring = await _create_key(client, headers, ["*"], expires_in_days=1)
+    later = time.time() + 2 * 86400
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert (await client.get("/api/printers/", headers={"X-API-Key": expiring["key"]})).status_code == 401
+    assert (await client.get("/api/printers/", headers={"X-API-Key": key["key"]})).status_code == 200
@@ -0,0 +1,33 @@
+"""
+BatchWriter: subclasses provide flush(), run() and drain() hand it the queue in batches
+"""
+
+import pytest
+
+from app.services.batching import BatchWriter
+
+
+class ListWriter(BatchWriter):
+    def __init__(self):
+        super().__init__(max_size=10, batch_size=3, flush_interval=1)
+        self.batches_written = []
+
+    async def flush(self, db, batch):
+        self.batches_written.append(batch)
+
+
+def test_writer_without_flush_cannot_be_created():
+    class Forgetful(BatchWriter):
+        pass
+
+    with pytest.raises(TypeError, match="flush"):
+        Forgetful(max_size=10, batch_size=3, flush_interval=1)
+
+
+async def test_drain_writes_the_queue_in_batches(database):
+    writer = ListWriter()
+    for item in range(7):
+        writer.queue.put_nowait(item)
+    await writer.drain()
+    assert writer.batches_written == [[0, 1, 2], [3, 4, 5], [6]]
+    assert writer.stats() == {"queued": 0, "failed": 0, "batches": 3}
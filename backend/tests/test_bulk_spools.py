@@ -0,0 +1,165 @@
+"""
+Bulk spool endpoints: per-item errors, identifier conflicts and atomic batches
+"""
+
+import uuid
+
+import pytest
+
+from app.api import spools as spools_api
+from app.models.user import UserRole
+
+from conftest import auth_headers
+
+
+@pytest.fixture
+async def owner(make_user, seed):
+    user = await make_user()
+    return user, auth_headers(user), str(seed.filaments[0]["id"])
+
+
+def _spool(filament_id: str, **values) -> dict:
+    return {"filament_id": filament_id, "weight": "1000", "remaining_weight": "1000", "diameter": "1.75", **values}
+
+
+def _tag() -> str:
+    return f"NFC-{uuid.uuid4().hex[:10]}"
+
+
+async def _count(client, headers) -> int:
+    return len((await client.get("/api/spools/?limit=1000", headers=headers)).json())
+
+
+async def test_create_reports_conflicts_by_index(client, owner, seed):
+    _, headers, filament_id = owner
+    tag = _tag()
+    response = await client.post("/api/spools/bulk", json={"items": [
+        _spool(filament_id, nfc_tag_id=tag),
+        _spool(filament_id, nfc_tag_id=tag),
+        _spool(filament_id, nfc_tag_id=seed.spools[0]["nfc_tag_id"]),
+        _spool(str(uuid.uuid4())),
+        _spool(filament_id, qr_code="QR-1-" + tag),
+    ]}, headers=headers)
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["errors"] == [
+        {"index": 1, "detail": "Duplicate NFC tag ID in batch"},
+        {"index": 2, "detail": "NFC tag ID already exists"},
+        {"index": 3, "detail": "Filament not found"},
+    ]
+    assert [item["nfc_tag_id"] for item in result["items"]] == [tag, None]
+    assert await _count(client, headers) == 2
+
+
+async def test_atomic_create_writes_nothing_on_error(client, owner, seed):
+    _, headers, filament_id = owner
+    response = await client.post("/api/spools/bulk", json={"atomic": True, "items": [
+        _spool(filament_id),
+        _spool(filament_id, nfc_tag_id=seed.spools[1]["nfc_tag_id"]),
+    ]}, headers=headers)
+    assert response.status_code == 409
+    assert response.json()["detail"] == [{"index": 1, "detail": "NFC tag ID already exists"}]
+    assert await _count(client, headers) == 0
+
+
+async def test_batch_size_is_limited(client, owner):
+    _, headers, filament_id = owner
+    response = await client.post("/api/spools/bulk", json={"items": [_spool(filament_id)] * 1001}, headers=headers)
+    assert response.status_code == 422
+
+
+async def test_update_applies_only_given_fields(client, owner, seed):
+    _, headers, filament_id = owner
+    created = (await client.post("/api/spools/bulk", json={"items": [
+        _spool(filament_id, location="Shelf A", nfc_tag_id=_tag()), _spool(filament_id, location="Shelf B"),
+    ]}, headers=headers)).json()["items"]
+    own_tag = created[0]["nfc_tag_id"]
+    foreign = seed.spools[2]
+
+    response = await client.patch("/api/spools/bulk", json={"items": [
+        {"id": created[0]["id"], "remaining_weight": "640.5", "nfc_tag_id": own_tag},
+        {"id": created[1]["id"], "nfc_tag_id": seed.spools[4]["nfc_tag_id"]},
+        {"id": created[1]["id"], "location": "Shelf C"},
+        {"id": str(foreign["id"]), "location": "mine now"},
+        {"id": str(uuid.uuid4()), "location": "nowhere"},
+    ]}, headers=headers)
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["errors"] == [
+        {"index": 1, "detail": "NFC tag ID already exists"},
+        {"index": 2, "detail": "Duplicate spool ID in batch"},
+        {"index": 3, "detail": "Not enough permissions"},
+        {"index": 4, "detail": "Spool not found"},
+    ]
+    [updated] = result["items"]
+    assert updated["remaining_weight"] == "640.50"
+    assert updated["location"] == "Shelf A"
+    assert updated["updated_at"] > created[0]["updated_at"]
+
+
+async def test_atomic_update_rejects_the_batch(client, owner):
+    _, headers, filament_id = owner
+    created = (await client.post("/api/spools/bulk", json={"items": [_spool(filament_id, location="Shelf A")]},
+                                 headers=headers)).json()["items"]
+    response = await client.patch("/api/spools/bulk", json={"atomic": True, "items": [
+        {"id": created[0]["id"], "location": "Shelf Z"},
+        {"id": created[0]["id"], "filament_id": str(uuid.uuid4())},
+    ]}, headers=headers)
+    assert response.status_code == 409
+    spool = (await client.get(f"/api/spools/{created[0]['id']}", headers=headers)).json()
+    assert spool["location"] == "Shelf A"
+
+
+@pytest.mark.parametrize("atomic", [False, True])
+async def test_update_reports_conflicts_the_check_missed(client, owner, seed, monkeypatch, atomic):
+    # As if another request took the tag between the check and the UPDATE
+    async def no_conflicts(db, items):
+        return {}
+
+    monkeypatch.setattr(spools_api, "_identifier_conflicts", no_conflicts)
+    _, headers, filament_id = owner
+    created = (await client.post("/api/spools/bulk", json={"items": [_spool(filament_id, location="Shelf A")] * 3},
+                                 headers=headers)).json()["items"]
+    response = await client.patch("/api/spools/bulk", json={"atomic": atomic, "items": [
+        {"id": created[0]["id"], "location": "Shelf B"},
+        {"id": created[1]["id"], "nfc_tag_id": seed.spools[4]["nfc_tag_id"]},
+        {"id": created[2]["id"], "location": "Shelf C"},
+    ]}, headers=headers)
+
+    locations = [
+        (await client.get(f"/api/spools/{spool['id']}", headers=headers)).json()["location"] for spool in created
+    ]
+    if atomic:
+        assert response.status_code == 409
+        assert locations == ["Shelf A"] * 3
+    else:
+        assert response.status_code == 200, response.text
+        result = response.json()
+        assert result["errors"] == [{"index": 1, "detail": "NFC tag ID or QR code already exists"}]
+        assert [item["location"] for item in result["items"]] == ["Shelf B", "Shelf C"]
+        assert locations == ["Shelf B", "Shelf A", "Shelf C"]
+
+
+async def test_delete(client, owner, seed, make_user):
+    _, headers, filament_id = owner
+    created = (await client.post("/api/spools/bulk", json={"items": [_spool(filament_id)] * 3},
+                                 headers=headers)).json()["items"]
+    ids = [item["id"] for item in created]
+    foreign = str(seed.spools[3]["id"])
+
+    response = await client.request("DELETE", "/api/spools/bulk", json={"atomic": True, "ids": [ids[0], foreign]},
+                                     headers=headers)
+    assert response.status_code == 409
+    assert await _count(client, headers) == 3
+
+    response = await client.request("DELETE", "/api/spools/bulk", json={"ids": [ids[0], ids[0], ids[1], foreign]},
+                                     headers=headers)
+    assert response.json() == {"deleted": ids[:2], "errors": [
+        {"index": 1, "detail": "Duplicate spool ID in batch"},
+        {"index": 3, "detail": "Not enough permissions"},
+    ]}
+    assert await _count(client, headers) == 1
+
+    admin = await make_user(UserRole.ADMIN)
+    response = await client.request("DELETE", "/api/spools/bulk", json={"ids": [ids[2]]}, headers=auth_headers(admin))
+    assert response.json() == {"deleted": [ids[2]], "errors": []}
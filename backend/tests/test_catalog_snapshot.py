@@ -0,0 +1,104 @@
+"""
+Catalog snapshot: what the sync writes is what every worker reads back
+"""
+
+import os
+
+import orjson
+import pytest
+
+from app.api import catalog as catalog_api
+from app.services import catalog
+from app.services.catalog import CatalogSnapshot, write_snapshot
+
+from conftest import auth_headers
+
+RECORDS = {
+    "bambulab/pla_basic": {"manufacturer": "Bambu Lab", "material": "PLA", "name": "PLA Basic",
+                           "density": 1.24, "colors": [{"name": "Jade White", "hex": "FFFFFF"}]},
+    "bambulab/petg_hf": {"manufacturer": "Bambu Lab", "material": "PETG", "name": "PETG HF", "density": 1.25},
+    "prusament/pla_galaxy": {"manufacturer": "Prusament", "material": "PLA", "name": "PLA Galaxy Black"},
+    "3djake/ecopla": {"manufacturer": "3DJake", "material": "pla", "name": "ecoPLA Grün"},
+}
+
+
+@pytest.fixture
+def snapshot(tmp_path, monkeypatch):
+    """A reader that checks for a new file on every lookup"""
+    monkeypatch.setattr(catalog, "REMAP_CHECK_INTERVAL", 0)
+    return CatalogSnapshot(str(tmp_path / "spoolmandb" / "catalog.bin"))
+
+
+def test_records_round_trip(snapshot):
+    write_snapshot(snapshot.path, RECORDS, generation=7)
+    for id, record in RECORDS.items():
+        assert orjson.loads(snapshot.get(id)) == {"spoolman_db_id": id, **record}
+    assert snapshot.get("bambulab/pla") is None
+    assert snapshot.get("zzz/unknown") is None
+    assert snapshot.stats()["generation"] == 7
+    assert snapshot.stats()["filaments"] == len(RECORDS)
+
+
+def test_search_by_manufacturer_and_material(snapshot):
+    write_snapshot(snapshot.path, RECORDS)
+
+    def ids(**criteria) -> list[str]:
+        return [orjson.loads(record)["spoolman_db_id"] for record in snapshot.search(**criteria)]
+
+    assert ids(manufacturer="bambu lab") == ["bambulab/petg_hf", "bambulab/pla_basic"]
+    assert ids(material="PLA") == ["3djake/ecopla", "bambulab/pla_basic", "prusament/pla_galaxy"]
+    assert ids(manufacturer="Bambu Lab", material="pla") == ["bambulab/pla_basic"]
+    assert ids(manufacturer="Polymaker") == []
+
+
+def test_empty_catalog(snapshot):
+    write_snapshot(snapshot.path, {})
+    assert snapshot.available
+    assert snapshot.get("bambulab/pla_basic") is None
+    assert snapshot.search(material="PLA") == []
+
+
+def test_readers_pick_up_a_replaced_snapshot(snapshot):
+    write_snapshot(snapshot.path, RECORDS, generation=1)
+    before = snapshot.get("prusament/pla_galaxy")
+
+    write_snapshot(snapshot.path, {"prusament/pla_galaxy": {**RECORDS["prusament/pla_galaxy"], "density": 1.24}},
+                   generation=2)
+    assert snapshot.stats()["generation"] == 2
+    assert orjson.loads(snapshot.get("prusament/pla_galaxy"))["density"] == 1.24
+    assert snapshot.get("bambulab/pla_basic") is None
+    # Bytes handed out earlier stay valid
+    assert orjson.loads(before)["name"] == "PLA Galaxy Black"
+
+
+def test_missing_or_foreign_file_is_unavailable(snapshot, capsys):
+    assert not snapshot.available
+    assert snapshot.get("bambulab/pla_basic") is None
+
+    os.makedirs(os.path.dirname(snapshot.path))
+    with open(snapshot.path, "wb") as f:
+        f.write(b"not a snapshot" * 10)
+    assert not snapshot.available
+    assert "Could not map catalog snapshot" in capsys.readouterr().out
+
+
+@pytest.fixture
+def served(snapshot, monkeypatch):
+    monkeypatch.setattr(catalog_api, "catalog_snapshot", snapshot)
+    return snapshot
+
+
+async def test_catalog_api(client, make_user, served):
+    headers = auth_headers(await make_user())
+    response = await client.get("/api/catalog/filaments/bambulab/pla_basic", headers=headers)
+    assert response.status_code == 503
+
+    write_snapshot(served.path, RECORDS)
+    response = await client.get("/api/catalog/filaments/bambulab/pla_basic", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["colors"] == [{"name": "Jade White", "hex": "FFFFFF"}]
+    assert (await client.get("/api/catalog/filaments/bambulab/nope", headers=headers)).status_code == 404
+
+    response = await client.get("/api/catalog/filaments", params={"material": "PLA"}, headers=headers)
+    assert [record["name"] for record in response.json()] == ["ecoPLA Grün", "PLA Basic", "PLA Galaxy Black"]
+    assert (await client.get("/api/catalog/filaments", headers=headers)).status_code == 400
@@ -0,0 +1,67 @@
+"""
+Spool consumption: atomic decrements from concurrent reporters
+"""
+
+import asyncio
+import uuid
+
+import pytest
+
+from app.models.user import UserRole
+
+from conftest import auth_headers
+
+
+@pytest.fixture
+async def spool(client, make_user, seed):
+    user = await make_user()
+    headers = auth_headers(user)
+    response = await client.post("/api/spools/", json={
+        "filament_id": str(seed.filaments[0]["id"]), "weight": "1000", "remaining_weight": "250", "diameter": "1.75",
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json(), headers
+
+
+async def _consume(client, spool_id, headers, amount, **values):
+    return await client.post(f"/api/spools/{spool_id}/consume", json={"amount": amount, **values}, headers=headers)
+
+
+async def test_concurrent_reports_all_count(client, spool):
+    spool, headers = spool
+    responses = await asyncio.gather(*(_consume(client, spool["id"], headers, "7.5") for _ in range(20)))
+    assert all(response.status_code == 200 for response in responses)
+    current = (await client.get(f"/api/spools/{spool['id']}", headers=headers)).json()
+    assert current["remaining_weight"] == "100.00"
+    assert min(response.json()["remaining_weight"] for response in responses) == "100.00"
+
+
+async def test_remaining_weight_stops_at_zero(client, spool):
+    spool, headers = spool
+    response = await _consume(client, spool["id"], headers, "400")
+    assert response.json()["remaining_weight"] == "0.00"
+    assert response.json()["is_active"] is True
+
+
+async def test_emptied_spool_can_be_deactivated(client, spool):
+    spool, headers = spool
+    response = await _consume(client, spool["id"], headers, "100", deactivate_when_empty=True)
+    assert response.json()["is_active"] is True
+    response = await _consume(client, spool["id"], headers, "150", deactivate_when_empty=True)
+    assert (response.json()["remaining_weight"], response.json()["is_active"]) == ("0.00", False)
+
+
+@pytest.mark.parametrize("amount", ["0", "-5", "1000000", "1.005"])
+async def test_invalid_amounts_are_rejected(client, spool, amount):
+    spool, headers = spool
+    assert (await _consume(client, spool["id"], headers, amount)).status_code == 422
+
+
+async def test_only_the_owner_or_an_admin_consumes(client, spool, make_user):
+    spool, _ = spool
+    other = auth_headers(await make_user())
+    assert (await _consume(client, spool["id"], other, "10")).status_code == 403
+    assert (await _consume(client, str(uuid.uuid4()), other, "10")).status_code == 404
+    admin = auth_headers(await make_user(UserRole.ADMIN))
+    response = await _consume(client, spool["id"], admin, "10")
+    assert response.json()["remaining_weight"] == "240.00"
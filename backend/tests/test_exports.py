@@ -0,0 +1,76 @@
+"""
+Streaming exports: same rows and visibility as the lists, in any batch size
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from app.api import export
+
+from conftest import auth_headers
+
+
+def _own_spools(seed, user) -> list[dict]:
+    spools = [spool for spool in seed.spools if spool["user_id"] == user["id"]]
+    return sorted(spools, key=lambda spool: (spool["created_at"], spool["id"]))
+
+
+@pytest.mark.parametrize("batch_size", [1000, 7])
+async def test_ndjson_export_of_spools(client, seed, monkeypatch, batch_size):
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", batch_size)
+    user = seed.users[6]
+    response = await client.get("/api/spools/export", headers=auth_headers(user))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="spools.ndjson"'
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [str(spool["id"]) for spool in _own_spools(seed, user)]
+    listed = (await client.get("/api/spools/?limit=1", headers=auth_headers(user))).json()[0]
+    assert rows[0].keys() == listed.keys()
+    for key, value in listed.items():
+        if key.endswith("_at"):
+            assert datetime.fromisoformat(rows[0][key]) == datetime.fromisoformat(value)
+        else:
+            assert rows[0][key] == value
+
+
+async def test_export_applies_the_list_filters(client, seed):
+    user = seed.users[6]
+    response = await client.get("/api/spools/export?is_active=false", headers=auth_headers(user))
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == sum(1 for spool in _own_spools(seed, user) if not spool["is_active"])
+    assert all(row["user_id"] == str(user["id"]) and row["is_active"] is False for row in rows)
+
+
+@pytest.mark.parametrize("batch_size", [1000, 7])
+async def test_csv_export_of_spools(client, seed, monkeypatch, batch_size):
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", batch_size)
+    user = seed.users[6]
+    response = await client.get("/api/spools/export?format=csv", headers=auth_headers(user))
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    spools = _own_spools(seed, user)
+    assert [row["id"] for row in rows] == [str(spool["id"]) for spool in spools]
+    assert rows[0]["custom_fields"] == "{}"
+    assert rows[0]["remaining_weight"] == str(spools[0]["remaining_weight"])
+    assert rows[0]["created_at"] == spools[0]["created_at"].isoformat()
+    assert rows[0]["printer_id"] == (str(spools[0]["printer_id"]) if spools[0]["printer_id"] else "")
+
+
+async def test_filament_export_covers_the_catalog(client, seed):
+    response = await client.get("/api/filaments/export", headers=auth_headers(seed.users[0]))
+    assert len(response.text.splitlines()) >= len(seed.filaments)
+
+
+async def test_empty_csv_export_has_a_header(client, make_user):
+    user = await make_user()
+    response = await client.get("/api/print-jobs/export?format=csv", headers=auth_headers(user))
+    assert response.status_code == 200, response.text
+    assert response.text.splitlines()[0].startswith("id,")
+    assert len(response.text.splitlines()) == 1
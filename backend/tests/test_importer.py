@@ -0,0 +1,178 @@
+"""
+Imports: parsing and normalization of source records, and merging them
+"""
+
+import io
+import json
+from decimal import Decimal
+
+import orjson
+import pytest
+
+from app.services import importer
+from app.services.importer import ImportFormat, _normalize, _read_records
+
+from conftest import auth_headers
+
+SPOOLMAN_RECORD = {
+    "id": 17,
+    "registered": "2024-03-02T10:15:00Z",
+    "price": 24.99,
+    "initial_weight": 1000,
+    "used_weight": 250.5,
+    "spool_weight": 210,
+    "location": " Dry box ",
+    "comment": "",
+    "archived": False,
+    "filament": {
+        "name": "PLA Basic",
+        "material": "PLA",
+        "density": 1.24,
+        "diameter": 1.75,
+        "color_hex": "1A2B3CFF",
+        "settings_extruder_temp": 215,
+        "settings_bed_temp": 60,
+        "vendor": {"name": "Bambu Lab"},
+    },
+}
+
+
+def test_spoolman_record_is_normalized():
+    row = _normalize(SPOOLMAN_RECORD)
+    assert row["manufacturer"] == "Bambu Lab"
+    assert row["material"] == "PLA"
+    assert row["filament"] == "PLA Basic"
+    assert row["hex_color"] == "#1A2B3C"
+    assert (row["weight"], row["remaining_weight"]) == (Decimal("1000"), Decimal("749.5"))
+    assert row["spool_weight"] == Decimal("210")
+    assert (row["extruder_temp"], row["bed_temp"]) == (215, 60)
+    assert row["purchase_date"].isoformat() == "2024-03-02"
+    assert row["location"] == "Dry box"
+    assert row["notes"] is None
+    assert row["is_active"] is True
+    assert row["external_id"] == "17"
+
+
+def test_spreadsheet_record_is_normalized():
+    # CSV columns arrive as strings under FilaDB's own field names
+    row = _normalize({
+        "manufacturer": "Prusament", "material": "PETG", "filament": "Galaxy Black",
+        "weight": "1000", "remaining_weight": "420.25", "hex_color": "#000000", "archived": "yes",
+    })
+    assert row["remaining_weight"] == Decimal("420.25")
+    assert row["hex_color"] == "#000000"
+    assert row["diameter"] == Decimal("1.75")
+    assert row["is_active"] is False
+    assert row["external_id"] is None
+
+
+def test_used_weight_never_goes_negative():
+    row = _normalize({"vendor": "A", "material": "PLA", "filament": "B", "weight": "500", "used_weight": "900"})
+    assert row["remaining_weight"] == 0
+
+
+@pytest.mark.parametrize("record, message", [
+    ({"material": "PLA", "filament": "Basic"}, "Missing manufacturer"),
+    ({"manufacturer": "A", "material": "PLA", "filament": "B", "weight": "heavy"}, "not a number"),
+    ({"manufacturer": "A", "material": "PLA", "filament": "B", "weight": "1e9"}, "out of range"),
+    ({"manufacturer": "A" * 300, "material": "PLA", "filament": "B"}, "longer than 255"),
+])
+def test_invalid_records_are_rejected(record, message):
+    with pytest.raises(ValueError, match=message):
+        _normalize(record)
+
+
+# Brackets and quotes inside strings must not end a record
+RECORDS = [{**SPOOLMAN_RECORD, "id": id, "comment": f"Spool {id} \u00e9 \"]}}"} for id in range(1, 6)]
+
+
+@pytest.mark.parametrize("document, expected", [
+    (orjson.dumps(RECORDS), RECORDS),
+    (json.dumps(RECORDS, indent=2).encode(), RECORDS),
+    (b"\xef\xbb\xbf" + orjson.dumps({"total": 5, "items": RECORDS}), RECORDS),
+    (orjson.dumps(SPOOLMAN_RECORD), [SPOOLMAN_RECORD]),
+    (b" [ ] ", []),
+])
+def test_json_is_read_record_by_record(monkeypatch, document, expected):
+    # Small chunks, so records and numbers are split across reads
+    monkeypatch.setattr(importer, "JSON_READ_SIZE", 7)
+    assert list(_read_records(io.BytesIO(document), ImportFormat.JSON)) == expected
+
+
+def test_json_records_are_decoded_as_the_file_is_read():
+    class Upload(io.BytesIO):
+        def read(self, size=-1):
+            assert size != -1, "read the whole upload"
+            return super().read(size)
+
+    document = orjson.dumps([SPOOLMAN_RECORD] * 20000)
+    records = _read_records(Upload(document), ImportFormat.JSON)
+    assert next(records) == SPOOLMAN_RECORD
+
+
+@pytest.mark.parametrize("document, message", [
+    (b"", "found 'the end of the file'"),
+    (b"42", "found '4'"),
+    (b'[{"id": 1},', "Expecting value"),
+    (b'[{"id": 1}] [', "after the JSON document"),
+    (b'[{"comment": "' + b"x" * 200 + b'"}]', "longer than 100 characters"),
+])
+def test_unreadable_json_is_rejected(monkeypatch, document, message):
+    monkeypatch.setattr(importer, "JSON_READ_SIZE", 16)
+    monkeypatch.setattr(importer, "MAX_JSON_RECORD_SIZE", 100)
+    with pytest.raises(ValueError, match=message):
+        list(_read_records(io.BytesIO(document), ImportFormat.JSON))
+
+
+async def _import(client, user, records: list[dict], **params) -> dict:
+    body = b"".join(orjson.dumps(record) + b"\n" for record in records)
+    response = await client.post(
+        "/api/import/", params=params, files={"file": ("spools.ndjson", body)}, headers=auth_headers(user)
+    )
+    assert response.status_code == 200, response.text
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[-1]["stage"] == "done", events[-1]
+    return events[-1]
+
+
+async def test_duplicate_source_ids_are_imported_once(client, make_user):
+    user = await make_user()
+    records = [
+        {**SPOOLMAN_RECORD, "id": 1, "location": "first"},
+        {**SPOOLMAN_RECORD, "id": 1, "location": "second"},
+        {**SPOOLMAN_RECORD, "id": 2},
+        {**SPOOLMAN_RECORD, "id": None},
+        {**SPOOLMAN_RECORD, "id": None},
+        {"filament": {"name": "No vendor"}},
+    ]
+
+    report = await _import(client, user, records)
+    assert report["rows"] == 6
+    assert report["invalid_rows"] == 1
+    assert report["errors"] == [{"row": 6, "detail": "Missing manufacturer"}]
+    assert (report["spools_created"], report["spools_skipped"]) == (4, 1)
+
+    spools = (await client.get("/api/spools/", headers=auth_headers(user))).json()
+    imported = sorted((spool["custom_fields"].get("import_id", ""), spool["location"]) for spool in spools)
+    assert imported == [("", "Dry box"), ("", "Dry box"), ("1", "first"), ("2", "Dry box")]
+
+    # Running the same export again only adds the rows without a source id
+    report = await _import(client, user, records)
+    assert (report["spools_created"], report["spools_skipped"]) == (2, 3)
+
+
+async def test_dry_run_commits_nothing(client, make_user):
+    user = await make_user()
+    report = await _import(client, user, [{**SPOOLMAN_RECORD, "id": 5}], dry_run="true")
+    assert report["dry_run"] is True
+    assert report["spools_created"] == 1
+    assert (await client.get("/api/spools/", headers=auth_headers(user))).json() == []
+
+
+async def test_spoolman_json_export_is_imported(client, make_user):
+    user = await make_user()
+    response = await client.post(
+        "/api/import/", files={"file": ("spools.json", orjson.dumps(RECORDS))}, headers=auth_headers(user)
+    )
+    report = json.loads(response.text.splitlines()[-1])
+    assert (report["stage"], report["rows"], report["spools_created"]) == ("done", 5, 5)
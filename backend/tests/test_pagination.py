@@ -0,0 +1,93 @@
+"""
+Keyset pagination of the list endpoints
+"""
+
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert
+
+from app.api.pagination import decode_cursor, encode_cursor
+from app.database import AsyncSessionLocal
+from app.models import Spool
+
+from conftest import auth_headers
+
+
+def test_cursor_round_trip():
+    created_at, id = datetime(2025, 3, 1, 12, 0, 0, 123456, tzinfo=timezone.utc), uuid.uuid4()
+    assert decode_cursor(encode_cursor(created_at, id, "prev")) == (created_at, id, "prev")
+
+
+async def test_invalid_cursor_is_rejected(client, seed):
+    for cursor in ("garbage", encode_cursor(datetime.now(timezone.utc), uuid.uuid4(), "up")):
+        response = await client.get(f"/api/spools/?cursor={cursor}", headers=auth_headers(seed.users[0]))
+        assert response.status_code == 400
+
+
+async def _walk(client, user, path: str, limit: int, direction: str = "next", cursor: str | None = None):
+    """Follow the cursors one way; returns the pages"""
+    pages = []
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(path, params=params, headers=auth_headers(user))
+        assert response.status_code == 200, response.text
+        pages.append([spool["id"] for spool in response.json()])
+        cursor = response.headers.get(f"X-{direction.capitalize()}-Cursor")
+        if cursor is None:
+            return pages, response
+
+
+async def test_walking_forward_and_back_visits_every_row_once(client, seed):
+    user = seed.users[4]
+    expected = [
+        str(spool["id"]) for spool in sorted(
+            (spool for spool in seed.spools if spool["user_id"] == user["id"]),
+            key=lambda spool: (spool["created_at"], spool["id"])
+        )
+    ]
+    forward, last = await _walk(client, user, "/api/spools/", 37)
+    assert [id for page in forward for id in page] == expected
+    assert all(len(page) == 37 for page in forward[:-1])
+    assert 'rel="next"' not in last.headers.get("Link", "")
+
+    backward, first = await _walk(client, user, "/api/spools/", 37, "prev", last.headers["X-Prev-Cursor"])
+    assert [id for page in reversed(backward) for id in page] == expected[:-len(forward[-1])]
+    assert 'rel="prev"' not in first.headers.get("Link", "")
+    assert 'rel="next"' in first.headers["Link"]
+
+
+async def test_rows_created_at_the_same_instant(client, seed, make_user):
+    user = await make_user()
+    created_at = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    rows = [
+        {"id": uuid.uuid4(), "user_id": user["id"], "filament_id": seed.filaments[0]["id"], "weight": Decimal(1000),
+         "remaining_weight": Decimal(1000), "diameter": Decimal("1.75"), "custom_fields": {}, "created_at": created_at}
+        for _ in range(10)
+    ]
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(Spool.__table__), rows)
+        await db.commit()
+
+    pages, _ = await _walk(client, user, "/api/spools/", 3)
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+    assert [id for page in pages for id in page] == sorted(str(row["id"]) for row in rows)
+
+
+@pytest.mark.parametrize("path", ["/api/manufacturers/", "/api/materials/", "/api/filaments/", "/api/printers/"])
+async def test_other_lists_page_the_same_way(client, seed, path):
+    pages, _ = await _walk(client, seed.admin, path, 25)
+    ids = [id for page in pages for id in page]
+    assert len(ids) == len(set(ids))
+    response = await client.get(path, params={"limit": 10000}, headers=auth_headers(seed.admin))
+    assert ids == [row["id"] for row in response.json()]
+
+
+async def test_skip_is_still_honoured(client, seed):
+    user = seed.users[4]
+    everything = (await client.get("/api/spools/?limit=100", headers=auth_headers(user))).json()
+    response = await client.get("/api/spools/?limit=20&skip=30", headers=auth_headers(user))
+    assert [spool["id"] for spool in response.json()] == [spool["id"] for spool in everything[30:50]]
+    assert 'rel="prev"' in response.headers["Link"]
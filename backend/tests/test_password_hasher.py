@@ -0,0 +1,61 @@
+"""
+Password hashing pool: the event loop stays responsive and bursts are capped
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.auth.hashing import PasswordHasher
+
+
+async def test_hashing_does_not_block_the_loop():
+    hasher = PasswordHasher(max_workers=1, max_queue=4)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    assert await hasher.run(lambda: time.sleep(0.3) or "hashed") == "hashed"
+    task.cancel()
+    assert ticks >= 10
+    await hasher.shutdown()
+
+
+async def test_burst_beyond_the_queue_is_rejected():
+    hasher = PasswordHasher(max_workers=1, max_queue=1)
+    release = threading.Event()
+    running = [asyncio.create_task(hasher.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(HTTPException) as rejected:
+        await hasher.run(release.wait)
+    assert rejected.value.status_code == 503
+    assert rejected.value.headers == {"Retry-After": "1"}
+    assert hasher.stats()["rejected"] == 1
+
+    release.set()
+    await asyncio.gather(*running)
+    assert hasher.stats()["pending"] == 0
+    await hasher.shutdown()
+
+
+async def test_shutdown_waits_without_blocking_the_loop():
+    hasher = PasswordHasher(max_workers=1, max_queue=1)
+    release = threading.Event()
+    running = asyncio.create_task(hasher.run(release.wait))
+    await asyncio.sleep(0.05)
+
+    shutdown = asyncio.create_task(hasher.shutdown())
+    await asyncio.sleep(0.05)
+    assert not shutdown.done()
+    release.set()
+    await asyncio.wait_for(shutdown, 5)
+    assert await running is True
@@ -0,0 +1,134 @@
+"""
+Principal cache: local invalidation and invalidation across workers
+"""
+
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from app.auth import cache as cache_module
+from app.auth.cache import PrincipalCache
+from app.database import engine
+from app.models.user import User, UserRole
+
+from conftest import auth_headers
+
+
+def _user(**values) -> User:
+    name = f"u{uuid.uuid4().hex[:8]}"
+    return User(**{
+        "id": uuid.uuid4(), "username": name, "email": f"{name}@example.com", "password_hash": "x",
+        "role": UserRole.USER, "is_active": True, **values,
+    })
+
+
+async def wait_for(condition, timeout: float = 5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.02)
+
+
+@pytest.fixture
+async def worker(database):
+    """A second worker's cache, listening for changes"""
+    cache = PrincipalCache(max_size=100, ttl=60)
+    task = asyncio.create_task(cache.listen())
+    await wait_for(lambda: cache.listening)
+    yield cache
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def test_cache_is_bypassed_while_not_listening():
+    cache = PrincipalCache(max_size=100, ttl=60)
+    user = _user()
+    cache.set_user(user)
+    assert cache.get_user(user.username) is None
+
+
+def test_invalidate_user():
+    cache = PrincipalCache(max_size=100, ttl=60)
+    cache.listening = True
+    user = _user()
+    cache.set_user(user)
+    assert cache.get_user(user.username).id == user.id
+    assert cache.get_user_by_id(user.id).username == user.username
+
+    cache.invalidate_user(user.id)
+    assert cache.get_user(user.username) is None
+    assert cache.get_user_by_id(user.id) is None
+
+
+def test_renamed_user_replaces_old_entry():
+    cache = PrincipalCache(max_size=100, ttl=60)
+    cache.listening = True
+    user = _user()
+    cache.set_user(user)
+    renamed = _user(id=user.id, username=f"{user.username}-new")
+    cache.set_user(renamed)
+    assert cache.get_user(user.username) is None
+    assert cache.get_user_by_id(user.id).username == renamed.username
+
+
+def test_inactive_users_are_not_cached():
+    cache = PrincipalCache(max_size=100, ttl=60)
+    cache.listening = True
+    user = _user(is_active=False)
+    cache.set_user(user)
+    assert cache.get_user(user.username) is None
+
+
+async def test_deactivation_reaches_other_workers(client, make_user, worker):
+    admin = await make_user(UserRole.ADMIN)
+    user = await make_user()
+    worker.set_user(_user(id=user["id"], username=user["username"]))
+    assert worker.get_user(user["username"]) is not None
+
+    response = await client.put(f"/api/users/{user['id']}", json={"is_active": False}, headers=auth_headers(admin))
+    assert response.status_code == 200, response.text
+    await wait_for(lambda: worker.get_user(user["username"]) is None)
+    assert worker.invalidations == 1
+
+
+async def test_deletion_reaches_other_workers(client, make_user, worker):
+    admin = await make_user(UserRole.ADMIN)
+    user = await make_user()
+    worker.set_user(_user(id=user["id"], username=user["username"]))
+
+    response = await client.delete(f"/api/users/{user['id']}", headers=auth_headers(admin))
+    assert response.status_code == 200, response.text
+    await wait_for(lambda: worker.get_user_by_id(user["id"]) is None)
+
+
+async def test_rolled_back_change_is_not_announced(make_user, worker):
+    user = await make_user()
+    worker.set_user(_user(id=user["id"], username=user["username"]))
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT pg_notify(:channel, :id)"), {
+            "channel": cache_module.INVALIDATION_CHANNEL, "id": str(user["id"])
+        })
+        await conn.rollback()
+    await asyncio.sleep(0.2)
+    assert worker.get_user(user["username"]) is not None
+
+
+async def test_lost_listener_empties_the_cache_until_it_reconnects(monkeypatch, make_user, worker):
+    monkeypatch.setattr(cache_module, "LISTEN_RETRY_DELAY", 0.1)
+    user = await make_user()
+    worker.set_user(_user(id=user["id"], username=user["username"]))
+
+    async with engine.connect() as conn:
+        await conn.execute(text(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+            "WHERE query = :listen AND pid <> pg_backend_pid()"
+        ), {"listen": f'LISTEN "{cache_module.INVALIDATION_CHANNEL}"'})
+    await wait_for(lambda: not worker.listening)
+    assert worker.get_user(user["username"]) is None
+    worker.set_user(_user(id=user["id"], username=user["username"]))
+    assert worker.get_user(user["username"]) is None
+
+    await wait_for(lambda: worker.listening)
+    assert worker.reconnects == 1
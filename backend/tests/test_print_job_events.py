@@ -0,0 +1,153 @@
+"""
+Print job events: coalesced per job, applied to spools exactly once
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.print_jobs import print_job_ingest
+
+from conftest import auth_headers
+
+T0 = datetime(2025, 8, 1, 22, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def printer(client, make_user, seed):
+    """A user with a printer and a 1 kg spool"""
+    user = await make_user()
+    headers = auth_headers(user)
+    printer = (await client.post("/api/printers/", json={"name": "Mk4"}, headers=headers)).json()
+    spool = (await client.post("/api/spools/", json={
+        "filament_id": str(seed.filaments[0]["id"]), "weight": "1000", "remaining_weight": "1000", "diameter": "1.75",
+    }, headers=headers)).json()
+    return headers, printer["id"], spool["id"]
+
+
+def _event(printer_id, job_id, type_, minutes, **values) -> dict:
+    return {"job_id": str(job_id), "printer_id": printer_id, "type": type_,
+            "timestamp": (T0 + timedelta(minutes=minutes)).isoformat(), **values}
+
+
+async def _send(client, headers, *events) -> None:
+    response = await client.post("/api/print-jobs/events", json={"events": list(events)}, headers=headers)
+    assert response.status_code == 202, response.text
+    assert response.json() == {"accepted": len(events)}
+
+
+async def _remaining(client, headers, spool_id) -> str:
+    return (await client.get(f"/api/spools/{spool_id}", headers=headers)).json()["remaining_weight"]
+
+
+async def test_job_lifecycle_in_one_flush(client, printer):
+    headers, printer_id, spool_id = printer
+    job_id = uuid.uuid4()
+    # Out of order within the batch; applied by timestamp
+    await _send(
+        client, headers,
+        _event(printer_id, job_id, "finish", 95, filament_used="12.5"),
+        _event(printer_id, job_id, "start", 0, spool_id=spool_id, job_name="benchy.gcode"),
+        _event(printer_id, job_id, "progress", 40, progress=42.0),
+    )
+    await print_job_ingest.drain()
+
+    job = (await client.get(f"/api/print-jobs/{job_id}", headers=headers)).json()
+    assert job["status"] == "completed"
+    assert job["job_name"] == "benchy.gcode"
+    assert datetime.fromisoformat(job["start_time"]) == T0
+    assert datetime.fromisoformat(job["end_time"]) == T0 + timedelta(minutes=95)
+    assert job["metadata"] == {"progress": 42.0}
+    assert await _remaining(client, headers, spool_id) == "987.50"
+
+    # Ended after midnight UTC, so it counts for the next day
+    usage = (await client.get("/api/print-jobs/usage", params={"group_by": "spool"}, headers=headers)).json()
+    assert usage == [{"period": "2025-08-02", "spool_id": spool_id, "filament_used": "12.50", "jobs": 1}]
+
+
+async def test_ended_job_is_applied_once(client, printer):
+    headers, printer_id, spool_id = printer
+    job_id = uuid.uuid4()
+    await _send(client, headers, _event(printer_id, job_id, "start", 0, spool_id=spool_id))
+    await print_job_ingest.drain()
+    await _send(client, headers, _event(printer_id, job_id, "finish", 30, filament_used="20"))
+    await print_job_ingest.drain()
+    # Repeated and late events are ignored once the job has ended
+    await _send(
+        client, headers,
+        _event(printer_id, job_id, "finish", 31, filament_used="20"),
+        _event(printer_id, job_id, "fail", 32, filament_used="25"),
+    )
+    await print_job_ingest.drain()
+
+    job = (await client.get(f"/api/print-jobs/{job_id}", headers=headers)).json()
+    assert (job["status"], job["filament_used"]) == ("completed", "20.00")
+    assert await _remaining(client, headers, spool_id) == "980.00"
+
+
+async def test_events_for_other_users_printers_are_dropped(client, printer, make_user):
+    headers, printer_id, spool_id = printer
+    other = auth_headers(await make_user())
+    other_printer = (await client.post("/api/printers/", json={"name": "Voron"}, headers=other)).json()["id"]
+    rejected = print_job_ingest.rejected
+
+    foreign_printer, foreign_spool = uuid.uuid4(), uuid.uuid4()
+    await _send(
+        client, other,
+        _event(printer_id, foreign_printer, "finish", 0, filament_used="50"),
+        _event(other_printer, foreign_spool, "finish", 0, spool_id=spool_id, filament_used="50"),
+    )
+    await print_job_ingest.drain()
+
+    assert print_job_ingest.rejected == rejected + 2
+    for job_id in (foreign_printer, foreign_spool):
+        assert (await client.get(f"/api/print-jobs/{job_id}", headers=headers)).status_code == 404
+    assert await _remaining(client, headers, spool_id) == "1000.00"
+
+
+async def test_timestamps_need_an_offset(client, printer):
+    headers, printer_id, _ = printer
+    job_id = uuid.uuid4()
+    naive = {**_event(printer_id, job_id, "start", 0), "timestamp": "2025-08-01T22:30:00"}
+    response = await client.post("/api/print-jobs/events", json={"events": [naive]}, headers=headers)
+    assert response.status_code == 422
+
+    await _send(client, headers, {**naive, "timestamp": "2025-08-02T00:30:00+02:00"})
+    await print_job_ingest.drain()
+    job = (await client.get(f"/api/print-jobs/{job_id}", headers=headers)).json()
+    assert datetime.fromisoformat(job["start_time"]) == T0
+
+
+async def test_a_failing_job_does_not_drop_the_batch(client, printer):
+    headers, printer_id, spool_id = printer
+    good, bad = uuid.uuid4(), uuid.uuid4()
+    user = (await client.get("/api/users/me", headers=headers)).json()
+    failed = print_job_ingest.failed
+
+    # Bypasses the API's validation to get a row the database refuses
+    print_job_ingest.submit(uuid.UUID(user["id"]), False, [
+        {"job_id": good, "printer_id": uuid.UUID(printer_id), "type": "finish", "timestamp": T0,
+         "spool_id": uuid.UUID(spool_id), "filament_used": 5},
+        {"job_id": bad, "printer_id": uuid.UUID(printer_id), "type": "start", "timestamp": T0,
+         "job_name": "x" * 300},
+    ])
+    await print_job_ingest.drain()
+
+    assert print_job_ingest.failed == failed + 1
+    assert (await client.get(f"/api/print-jobs/{good}", headers=headers)).json()["status"] == "completed"
+    assert (await client.get(f"/api/print-jobs/{bad}", headers=headers)).status_code == 404
+    assert await _remaining(client, headers, spool_id) == "995.00"
+
+
+async def test_full_queue_rejects_the_whole_request(client, printer, monkeypatch):
+    headers, printer_id, _ = printer
+    monkeypatch.setattr(print_job_ingest, "queue", asyncio.Queue(maxsize=1))
+    job_id = uuid.uuid4()
+    response = await client.post("/api/print-jobs/events", json={"events": [
+        _event(printer_id, job_id, "start", 0), _event(printer_id, job_id, "progress", 1, progress=5),
+    ]}, headers=headers)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert print_job_ingest.queue.empty()
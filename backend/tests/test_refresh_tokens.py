@@ -0,0 +1,98 @@
+"""
+Refresh tokens: rotation, reuse detection and revocation
+"""
+
+import asyncio
+
+import pytest
+
+from app.auth import tokens
+from app.auth.tokens import RevocationList
+from app.models.user import UserRole
+
+from conftest import PASSWORD, auth_headers
+
+
+@pytest.fixture
+def fresh_worker(monkeypatch):
+    """A worker that has not seen any revocation yet; only Postgres knows"""
+    revocations = RevocationList()
+    monkeypatch.setattr(tokens, "revocation_list", revocations)
+    return revocations
+
+
+async def _login(client, user) -> dict:
+    response = await client.post("/api/auth/login", data={"username": user["username"], "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def _refresh(client, refresh_token: str):
+    return await client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+
+
+async def test_refresh_rotates_the_token(client, make_user):
+    user = await make_user()
+    first = await _login(client, user)
+
+    response = await _refresh(client, first["refresh_token"])
+    assert response.status_code == 200, response.text
+    second = response.json()
+    assert second["refresh_token"] != first["refresh_token"]
+    me = await client.get("/api/users/me", headers={"Authorization": f"Bearer {second['access_token']}"})
+    assert me.json()["username"] == user["username"]
+
+    response = await _refresh(client, second["refresh_token"])
+    assert response.status_code == 200, response.text
+
+
+@pytest.mark.parametrize("worker", ["same", "other"])
+async def test_reusing_a_rotated_token_revokes_the_session(client, make_user, request, worker):
+    if worker == "other":
+        request.getfixturevalue("fresh_worker")
+    user = await make_user()
+    first = await _login(client, user)
+    second = (await _refresh(client, first["refresh_token"])).json()
+
+    response = await _refresh(client, first["refresh_token"])
+    assert response.status_code == 401
+    # The successor belongs to the same, now revoked, session
+    assert (await _refresh(client, second["refresh_token"])).status_code == 401
+    # Other sessions of the user are unaffected
+    other = await _login(client, user)
+    assert (await _refresh(client, other["refresh_token"])).status_code == 200
+
+
+async def test_concurrent_refreshes_of_one_token(client, make_user, fresh_worker):
+    user = await make_user()
+    login = await _login(client, user)
+    responses = await asyncio.gather(*(_refresh(client, login["refresh_token"]) for _ in range(2)))
+    assert sorted(response.status_code for response in responses) == [200, 401]
+
+
+async def test_logout_revokes_the_session(client, make_user, fresh_worker, monkeypatch):
+    user = await make_user()
+    login = await _login(client, user)
+    response = await client.post("/api/auth/logout", json={"refresh_token": login["refresh_token"]})
+    assert response.status_code == 200
+    assert fresh_worker.is_family_revoked(tokens.decode_refresh_token(login["refresh_token"])["family_id"])
+
+    # A worker that did not see the logout finds the revocation in Postgres
+    monkeypatch.setattr(tokens, "revocation_list", RevocationList())
+    assert (await _refresh(client, login["refresh_token"])).status_code == 401
+
+
+async def test_deactivated_user_cannot_refresh(client, make_user):
+    admin = await make_user(UserRole.ADMIN)
+    user = await make_user()
+    login = await _login(client, user)
+    await client.put(f"/api/users/{user['id']}", json={"is_active": False}, headers=auth_headers(admin))
+    assert (await _refresh(client, login["refresh_token"])).status_code == 401
+
+
+async def test_refresh_token_is_not_an_access_token(client, make_user):
+    user = await make_user()
+    login = await _login(client, user)
+    response = await client.get("/api/users/me", headers={"Authorization": f"Bearer {login['refresh_token']}"})
+    assert response.status_code == 401
+    assert (await _refresh(client, login["access_token"])).status_code == 401
@@ -0,0 +1,87 @@
+"""
+Read-your-writes routing: the last-write marker travels with the client
+"""
+
+import itertools
+import time
+
+import pytest
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.database import LAST_WRITE_COOKIE, engine, replica_router, set_last_write, wrote_recently
+
+from conftest import auth_headers
+
+
+def _request(cookie: str | None) -> Request:
+    headers = [(b"cookie", f"{LAST_WRITE_COOKIE}={cookie}".encode())] if cookie else []
+    return Request({"type": "http", "method": "GET", "path": "/api/spools/", "headers": headers})
+
+
+def _marker(user_id) -> str:
+    response = Response()
+    set_last_write(response, user_id)
+    cookie = response.headers["set-cookie"]
+    assert "HttpOnly" in cookie and "Path=/api" in cookie
+    return cookie.split(";")[0].split("=", 1)[1]
+
+
+def test_marker_is_valid_for_its_user_only():
+    marker = _marker("user-a")
+    assert wrote_recently(_request(marker), "user-a")
+    assert not wrote_recently(_request(marker), "user-b")
+    assert not wrote_recently(_request(None), "user-a")
+
+
+def test_tampered_marker_is_rejected():
+    written_at, signature = _marker("user-a").split(".")
+    forged = f"{int(written_at) + 60000}.{signature}"
+    assert not wrote_recently(_request(forged), "user-a")
+    assert not wrote_recently(_request("garbage"), "user-a")
+
+
+def test_marker_expires(monkeypatch):
+    marker = _marker("user-a")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 60)
+    assert not wrote_recently(_request(marker), "user-a")
+
+
+@pytest.fixture
+def replica(monkeypatch, database):
+    """The primary stands in for a caught-up replica"""
+    monkeypatch.setattr(replica_router, "replicas", [engine])
+    monkeypatch.setattr(replica_router, "lag", {0: 0.0})
+    monkeypatch.setattr(replica_router, "_cycle", itertools.cycle([0]))
+    monkeypatch.setattr(replica_router, "replica_reads", 0)
+    monkeypatch.setattr(replica_router, "primary_reads", 0)
+    return replica_router
+
+
+async def test_reads_after_a_write_go_to_the_primary(client, make_user, replica):
+    user = await make_user()
+    headers = auth_headers(user)
+
+    await client.get("/api/printers/", headers=headers)
+    assert (replica.replica_reads, replica.primary_reads) == (1, 0)
+
+    response = await client.post("/api/printers/", json={"name": "Mk4"}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert LAST_WRITE_COOKIE in response.cookies
+
+    # Any worker honours the cookie; the client's jar sends it back
+    listed = await client.get("/api/printers/", headers=headers)
+    assert [printer["name"] for printer in listed.json()] == ["Mk4"]
+    assert (replica.replica_reads, replica.primary_reads) == (1, 1)
+
+    client.cookies.clear()
+    await client.get("/api/printers/", headers=headers)
+    assert (replica.replica_reads, replica.primary_reads) == (2, 1)
+
+
+async def test_no_marker_without_replicas(client, make_user, database):
+    user = await make_user()
+    response = await client.post("/api/printers/", json={"name": "Mk3"}, headers=auth_headers(user))
+    assert response.status_code == 200, response.text
+    assert LAST_WRITE_COOKIE not in response.cookies
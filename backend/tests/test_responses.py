@@ -0,0 +1,60 @@
+"""
+ResponseAdapter renders what FastAPI would, keeping the injected response's status and headers
+"""
+
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import List
+
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from app.api.spools import SpoolResponse
+from app.responses import ResponseAdapter
+
+adapter = ResponseAdapter(List[SpoolResponse], exclude_unset=True)
+
+
+def _spool() -> dict:
+    now = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    return {
+        "id": uuid.uuid4(), "user_id": uuid.uuid4(), "filament_id": uuid.uuid4(), "printer_id": None,
+        "weight": Decimal("1000.00"), "remaining_weight": Decimal("812.50"), "diameter": Decimal("1.75"),
+        "color": "Galaxy Black", "custom_fields": {"dryer": 2}, "is_active": True,
+        "created_at": now, "updated_at": now,
+    }
+
+
+def test_body_matches_fastapi_rendering():
+    rows = [_spool(), _spool()]
+    expected = jsonable_encoder(
+        [SpoolResponse.model_validate(row) for row in rows], exclude_unset=True
+    )
+    rendered = adapter.render(rows)
+    assert rendered.media_type == "application/json"
+    assert orjson.loads(rendered.body) == expected
+
+
+def test_status_and_headers_of_the_injected_response_are_kept():
+    response = Response()
+    response.status_code = 206
+    response.headers["Link"] = '</api/spools/?cursor=abc>; rel="next"'
+    response.set_cookie("first", "1")
+    response.set_cookie("second", "2")
+
+    rendered = adapter.render([_spool()], response)
+    assert rendered.status_code == 206
+    assert rendered.headers["link"] == '</api/spools/?cursor=abc>; rel="next"'
+    assert rendered.headers.getlist("set-cookie")[0].startswith("first=1")
+    assert rendered.headers.getlist("set-cookie")[1].startswith("second=2")
+    assert rendered.headers.getlist("content-type") == ["application/json"]
+    assert rendered.headers["content-length"] == str(len(rendered.body))
+
+
+def test_unset_status_defaults_to_200():
+    # FastAPI injects a Response whose status_code is None
+    response = Response()
+    response.status_code = None
+    assert adapter.render([], response).status_code == 200
@@ -0,0 +1,72 @@
+"""
+Startup migration of databases created before migrations existed
+"""
+
+import asyncpg
+import pytest
+from alembic import command
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import _async_url
+from app.schema import _alembic_config, _current_revision, _upgrade, head_revision
+
+from conftest import TEST_DATABASE_URL
+
+
+@pytest.fixture
+async def scratch_engine(database):
+    """An empty database next to the test database"""
+    base, name = TEST_DATABASE_URL.rsplit("/", 1)
+    scratch = f"{name}_schema"
+    admin = await asyncpg.connect(f"{base}/postgres")
+    await admin.execute(f'DROP DATABASE IF EXISTS "{scratch}" WITH (FORCE)')
+    await admin.execute(f'CREATE DATABASE "{scratch}"')
+    engine = create_async_engine(_async_url(f"{base}/{scratch}"))
+    yield engine
+    await engine.dispose()
+    await admin.execute(f'DROP DATABASE IF EXISTS "{scratch}" WITH (FORCE)')
+    await admin.close()
+
+
+async def _baseline_objects(conn) -> tuple[set, set]:
+    indexes = set((await conn.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = 'public' AND indexname LIKE 'idx_%'"
+    ))).scalars())
+    triggers = set((await conn.execute(text("SELECT tgname FROM pg_trigger WHERE NOT tgisinternal"))).scalars())
+    return indexes, triggers
+
+
+async def test_create_all_database_is_completed_before_stamping(scratch_engine):
+    async with scratch_engine.connect() as conn:
+        await conn.run_sync(lambda sync_conn: command.upgrade(_alembic_config(sync_conn), "0001"))
+        indexes, triggers = await _baseline_objects(conn)
+        assert indexes and triggers
+        # What create_all() left behind: the tables without init.sql's
+        # indexes, triggers and revision
+        for index in indexes:
+            await conn.execute(text(f"DROP INDEX {index}"))
+        for trigger in triggers:
+            table = trigger.removeprefix("update_").removesuffix("_updated_at")
+            await conn.execute(text(f"DROP TRIGGER {trigger} ON {table}"))
+        await conn.execute(text("DROP TABLE alembic_version"))
+        await conn.commit()
+
+        await conn.run_sync(_upgrade, head_revision())
+        await conn.commit()
+
+        assert await conn.run_sync(_current_revision) == head_revision()
+        _, triggers_after = await _baseline_objects(conn)
+        assert "update_spools_updated_at" in triggers_after
+        assert "update_print_jobs_updated_at" in triggers_after
+
+
+async def test_init_sql_database_is_stamped(scratch_engine):
+    async with scratch_engine.connect() as conn:
+        await conn.run_sync(lambda sync_conn: command.upgrade(_alembic_config(sync_conn), "0001"))
+        await conn.execute(text("DROP TABLE alembic_version"))
+        await conn.commit()
+
+        await conn.run_sync(_upgrade, head_revision())
+        await conn.commit()
+        assert await conn.run_sync(_current_revision) == head_revision()
@@ -0,0 +1,61 @@
+"""
+Fuzzy search: trigram matches and ranking
+"""
+
+import uuid
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert
+
+from app.database import AsyncSessionLocal
+from app.models import Spool
+
+from conftest import auth_headers
+
+
+async def _add_spools(user: dict, filament_id, colors: list[str]):
+    rows = [
+        {"id": uuid.uuid4(), "user_id": user["id"], "filament_id": filament_id, "weight": Decimal("1000"),
+         "remaining_weight": Decimal("1000"), "diameter": Decimal("1.75"), "color": color, "custom_fields": {}}
+        for color in colors
+    ]
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(Spool.__table__), rows)
+        await db.commit()
+
+
+@pytest.mark.parametrize("type_", ["filament", "spool"])
+async def test_typos_match_by_trigram(client, seed, type_):
+    response = await client.get(f"/api/search/?q=galaxi&type={type_}", headers=auth_headers(seed.users[2]))
+    assert response.status_code == 200, response.text
+    results = response.json()
+    assert results
+    assert all(result["type"] == type_ and "Galaxy" in result["title"] for result in results)
+    assert [result["rank"] for result in results] == sorted((result["rank"] for result in results), reverse=True)
+
+
+async def test_best_spools_are_kept_when_many_match(client, seed, make_user):
+    user = await make_user()
+    # Far more close matches than any single page of results, the exact
+    # one stored after them
+    await _add_spools(user, seed.filaments[0]["id"], ["Lipstik"] * 3000)
+    await _add_spools(user, seed.filaments[0]["id"], ["Lipstick"])
+
+    response = await client.get("/api/search/?q=lipstick&type=spool&limit=5", headers=auth_headers(user))
+    assert response.status_code == 200, response.text
+    results = response.json()
+    assert len(results) == 5
+    assert results[0]["title"] == "Lipstick"
+    assert results[0]["rank"] == 1
+    assert all(result["rank"] < 1 for result in results[1:])
+
+
+async def test_search_only_sees_own_spools(client, seed, make_user):
+    user = await make_user()
+    await _add_spools(user, seed.filaments[0]["id"], ["Chartreuse"])
+    other = await make_user()
+    response = await client.get("/api/search/?q=chartreuse&type=spool", headers=auth_headers(other))
+    assert response.json() == []
+    response = await client.get("/api/search/?q=chartreuse&type=spool", headers=auth_headers(user))
+    assert [result["title"] for result in response.json()] == ["Chartreuse"]
@@ -0,0 +1,82 @@
+"""
+SpoolmanDB sync: catalog rows follow the catalog, filaments users created stay theirs
+"""
+
+import uuid
+
+import orjson
+import pytest
+from sqlalchemy import select, text
+
+from app.database import AsyncSessionLocal, engine
+from app.models import Filament
+from app.services.spoolman_db import SYNC_LOCK_KEY, SpoolmanDBSync, catalog_snapshot
+
+from conftest import auth_headers
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    """A file:// catalog and a sync with its own state and snapshot"""
+    monkeypatch.setattr(catalog_snapshot, "path", str(tmp_path / "state" / "catalog.bin"))
+    directory = tmp_path / "spoolmandb"
+    directory.mkdir()
+
+    def publish(variants: list[dict]):
+        (directory / "filaments.json").write_bytes(orjson.dumps(variants))
+
+    return publish, SpoolmanDBSync(f"file://{directory}", str(tmp_path / "state"))
+
+
+def variant(brand: str, name: str, extruder_temp: int) -> dict:
+    return {"id": f"{brand}_{name}".lower().replace(" ", "_"), "manufacturer": brand, "name": name,
+            "material": "PLA", "density": 1.24, "extruder_temp": extruder_temp, "bed_temp": 60,
+            "weight": 1000, "diameter": 1.75, "color_hex": "FFFFFF"}
+
+
+async def filament(brand_id, name: str) -> Filament:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(
+            select(Filament).where(Filament.manufacturer_id == brand_id, Filament.name == name)
+        )).scalar_one()
+
+
+async def test_local_filament_with_a_catalog_name_is_kept(client, seed, make_user, source):
+    publish, sync = source
+    headers = auth_headers(await make_user())
+    brand = f"Zyl{uuid.uuid4().hex[:8]}"
+    created = (await client.post("/api/manufacturers/", json={"name": brand}, headers=headers)).json()
+    local = (await client.post("/api/filaments/", json={
+        "manufacturer_id": created["id"], "material_id": str(seed.materials[0]["id"]),
+        "name": "PLA Basic", "extruder_temp_min": 195, "extruder_temp_max": 205,
+    }, headers=headers)).json()
+
+    publish([variant(brand, "PLA Basic", 220), variant(brand, "PLA Silk", 215)])
+    report = await sync.sync()
+    assert report["filaments_upserted"] == 1
+    assert report["filaments_kept_local"] == 1
+
+    kept = await filament(created["id"], "PLA Basic")
+    assert str(kept.id) == local["id"]
+    assert kept.spoolman_db_id is None
+    assert (kept.extruder_temp_min, kept.extruder_temp_max) == (195, 205)
+    assert (await filament(created["id"], "PLA Silk")).extruder_temp_min == 215
+
+    # Catalog rows follow later changes; the local one still does not
+    publish([variant(brand, "PLA Basic", 230), variant(brand, "PLA Silk", 225)])
+    report = await sync.sync(force=True)
+    assert (report["filaments_upserted"], report["filaments_kept_local"]) == (1, 1)
+    assert (await filament(created["id"], "PLA Silk")).extruder_temp_min == 225
+    assert (await filament(created["id"], "PLA Basic")).extruder_temp_min == 195
+
+
+async def test_round_is_skipped_while_another_worker_syncs(seed, source):
+    publish, sync = source
+    publish([variant(f"Zyl{uuid.uuid4().hex[:8]}", "PLA Basic", 220)])
+    async with engine.connect() as conn:
+        async with conn.begin():
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SYNC_LOCK_KEY})
+            assert await sync.sync() == {"skipped": "Another worker is syncing"}
+    # Released with that transaction, not held by the skipped round
+    assert (await sync.sync())["filaments_upserted"] == 1
+    assert (await sync.sync())["modified"] is False
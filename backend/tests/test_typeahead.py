@@ -0,0 +1,70 @@
+"""
+Typeahead index: this worker's writes are applied without reloading, others' are picked up
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import insert
+
+from app.database import AsyncSessionLocal
+from app.models import Manufacturer
+from app.services.typeahead import typeahead_index
+
+from conftest import auth_headers
+
+
+@pytest.fixture
+async def typeahead(client, seed, make_user, monkeypatch):
+    """Checks the version on every query"""
+    monkeypatch.setattr(typeahead_index, "ttl", 0)
+    headers = auth_headers(await make_user())
+
+    async def names(q: str, **params) -> list[str]:
+        response = await client.get("/api/typeahead/", params={"q": q, **params}, headers=headers)
+        assert response.status_code == 200, response.text
+        return [entry["name"] for entry in response.json()]
+
+    await names("x")
+    return names, headers
+
+
+async def test_own_writes_do_not_reload(client, seed, typeahead):
+    names, headers = typeahead
+    reloads = typeahead_index.reloads
+    brand = f"Zyl{uuid.uuid4().hex[:8]}"
+
+    created = (await client.post("/api/manufacturers/", json={"name": brand}, headers=headers)).json()
+    assert await names(brand) == [brand]
+    await client.put(f"/api/manufacturers/{created['id']}", json={"name": f"{brand}x"}, headers=headers)
+    assert await names(brand) == [f"{brand}x"]
+
+    material_id = str(seed.materials[0]["id"])
+    filaments = [
+        (await client.post("/api/filaments/", json={
+            "manufacturer_id": created["id"], "material_id": material_id, "name": f"{brand} {line}"
+        }, headers=headers)).json()
+        for line in ("Basic", "Matte")
+    ]
+    assert sorted(await names(brand, type="filament")) == [f"{brand} Basic", f"{brand} Matte"]
+    # Not the newest filament, so max(updated_at) is unchanged
+    await client.delete(f"/api/filaments/{filaments[0]['id']}", headers=headers)
+    assert await names(brand, type="filament") == [f"{brand} Matte"]
+    assert typeahead_index.reloads == reloads
+
+    # The newest one: the resulting version is only known to the database
+    await client.delete(f"/api/filaments/{filaments[1]['id']}", headers=headers)
+    assert await names(brand, type="filament") == []
+    assert typeahead_index.reloads == reloads + 1
+
+
+async def test_writes_made_elsewhere_reload(typeahead):
+    names, _ = typeahead
+    reloads = typeahead_index.reloads
+    brand = f"Zyl{uuid.uuid4().hex[:8]}"
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(Manufacturer.__table__), [{"id": uuid.uuid4(), "name": brand}])
+        await db.commit()
+
+    assert await names(brand) == [brand]
+    assert typeahead_index.reloads == reloads + 1